@@ -0,0 +1,72 @@
+"""Command line interface for the benchmark suite."""
+import json
+
+import click
+
+from benchmarks.suite import Suite, compare_reports, time_cli_startup, write_report
+from benchmarks.synthetic import Scale
+
+
+@click.group()
+def bench():
+    """Benchmark netclop pipeline stages on synthetic inputs."""
+    pass
+
+
+@bench.command(name="run")
+@click.option("--output", "-o", type=click.Path(dir_okay=False, writable=True), required=True, help="JSON report path.")
+@click.option("--stage", "stages", multiple=True, help="Stages to run (default all).")
+@click.option("--repeat", type=click.IntRange(min=1), default=1, show_default=True, help="Timing repeats per stage.")
+@click.option("--trace-memory/--no-trace-memory", default=True, show_default=True, help="Trace peak allocations.")
+@click.option("--nodes", type=click.IntRange(min=2), default=Scale.nodes, show_default=True)
+@click.option("--particles", type=click.IntRange(min=1), default=Scale.particles, show_default=True)
+@click.option("--replicates", type=click.IntRange(min=1), default=Scale.replicates, show_default=True)
+@click.option("--cores", type=click.IntRange(min=1), default=Scale.cores, show_default=True)
+@click.option("--res", type=click.IntRange(min=0, max=15), default=Scale.res, show_default=True)
+@click.option("--leak", type=click.FloatRange(min=0, max=1), default=Scale.leak, show_default=True)
+@click.option("--noise", type=click.FloatRange(min=0, max=1), default=Scale.noise, show_default=True)
+@click.option("--seed", type=click.IntRange(min=1), default=Scale.seed, show_default=True)
+def run(output, stages, repeat, trace_memory, **scale_options):
+    """Run the benchmark suite and write a JSON report."""
+    suite = Suite(Scale(**scale_options), repeat=repeat, trace_memory=trace_memory)
+    report = suite.run(list(stages) if stages else None)
+    write_report(report, output)
+
+    for name, result in report["stages"].items():
+        click.echo(
+            f"{name:<14}{result["wall_s"]:>10.3f} s{result["cpu_s"]:>10.3f} s cpu"
+            f"{result["throughput"]:>12.1f} {result["unit"]}/s"
+        )
+
+
+@bench.command(name="compare")
+@click.argument("base", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new", type=click.Path(exists=True, dir_okay=False))
+def compare(base, new):
+    """Compare two JSON reports as ratios of new to base."""
+    with open(base) as f_base, open(new) as f_new:
+        ratios = compare_reports(json.load(f_base), json.load(f_new))
+
+    for name, metrics in sorted(ratios.items()):
+        click.echo(f"{name:<14}" + "".join(f"{metric} x{ratio:.2f}  " for metric, ratio in metrics.items()))
+
+
+@bench.command(name="startup")
+@click.option("--budget", type=click.FloatRange(min=0), default=0.5, show_default=True, help="Budget in seconds.")
+@click.option("--repeat", type=click.IntRange(min=1), default=5, show_default=True, help="Timing repeats.")
+def startup(budget, repeat):
+    """Check that `netclop --help` starts within budget without importing heavy dependencies."""
+    result = time_cli_startup(repeat)
+    click.echo(f"netclop --help: {result["wall_s"]:.3f} s (budget {budget:.3f} s)")
+
+    failures = []
+    if result["wall_s"] > budget:
+        failures.append("over budget")
+    if result["heavy_modules"]:
+        failures.append(f"imports {', '.join(result["heavy_modules"])}")
+    if failures:
+        raise click.ClickException("; ".join(failures))
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,211 @@
+"""Benchmark suite timing each pipeline stage."""
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from importlib.metadata import version
+from os import PathLike
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable
+
+from benchmarks.synthetic import Scale, check_cores, make_lpt, make_partitions
+from netclop import GeoNet, GeoPlot, NetworkEnsemble, SigClu, UpSetPlot
+
+# Dependencies that must not be imported to start the CLI
+HEAVY_MODULES = (
+    "geopandas", "shapely", "plotly", "matplotlib", "infomap", "upsetplot", "seaborn", "pandas", "networkx", "h3",
+)
+
+
+@dataclass
+class StageResult:
+    """Measurements of one benchmarked stage."""
+    wall_s: float
+    cpu_s: float
+    peak_alloc_mb: float | None
+    max_rss_mb: float
+    items: int
+    unit: str
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.wall_s if self.wall_s > 0 else float("inf")
+
+
+class Suite:
+    """Runs pipeline stages on synthetic inputs and records timing and memory."""
+    def __init__(self, scale: Scale, repeat: int = 1, trace_memory: bool = True):
+        self.scale = scale
+        self.repeat = repeat
+        self.trace_memory = trace_memory
+
+        self.results: dict[str, StageResult] = {}
+
+    def run(self, stages: list[str] = None) -> dict[str, Any]:
+        """
+        Run the selected stages, in pipeline order, and return the report.
+
+        Significance clustering, before the stages downstream of it, is checked to recover the planted cores.
+        """
+        with TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            state = {"tmp": tmp}
+            for name, (setup, func, items, unit) in self.stages.items():
+                if stages is not None and name not in stages:
+                    continue
+                setup(state)
+                self.results[name] = self.measure(lambda: func(state), items(state), unit)
+        return self.report()
+
+    @property
+    def stages(self) -> dict[str, tuple[Callable, Callable, Callable, str]]:
+        """Benchmarked stages as (setup, stage, item count, item unit)."""
+        scale = self.scale
+
+        def lpt(state):
+            if "lpt" not in state:
+                state["lpt"] = state["tmp"] / "lpt.csv"
+                make_lpt(state["lpt"], scale)
+
+        def net(state):
+            lpt(state)
+            if "net" not in state:
+                state["net"] = GeoNet(res=scale.res, silent=True).from_lpt([state["lpt"]])
+
+        def ensemble(state):
+            net(state)
+            state["ne"] = NetworkEnsemble(state["net"], num_bootstraps=scale.replicates, seed=scale.seed, silent=True)
+
+        def bootstrapped(state):
+            ensemble(state)
+            state["ne"].bootstrap(state["net"])
+
+        def partitions(state):
+            if "partitions" not in state:
+                state["partitions"] = make_partitions(scale)
+
+        def cores(state):
+            partitions(state)
+            if "cores" not in state:
+                sc = SigClu(state["partitions"], seed=scale.seed, silent=True)
+                sc.run()
+                check_cores(sc.cores, scale)
+                state["cores"] = sc.cores
+
+        def bootstrap(state):
+            # Draws resampled weights only; replicate networks are built lazily when accessed
+            state["ne"].bootstrap(state["net"])
+
+        def replicates(state):
+            for _ in state["ne"].bootstraps:
+                pass
+
+        def partition(state):
+            state["ne"].partition()
+
+        def make_lpt_net(state):
+            state["net"] = GeoNet(res=scale.res, silent=True).from_lpt([state["lpt"]])
+
+        def sigclu(state):
+            sc = SigClu(state["partitions"], seed=scale.seed, silent=True)
+            sc.run()
+            check_cores(sc.cores, scale)
+
+        def sigclu_peel(state):
+            SigClu(state["partitions"], seed=scale.seed, silent=True, initialize_peel=True).run()
+
+        def upset(state):
+            UpSetPlot(state["cores"], state["partitions"]).plot(state["tmp"] / "upset.png")
+
+        def geoplot(state):
+            noise = frozenset().union(*state["partitions"][0]).difference(*state["cores"])
+            GeoPlot.from_cores(state["cores"], noise).plot_structure()
+
+        return {
+            "make_lpt_net": (lpt, make_lpt_net, lambda state: scale.particles, "particles"),
+            "bootstrap": (ensemble, bootstrap, lambda state: scale.replicates, "nets"),
+            "replicates": (bootstrapped, replicates, lambda state: scale.replicates, "nets"),
+            "partition": (bootstrapped, partition, lambda state: scale.replicates, "nets"),
+            "sigclu": (partitions, sigclu, lambda state: scale.nodes, "nodes"),
+            "sigclu_peel": (partitions, sigclu_peel, lambda state: scale.nodes, "nodes"),
+            "upset": (cores, upset, lambda state: len(state["cores"]), "cores"),
+            "geoplot": (cores, geoplot, lambda state: scale.nodes, "nodes"),
+        }
+
+    def measure(self, func: Callable[[], Any], items: int, unit: str) -> StageResult:
+        """Time a stage, keeping the fastest repeat, then trace its peak allocation."""
+        wall, cpu = float("inf"), float("inf")
+        for _ in range(self.repeat):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            func()
+            wall = min(wall, time.perf_counter() - wall_start)
+            cpu = min(cpu, time.process_time() - cpu_start)
+
+        peak = None
+        if self.trace_memory:
+            tracemalloc.start()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak /= 2 ** 20
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10
+        return StageResult(wall, cpu, peak, max_rss, items, unit)
+
+    def report(self) -> dict[str, Any]:
+        """Make a machine-readable report of the results."""
+        return {
+            "netclop": version("netclop"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": asdict(self.scale),
+            "stages": {
+                name: asdict(result) | {"throughput": result.throughput} for name, result in self.results.items()
+            },
+        }
+
+
+def write_report(report: dict[str, Any], path: PathLike) -> None:
+    """Write a report to JSON."""
+    Path(path).write_text(json.dumps(report, indent=2) + "\n")
+
+
+def compare_reports(base: dict[str, Any], new: dict[str, Any]) -> dict[str, dict[str, float]]:
+    """Ratio of new to base measurements for stages present in both reports."""
+    ratios = {}
+    for name in base["stages"].keys() & new["stages"].keys():
+        ratios[name] = {
+            metric: new["stages"][name][metric] / base["stages"][name][metric]
+            for metric in ("wall_s", "cpu_s", "peak_alloc_mb")
+            if base["stages"][name][metric] and new["stages"][name][metric] is not None
+        }
+    return ratios
+
+
+def time_cli_startup(repeat: int = 5) -> dict[str, Any]:
+    """Time `netclop --help` in fresh interpreters and list heavy modules it imports."""
+    code = (
+        "import sys\n"
+        "from netclop.cli.__main__ import netclop\n"
+        "try:\n"
+        "    netclop(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules), file=sys.stderr)\n"
+    )
+
+    wall = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        wall = min(wall, time.perf_counter() - start)
+
+    heavy = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else ""
+    return {"wall_s": wall, "heavy_modules": [module for module in heavy.split(",") if module]}
@@ -0,0 +1,121 @@
+"""Synthetic inputs with planted structure for benchmarking."""
+from dataclasses import dataclass
+from os import PathLike
+
+import h3.api.numpy_int as h3
+import numpy as np
+
+from netclop.constants import SEED
+from netclop.typing import Node, Partition
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Size of a synthetic benchmark problem."""
+    nodes: int = 500
+    particles: int = 100_000
+    replicates: int = 50
+    cores: int = 5
+    res: int = 5
+    leak: float = 0.05
+    noise: float = 0.1
+    seed: int = SEED
+
+
+def make_cells(scale: Scale, lat: float = 44.0, lng: float = -63.0) -> np.ndarray:
+    """Make a contiguous domain of at least the requested number of H3 cells."""
+    center = h3.latlng_to_cell(lat, lng, scale.res)
+    k = 0
+    while 3 * k * (k + 1) + 1 < scale.nodes:
+        k += 1
+    cells = np.array(sorted(h3.grid_disk(center, k)), dtype=np.int64)
+
+    # Keep the cells closest to the center so the domain stays contiguous
+    distances = np.array([h3.grid_distance(center, cell) for cell in cells])
+    return cells[np.argsort(distances, kind="stable")[:scale.nodes]]
+
+
+def plant_cores(cells: np.ndarray, scale: Scale) -> np.ndarray:
+    """Assign cells to planted cores as longitudinal bands, returning core labels from zero."""
+    lngs = np.array([h3.cell_to_latlng(cell)[1] for cell in cells])
+    ranks = np.argsort(np.argsort(lngs, kind="stable"), kind="stable")
+    return (ranks * scale.cores // len(cells)).astype(np.int32)
+
+
+def make_lpt(path: PathLike, scale: Scale) -> None:
+    """Write an LPT position file whose particles mostly stay within planted cores."""
+    rng = np.random.default_rng(scale.seed)
+    cells = make_cells(scale)
+    cores = plant_cores(cells, scale)
+    centers = np.array([h3.cell_to_latlng(cell) for cell in cells])
+    jitter = 0.1 * h3.average_hexagon_edge_length(scale.res, unit="km") / 111
+
+    src = rng.integers(0, len(cells), size=scale.particles)
+
+    # Particles land in a random cell of their source core, or anywhere when leaking
+    tgt = rng.integers(0, len(cells), size=scale.particles)
+    stay = rng.uniform(size=scale.particles) >= scale.leak
+    members = [np.flatnonzero(cores == core) for core in range(scale.cores)]
+    for core, member_cells in enumerate(members):
+        in_core = stay & (cores[src] == core)
+        tgt[in_core] = rng.choice(member_cells, size=in_core.sum())
+
+    positions = np.column_stack([
+        centers[src, 1], centers[src, 0], centers[tgt, 1], centers[tgt, 0],
+    ]) + rng.uniform(-jitter, jitter, size=(scale.particles, 4))
+    np.savetxt(path, positions, delimiter=",", fmt="%.6f")
+
+
+def make_partitions(scale: Scale) -> list[Partition]:
+    """
+    Make a partition ensemble with planted cores.
+
+    A fixed fraction of nodes, given by the noise level, is unstable and assigned to a random module in each
+    partition. The remaining nodes of each planted core share a module in every partition, which occasionally
+    merges a pair of cores, so the planted cores are robust at any significance level.
+    """
+    rng = np.random.default_rng(scale.seed)
+    cells = make_cells(scale)
+    cores = plant_cores(cells, scale)
+    nodes: list[Node] = [str(cell) for cell in cells]
+    unstable = _unstable_nodes(scale)
+
+    partitions = []
+    for _ in range(scale.replicates):
+        labels = cores.copy()
+        if scale.cores > 1 and rng.uniform() < 0.5:
+            a, b = rng.choice(scale.cores, size=2, replace=False)
+            labels[labels == b] = a
+
+        labels[unstable] = rng.integers(0, scale.cores, size=unstable.sum())
+
+        partition = [set() for _ in range(scale.cores)]
+        for node, label in zip(nodes, labels):
+            partition[label].add(node)
+        partitions.append([module for module in partition if module])
+    return partitions
+
+
+def planted_cores(scale: Scale) -> Partition:
+    """Stable nodes of each planted core of the partition ensemble, which significance clustering should recover."""
+    cells = make_cells(scale)
+    cores = plant_cores(cells, scale)
+    unstable = _unstable_nodes(scale)
+    return [set(str(cell) for cell in cells[(cores == core) & ~unstable]) for core in range(scale.cores)]
+
+
+def check_cores(cores: Partition, scale: Scale) -> None:
+    """Check that cores are the planted ones, so benchmarks do not time a degenerate search."""
+    found = set(frozenset(core) for core in cores)
+    planted = set(frozenset(core) for core in planted_cores(scale))
+    if found != planted:
+        raise AssertionError(
+            f"Found {len(found)} cores of sizes {sorted(map(len, found), reverse=True)} rather than the "
+            f"{len(planted)} planted of sizes {sorted(map(len, planted), reverse=True)}."
+        )
+
+
+def _unstable_nodes(scale: Scale) -> np.ndarray:
+    """Mask of the nodes assigned at random in each partition."""
+    rng = np.random.default_rng([scale.seed, 1])
+    return rng.uniform(size=scale.nodes) < scale.noise
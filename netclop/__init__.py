@@ -1,6 +1,23 @@
 """Package initialization."""
-from .ensemble.ensemble import NetworkEnsemble
-from .ensemble.sigclu import SigClu
-from .ensemble.upsetplot import UpSetPlot
-from .geo.net import GeoNet
-from .geo.plot import GeoPlot
+from importlib import import_module
+
+# Public classes are imported on first access so the CLI starts without the scientific stack
+_exports = {
+    "NetworkEnsemble": "netclop.ensemble.ensemble",
+    "SigClu": "netclop.ensemble.sigclu",
+    "UpSetPlot": "netclop.ensemble.upsetplot",
+    "GeoNet": "netclop.geo.net",
+    "GeoPlot": "netclop.geo.plot",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str):
+    if name in _exports:
+        return getattr(import_module(_exports[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
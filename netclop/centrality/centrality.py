@@ -1,9 +1,10 @@
 """Node centrality handling."""
 from dataclasses import dataclass, field
 from enum import Flag, auto
+from functools import cached_property
+from importlib import import_module
 from typing import Callable
 
-from netclop.centrality.centrality_compute import *
 from netclop.typing import NodeMetric
 
 
@@ -16,9 +17,17 @@ class CentralityScale(Flag):
 @dataclass
 class CentralityIndex:
     """Class to encapsulate centrality index."""
-    compute: Callable[..., NodeMetric]
+    target: Callable[..., NodeMetric] | str
     scale: CentralityScale
 
+    @cached_property
+    def compute(self) -> Callable[..., NodeMetric]:
+        """Compute function, imported on first use when the target is given as 'module:function'."""
+        if isinstance(self.target, str):
+            module, name = self.target.split(":")
+            return getattr(import_module(module), name)
+        return self.target
+
 
 @dataclass
 class CentralityRegistry:
@@ -26,16 +35,17 @@ class CentralityRegistry:
     _registry_map: dict[str, CentralityIndex] = field(default_factory=dict)
 
     def __post_init__(self):
-        self.register("out-degree", nx.out_degree_centrality, CentralityScale.SEQUENTIAL)
-        self.register("in-degree", nx.in_degree_centrality, CentralityScale.SEQUENTIAL),
-        self.register("out-strength", out_strength, CentralityScale.SEQUENTIAL),
-        self.register("in-strength", in_strength, CentralityScale.SEQUENTIAL),
-        self.register("betweenness", nx.betweenness_centrality, CentralityScale.SEQUENTIAL),
-        self.register("pagerank", nx.pagerank, CentralityScale.SEQUENTIAL),
-        self.register("excess", excess, CentralityScale.DIVERGING),
-
-    def register(self, name: str, compute: Callable[..., NodeMetric], scale: CentralityScale) -> None:
-        """Add CentralityIndex to the registry."""
+        compute = "netclop.centrality.centrality_compute"
+        self.register("out-degree", "networkx:out_degree_centrality", CentralityScale.SEQUENTIAL)
+        self.register("in-degree", "networkx:in_degree_centrality", CentralityScale.SEQUENTIAL),
+        self.register("out-strength", f"{compute}:out_strength", CentralityScale.SEQUENTIAL),
+        self.register("in-strength", f"{compute}:in_strength", CentralityScale.SEQUENTIAL),
+        self.register("betweenness", "networkx:betweenness_centrality", CentralityScale.SEQUENTIAL),
+        self.register("pagerank", "networkx:pagerank", CentralityScale.SEQUENTIAL),
+        self.register("excess", f"{compute}:excess", CentralityScale.DIVERGING),
+
+    def register(self, name: str, compute: Callable[..., NodeMetric] | str, scale: CentralityScale) -> None:
+        """Add CentralityIndex to the registry, where compute may be given lazily as 'module:function'."""
         self._registry_map[name] = CentralityIndex(compute, scale)
 
     def get(self, name: str) -> CentralityIndex:
@@ -1,11 +1,33 @@
 """Command line interface."""
 from netclop.cli.commands import *
+from netclop.profiler import Profiler, set_profiler
 
 
 @click.group()
-def netclop():
+@click.option(
+    "--profile",
+    type=click.Choice(Profiler.modes, case_sensitive=False),
+    default=None,
+    help="Profile the command, writing per-stage profiles and a hotspot summary to the run's output directory.",
+)
+@click.option(
+    "--profile-top",
+    type=click.IntRange(min=1),
+    default=25,
+    show_default=True,
+    help="Number of hotspots per stage in the profile summary.",
+)
+@click.pass_context
+def netclop(ctx, profile, profile_top):
     """Network clustering operations."""
-    pass
+    if profile is not None:
+        profiler = Profiler(profile, top=profile_top)
+        set_profiler(profiler)
+        profiler.start()
+        ctx.call_on_close(profiler.stop)
 
 
 netclop.add_command(rsc)
+netclop.add_command(sigclu)
+netclop.add_command(sweep)
+netclop.add_command(worker)
@@ -1,55 +1,193 @@
 """Commands for the CLI."""
-from importlib.metadata import version
 import warnings
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 import click
 
 from netclop.centrality.centrality import centrality_registry
+from netclop.config import (
+    GeoNetConfig,
+    HierarchicalSigCluConfig,
+    NetworkEnsembleConfig,
+    SigCluConfig,
+    SlidingWindowConfig,
+    SparsifyConfig,
+    SweepConfig,
+    UpSetPlotConfig,
+    WorkQueueConfig,
+)
 from netclop.constants import SEED
-from netclop.ensemble.ensemble import NetworkEnsemble
-from netclop.ensemble.sigclu import SigClu
-from netclop.ensemble.upsetplot import UpSetPlot
-from netclop.geo import GeoNet, GeoPlot
-from netclop.log import Logger
 from netclop.cli.files import make_run_id, make_filepath
 
+# Pipeline stages import the scientific and plotting stack, so they are imported only by the commands that run them
+if TYPE_CHECKING:
+    from netclop.cli.output import OutputExecutor
+    from netclop.ensemble.ensemble import NetworkEnsemble
+    from netclop.geo.plot import GeoPlot
+    from netclop.log import Logger
+
 warnings.simplefilter(action="ignore", category=FutureWarning)
 
 
+def add_options(options: list):
+    """Apply a shared group of click options to a command."""
+    def decorator(func):
+        for option in reversed(options):
+            func = option(func)
+        return func
+    return decorator
+
+
+run_options = add_options([
+    click.option(
+        "--output-dir",
+        "-o",
+        type=click.Path(file_okay=False, writable=True),
+        required=True,
+        help="Output directory.",
+    ),
+    click.option(
+        "--seed",
+        "-s",
+        show_default=True,
+        type=click.IntRange(min=1, max=None),
+        default=SEED,
+        help="Random seed.",
+    ),
+])
+
+sigclu_options = add_options([
+    click.option(
+        "--sig",
+        type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+        show_default=True,
+        default=SigCluConfig.sig,
+        help="Significance level for significance clustering.",
+    ),
+    click.option(
+        "--cooling-rate",
+        type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+        show_default=True,
+        default=SigCluConfig.cooling_rate,
+        help="Simulated annealing temperature cooling rate.",
+    ),
+    click.option(
+        "--min-core-size",
+        type=click.IntRange(min=1),
+        show_default=True,
+        default=SigCluConfig.min_core_size,
+        help="Minimum core size.",
+    ),
+    click.option(
+        "--initialize-peel/--initialize-all",
+        is_flag=True,
+        show_default=True,
+        default=SigCluConfig.initialize_peel,
+        help="Starts core searches from greedily peeled stable nodes rather than all nodes; may find other cores.",
+    ),
+    click.option(
+        "--prune/--no-prune",
+        is_flag=True,
+        show_default=True,
+        default=SigCluConfig.prune,
+        help="Splits core searches over components of stably co-assigned nodes.",
+    ),
+    click.option(
+        "--num-workers",
+        "-j",
+        type=click.IntRange(min=1),
+        show_default=True,
+        default=SigCluConfig.num_workers,
+        help="Number of processes to search components for cores and compare partitions over.",
+    ),
+])
+
+output_options = add_options([
+    click.option(
+        "--background-output/--foreground-output",
+        is_flag=True,
+        show_default=True,
+        default=True,
+        help="Renders and writes plots and files in the background while computation continues.",
+    ),
+])
+
+geo_options = add_options([
+    click.option(
+        "--dissolve/--cells",
+        is_flag=True,
+        show_default=True,
+        default=False,
+        help="Draws each core as merged polygons rather than a polygon per cell on the structure map.",
+    ),
+    click.option(
+        "--simplify",
+        type=click.FloatRange(min=0),
+        default=None,
+        help="Tolerance in degrees to simplify dissolved cores by, keeping shared boundaries intact.",
+    ),
+    click.option(
+        "--html/--no-html",
+        is_flag=True,
+        show_default=True,
+        default=False,
+        help="Saves an interactive map of structure and centrality layers with compact shared geometry.",
+    ),
+])
+
+upset_options = add_options([
+    click.option(
+        "--plot-stability/--hide-stability",
+        "plot_stability",
+        is_flag=True,
+        show_default=True,
+        default=UpSetPlotConfig.plot_stability,
+        help="Plots stability bars on the UpSet plot.",
+    ),
+    click.option(
+        "--norm-counts/--abs-counts",
+        "norm_counts",
+        is_flag=True,
+        show_default=True,
+        default=UpSetPlotConfig.norm_counts,
+        help="Shows normalized or absolute counts on the UpSet plot.",
+    ),
+])
+
+
 @click.command(name="rsc")
 @click.argument(
     "paths",
     type=click.Path(exists=True, dir_okay=False, readable=True),
     nargs=-1,
 )
+@run_options
 @click.option(
-    "--output-dir",
-    "-o",
-    type=click.Path(file_okay=False, writable=True),
-    required=True,
-    help="Output directory.",
-)
-@click.option(
-    "--seed",
-    "-s",
+    "--res",
+    type=click.IntRange(min=0, max=15),
+    default=GeoNetConfig.res,
     show_default=True,
-    type=click.IntRange(min=1, max=None),
-    default=SEED,
-    help="Random seed.",
+    help="H3 grid resolution for domain discretization.",
 )
 @click.option(
-    "--res",
+    "--coarse-res",
     type=click.IntRange(min=0, max=15),
-    default=GeoNet.Config.res,
+    multiple=True,
+    help="Coarser H3 resolutions to cluster first, restricting core searches at finer resolutions.",
+)
+@click.option(
+    "--boundary-band",
+    type=click.IntRange(min=0),
+    default=HierarchicalSigCluConfig.boundary_band,
     show_default=True,
-    help="H3 grid resolution for domain discretization.",
+    help="Grid distance around coarse cores included in finer core searches.",
 )
 @click.option(
     "--markov-time",
     "-mt",
     type=click.FloatRange(min=0, max=None, min_open=True),
-    default=NetworkEnsemble.Config.im_markov_time,
+    default=NetworkEnsembleConfig.im_markov_time,
     show_default=True,
     help="Markov time to tune spatial scale of detected structure.",
 )
@@ -57,52 +195,53 @@ warnings.simplefilter(action="ignore", category=FutureWarning)
     "--variable-markov-time/--static-markov-time",
     is_flag=True,
     show_default=True,
-    default=NetworkEnsemble.Config.im_variable_markov_time,
+    default=NetworkEnsembleConfig.im_variable_markov_time,
     help="Permits the dynamic adjustment of Markov time with varying density.",
 )
 @click.option(
     "--num-trials",
     show_default=True,
-    default=NetworkEnsemble.Config.im_num_trials,
+    default=NetworkEnsembleConfig.im_num_trials,
     help="Number of outer-loop community detection trials to run.",
 )
 @click.option(
-    "--sig",
-    type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+    "--num-bootstraps",
+    type=click.IntRange(min=1),
     show_default=True,
-    default=SigClu.Config.sig,
-    help="Significance level for significance clustering.",
+    default=NetworkEnsembleConfig.num_bootstraps,
+    help="Number of bootstrapped networks, or their maximum when adaptive.",
 )
 @click.option(
-    "--cooling-rate",
-    type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+    "--adaptive/--fixed",
+    is_flag=True,
     show_default=True,
-    default=SigClu.Config.cooling_rate,
-    help="Simulated annealing temperature cooling rate.",
+    default=NetworkEnsembleConfig.adaptive,
+    help="Bootstraps in batches until node co-assignment frequencies converge.",
 )
 @click.option(
-    "--min-core-size",
-    type=click.IntRange(min=1),
+    "--adaptive-tol",
+    type=click.FloatRange(min=0, max=1, min_open=True),
     show_default=True,
-    default=SigClu.Config.min_core_size,
-    help="Minimum core size.",
+    default=NetworkEnsembleConfig.adaptive_tol,
+    help="Largest change in co-assignment frequency between batches at which bootstrapping stops.",
 )
 @click.option(
-    "--plot-stability/--hide-stability",
-    "plot_stability",
-    is_flag=True,
+    "--bootstrap-block-size",
+    type=click.IntRange(min=1),
     show_default=True,
-    default=UpSetPlot.Config.plot_stability,
-    help="Plots stability bars on the UpSet plot.",
+    default=NetworkEnsembleConfig.bootstrap_block_size,
+    help="Number of bootstrapped networks whose edge weights are drawn at once.",
 )
 @click.option(
-    "--norm-counts/--abs-counts",
-    "norm_counts",
-    is_flag=True,
-    show_default=True,
-    default=UpSetPlot.Config.norm_counts,
-    help="Shows normalized or absolute counts on the UpSet plot.",
+    "--bootstrap-spill-dir",
+    type=click.Path(file_okay=False, writable=True),
+    default=NetworkEnsembleConfig.bootstrap_spill_dir,
+    help="Directory in which bootstrapped edge weights are kept as memory-mapped files instead of in memory.",
 )
+@sigclu_options
+@upset_options
+@geo_options
+@output_options
 @click.option(
     "--centrality",
     "-c",
@@ -110,70 +249,517 @@ warnings.simplefilter(action="ignore", category=FutureWarning)
     multiple=True,
     help="Node centrality indices to compute and plot."
 )
+@click.option(
+    "--save-partitions/--discard-partitions",
+    is_flag=True,
+    show_default=True,
+    default=False,
+    help="Saves the partition ensemble for reuse with the sigclu command.",
+)
+@click.option(
+    "--min-edge-weight",
+    type=click.FloatRange(min=0),
+    show_default=True,
+    default=SparsifyConfig.min_edge_weight,
+    help="Minimum weight of edges kept before partitioning.",
+)
+@click.option(
+    "--min-node-strength",
+    type=click.FloatRange(min=0),
+    show_default=True,
+    default=SparsifyConfig.min_node_strength,
+    help="Minimum total in- and out-weight of nodes kept before partitioning.",
+)
+@click.option(
+    "--self-loops/--no-self-loops",
+    is_flag=True,
+    show_default=True,
+    default=SparsifyConfig.self_loops,
+    help="Keeps edges from a node to itself.",
+)
+@click.option(
+    "--largest-scc/--all-components",
+    is_flag=True,
+    show_default=True,
+    default=SparsifyConfig.largest_scc,
+    help="Restricts networks to their largest strongly connected component before partitioning.",
+)
+@click.option(
+    "--bbox",
+    type=float,
+    nargs=4,
+    default=GeoNetConfig.bbox,
+    metavar="MIN_LNG MIN_LAT MAX_LNG MAX_LAT",
+    help="Bounding box that both endpoints of a particle must lie in.",
+)
+@click.option(
+    "--mask",
+    type=click.Path(exists=True, dir_okay=False, readable=True),
+    default=GeoNetConfig.mask,
+    help="Polygon file (e.g. GeoJSON or shapefile) that both endpoints of a particle must lie in.",
+)
+@click.option(
+    "--cell-allowlist",
+    type=click.Path(exists=True, dir_okay=False, readable=True),
+    default=GeoNetConfig.cells,
+    help="File of allowlisted H3 cells, one per line, that both endpoints of a particle must lie in.",
+)
+@click.option(
+    "--prefetch",
+    type=click.IntRange(min=0),
+    show_default=True,
+    default=GeoNetConfig.prefetch,
+    help="Number of LPT files read ahead on background threads during binning; at most this many plus two are held.",
+)
+@click.option(
+    "--window-dir",
+    type=click.Path(file_okay=False, writable=True),
+    default=None,
+    help="State directory of a sliding window that aggregates LPT files into one network, ingesting only new files.",
+)
+@click.option(
+    "--window-size",
+    type=click.IntRange(min=1),
+    default=SlidingWindowConfig.size,
+    help="Number of newest files the sliding window keeps, adding the given files to those already in it.",
+)
+@click.option(
+    "--queue-dir",
+    type=click.Path(file_okay=False, writable=True),
+    default=None,
+    help="Shared directory to queue partitioning of bootstrapped networks for `netclop worker` processes.",
+)
+@click.option(
+    "--similarity/--no-similarity",
+    is_flag=True,
+    show_default=True,
+    default=False,
+    help="Compares pairs of partitions by NMI and ARI to diagnose ensemble convergence.",
+)
 def rsc(
     paths,
     output_dir,
     res,
+    coarse_res,
+    boundary_band,
     markov_time,
     variable_markov_time,
     num_trials,
+    num_bootstraps,
+    adaptive,
+    adaptive_tol,
+    bootstrap_block_size,
+    bootstrap_spill_dir,
     seed,
     sig,
     cooling_rate,
     min_core_size,
+    initialize_peel,
+    prune,
+    num_workers,
     plot_stability,
     norm_counts,
+    dissolve,
+    simplify,
+    html,
+    background_output,
     centrality,
+    save_partitions,
+    min_edge_weight,
+    min_node_strength,
+    self_loops,
+    largest_scc,
+    bbox,
+    mask,
+    cell_allowlist,
+    prefetch,
+    window_dir,
+    window_size,
+    queue_dir,
+    similarity,
 ):
     """Run recursive significance clustering from LPT simulations."""
-    # Set up run and logging
-    run_id = make_run_id(seed, sig)
-    path = Path(output_dir) / run_id
-    logger = Logger(path=make_filepath(path, extension="log"))
-    logger.log(f"<y>netclop v{version("netclop")}: run {run_id}</y>")
+    from netclop.cli.output import OutputExecutor
+    from netclop.ensemble.ensemble import NetworkEnsemble
+    from netclop.ensemble.queue import WorkQueue
+    from netclop.ensemble.sparsify import Sparsifier
+    from netclop.geo.hierarchy import HierarchicalSigClu
+    from netclop.geo.net import GeoNet
+    from netclop.geo.window import SlidingWindow
+
+    if any(r >= res for r in coarse_res):
+        raise click.UsageError(f"--coarse-res must be coarser than --res {res}.")
+    if coarse_res and window_dir is not None:
+        raise click.UsageError("--window-dir cannot be combined with --coarse-res.")
+    if coarse_res and queue_dir is not None:
+        raise click.UsageError("--queue-dir cannot be combined with --coarse-res.")
+    if queue_dir is not None and len(paths) > 1 and window_dir is None:
+        raise click.UsageError("--queue-dir requires a single LPT path or --window-dir.")
+    if queue_dir is not None and adaptive:
+        raise click.UsageError("--queue-dir cannot be combined with --adaptive.")
+    if window_size is not None and window_dir is None:
+        raise click.UsageError("--window-size requires --window-dir.")
+
+    path, logger = start_run(output_dir, seed, sig)
     logger.log(f"LPT paths {paths}", level="DEBUG")
-    logger.log(f"output path '{output_dir}'", level="DEBUG")
 
-    # Make networks from LPT
-    net = GeoNet(res=res, logger=logger).from_lpt(paths)
+    geonet_options = {"bbox": bbox, "mask": mask, "cells": cell_allowlist}
+    sparsify_options = {
+        "min_edge_weight": min_edge_weight,
+        "min_node_strength": min_node_strength,
+        "self_loops": self_loops,
+        "largest_scc": largest_scc,
+    }
+    sparsify = Sparsifier(logger=logger, **sparsify_options).is_active()
+    ne_options = {
+        "seed": seed,
+        "im_markov_time": markov_time,
+        "im_variable_markov_time": variable_markov_time,
+        "im_num_trials": num_trials,
+        "num_bootstraps": num_bootstraps,
+        "adaptive": adaptive,
+        "adaptive_tol": adaptive_tol,
+        "bootstrap_block_size": bootstrap_block_size,
+        "bootstrap_spill_dir": bootstrap_spill_dir,
+    }
+    sc_options = {
+        "seed": seed,
+        "sig": sig,
+        "cooling_rate": cooling_rate,
+        "min_core_size": min_core_size,
+        "initialize_peel": initialize_peel,
+        "prune": prune,
+        "num_workers": num_workers,
+    }
+    upset_config = {
+        "path": make_filepath(path, "upset"),
+        "plot_stability": plot_stability,
+        "norm_counts": norm_counts,
+        "sig": sig,
+    }
+    with OutputExecutor(logger, background=background_output) as outputs:
+        if coarse_res:
+            # Significance cluster coarse to fine
+            geonet = GeoNet(res=res, logger=logger, prefetch=prefetch, **geonet_options)
+            nets = geonet.from_lpt_multires(paths, [*coarse_res, res])
+            hsc = HierarchicalSigClu(
+                nets,
+                logger=logger,
+                ne_options=ne_options,
+                sc_options=sc_options,
+                sparsify_options=sparsify_options if sparsify else None,
+                boundary_band=boundary_band,
+            )
+            hsc.run()
+            ne = hsc.ensemble
+            if save_partitions:
+                ne.save_partitions(make_filepath(path, "partitions", "npy"))
+        else:
+            # Make networks from LPT
+            if window_dir is not None:
+                window = SlidingWindow(
+                    window_dir,
+                    logger=logger,
+                    geonet_options=geonet_options | {"prefetch": prefetch},
+                    res=res,
+                    size=window_size,
+                )
+                net = window.update(paths) if window_size is None else window.push(*paths)
+            else:
+                net = GeoNet(res=res, logger=logger, prefetch=prefetch, **geonet_options).from_lpt(paths)
 
-    # Significance cluster network ensemble
-    ne = NetworkEnsemble(
-        net,
-        seed=seed,
-        im_markov_time=markov_time,
-        im_variable_markov_time=variable_markov_time,
-        im_num_trials=num_trials,
-        logger=logger,
-    )
+            # Significance cluster network ensemble
+            ne = NetworkEnsemble(net, logger=logger, **ne_options)
+            if sparsify:
+                ne.sparsify(**sparsify_options)
+            if queue_dir is not None:
+                WorkQueue(queue_dir, logger=logger).partition(ne)
+            if save_partitions:
+                if ne.partitions is None:
+                    ne.partition()
+                ne.save_partitions(make_filepath(path, "partitions", "npy"))
+
+            ne.sigclu(**sc_options)
+        outputs.submit("upset plot", ne.upset, **upset_config)
+
+        if similarity:
+            ne.similarity(num_workers=num_workers).to_csv(make_filepath(path, "similarity", "csv"), index=False)
+
+        gp = plot_cores(ne, path, logger, outputs, dissolve=dissolve, tolerance=simplify)
+
+        # Plot centrality
+        metrics = dict()
+        if len(centrality) > 0:
+            logger.log("Computing and plotting node centrality indices.")
+            for index in logger.pbar(centrality):
+                with logger.stage(f"centrality {index}", items=len(ne.nodes), unit="nodes"):
+                    metrics[index] = ne.node_centrality(index)
+                outputs.submit(
+                    f"centrality {index} plot",
+                    plot_centrality,
+                    gp,
+                    metrics[index],
+                    index,
+                    make_filepath(path, f"c_{index.replace('-', '')}"),
+                    logger,
+                )
+
+        if html:
+            outputs.submit("interactive map", save_html, gp, metrics, make_filepath(path, "map", "html"), logger)
+        outputs.submit("node list", save_nodelist, ne, metrics, make_filepath(path, extension="csv"), logger)
+
+
+@click.command(name="sigclu")
+@click.argument(
+    "partitions",
+    type=click.Path(exists=True, dir_okay=False, readable=True),
+)
+@run_options
+@sigclu_options
+@upset_options
+@geo_options
+@output_options
+def sigclu(
+    partitions,
+    output_dir,
+    seed,
+    sig,
+    cooling_rate,
+    min_core_size,
+    initialize_peel,
+    prune,
+    num_workers,
+    plot_stability,
+    norm_counts,
+    dissolve,
+    simplify,
+    html,
+    background_output,
+):
+    """Run significance clustering on a saved partition ensemble."""
+    from netclop.cli.output import OutputExecutor
+    from netclop.ensemble.ensemble import NetworkEnsemble
+
+    path, logger = start_run(output_dir, seed, sig)
+    logger.log(f"partitions path '{partitions}'", level="DEBUG")
+
+    ne = NetworkEnsemble([], seed=seed, logger=logger)
+    ne.load_partitions(partitions)
     ne.sigclu(
         seed=seed,
         sig=sig,
         cooling_rate=cooling_rate,
         min_core_size=min_core_size,
-        upset_config={
-            "path": make_filepath(path, "upset"),
-            "plot_stability": plot_stability,
-            "norm_counts": norm_counts,
-        },
+        initialize_peel=initialize_peel,
+        prune=prune,
+        num_workers=num_workers,
     )
 
-    # Plot structure
-    logger.log("Plotting spatially-embedded cores.")
+    with OutputExecutor(logger, background=background_output) as outputs:
+        outputs.submit(
+            "upset plot",
+            ne.upset,
+            path=make_filepath(path, "upset"),
+            plot_stability=plot_stability,
+            norm_counts=norm_counts,
+            sig=sig,
+        )
+        gp = plot_cores(ne, path, logger, outputs, dissolve=dissolve, tolerance=simplify)
+        if html:
+            outputs.submit("interactive map", save_html, gp, None, make_filepath(path, "map", "html"), logger)
+        outputs.submit("node list", save_nodelist, ne, None, make_filepath(path, extension="csv"), logger)
+
+
+@click.command(name="worker")
+@click.argument(
+    "queue_dir",
+    type=click.Path(file_okay=False),
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0, min_open=True),
+    show_default=True,
+    default=WorkQueueConfig.poll_interval,
+    help="Seconds between checks for work.",
+)
+def worker(queue_dir, poll_interval):
+    """Partition bootstrapped networks queued by `rsc --queue-dir` until all are done."""
+    import time
+
+    from netclop.ensemble.queue import WorkQueue
+    from netclop.log import Logger
+
+    logger = Logger()
+    queue = WorkQueue(queue_dir, logger=logger, poll_interval=poll_interval)
+    logger.log(f"Worker {queue.worker_id} waiting for work in '{queue_dir}'")
+    while not queue.is_ready():
+        time.sleep(poll_interval)
+
+    num_processed = queue.work(wait=True)
+    logger.log(f"Worker {queue.worker_id} processed {num_processed} of {queue.num_units} units")
+
+
+@click.command(name="sweep")
+@click.argument(
+    "paths",
+    type=click.Path(exists=True, dir_okay=False, readable=True),
+    nargs=-1,
+)
+@run_options
+@click.option(
+    "--res",
+    type=click.IntRange(min=0, max=15),
+    multiple=True,
+    default=[GeoNetConfig.res],
+    show_default=True,
+    help="H3 grid resolutions to sweep.",
+)
+@click.option(
+    "--markov-time",
+    "-mt",
+    type=click.FloatRange(min=0, max=None, min_open=True),
+    multiple=True,
+    default=[NetworkEnsembleConfig.im_markov_time],
+    show_default=True,
+    help="Markov times to sweep.",
+)
+@click.option(
+    "--variable-markov-time/--static-markov-time",
+    is_flag=True,
+    show_default=True,
+    default=NetworkEnsembleConfig.im_variable_markov_time,
+    help="Permits the dynamic adjustment of Markov time with varying density.",
+)
+@click.option(
+    "--num-trials",
+    show_default=True,
+    default=NetworkEnsembleConfig.im_num_trials,
+    help="Number of outer-loop community detection trials to run.",
+)
+@click.option(
+    "--sig",
+    type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+    multiple=True,
+    default=[SigCluConfig.sig],
+    show_default=True,
+    help="Significance levels to sweep.",
+)
+@click.option(
+    "--cooling-rate",
+    type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+    show_default=True,
+    default=SigCluConfig.cooling_rate,
+    help="Simulated annealing temperature cooling rate.",
+)
+@click.option(
+    "--min-core-size",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=[SigCluConfig.min_core_size],
+    show_default=True,
+    help="Minimum core sizes to sweep.",
+)
+@upset_options
+@click.option(
+    "--num-workers",
+    "-j",
+    type=click.IntRange(min=1),
+    show_default=True,
+    default=SweepConfig.num_workers,
+    help="Number of processes to fan out stages over.",
+)
+def sweep(
+    paths,
+    output_dir,
+    seed,
+    res,
+    markov_time,
+    variable_markov_time,
+    num_trials,
+    sig,
+    cooling_rate,
+    min_core_size,
+    plot_stability,
+    norm_counts,
+    num_workers,
+):
+    """Run recursive significance clustering over a parameter grid."""
+    from netclop.cli.sweep import Sweep
+
+    path, logger = start_run(output_dir, seed, min(sig))
+    logger.log(f"LPT paths {paths}", level="DEBUG")
+
+    Sweep(
+        paths,
+        path,
+        grid={
+            "res": sorted(set(res)),
+            "markov_time": sorted(set(markov_time)),
+            "sig": sorted(set(sig)),
+            "min_core_size": sorted(set(min_core_size)),
+        },
+        ne_options={
+            "im_variable_markov_time": variable_markov_time,
+            "im_num_trials": num_trials,
+        },
+        sc_options={"cooling_rate": cooling_rate},
+        upset_options={"plot_stability": plot_stability, "norm_counts": norm_counts},
+        logger=logger,
+        seed=seed,
+        num_workers=num_workers,
+    ).run()
+
+
+def start_run(output_dir: str, seed: int, sig: float) -> tuple[Path, "Logger"]:
+    """Set up run path and logging."""
+    from importlib.metadata import version
+
+    from netclop.log import Logger
+
+    run_id = make_run_id(seed, sig)
+    path = Path(output_dir) / run_id
+    logger = Logger(path=make_filepath(path, extension="log"))
+    logger.log(f"<y>netclop v{version("netclop")}: run {run_id}</y>")
+    logger.log(f"output path '{output_dir}'", level="DEBUG")
+    return path, logger
+
+
+def plot_cores(
+    ne: "NetworkEnsemble",
+    path: Path,
+    logger: "Logger",
+    outputs: "OutputExecutor",
+    **kwargs,
+) -> "GeoPlot":
+    """Plot spatially-embedded cores."""
+    from netclop.geo.plot import GeoPlot
+
     gp = GeoPlot.from_cores(ne.cores, ne.unstable_nodes)
-    gp.plot_structure(path=make_filepath(path, "geo"))
-
-    # Plot centrality
-    metrics = dict()
-    if len(centrality) > 0:
-        logger.log("Computing and plotting node centrality indices.")
-        for index in logger.pbar(centrality):
-            metrics[index] = ne.node_centrality(index)
-            gp.plot_centrality(
-                metrics[index],
-                index,
-                path=make_filepath(path, f"c_{index.replace('-', '')}")
-            )
+    outputs.submit("structure plot", plot_structure, gp, make_filepath(path, "geo"), logger, **kwargs)
+    return gp
+
+
+def plot_structure(gp: "GeoPlot", path: Path, logger: "Logger", **kwargs) -> None:
+    """Plot and save spatially-embedded cores."""
+    logger.log("Plotting spatially-embedded cores.")
+    with logger.stage("structure plot", items=len(gp.gdf), unit="nodes"):
+        gp.plot_structure(path=path, **kwargs)
+
+
+def plot_centrality(gp: "GeoPlot", metric: dict, index: str, path: Path, logger: "Logger") -> None:
+    """Plot and save a node centrality index."""
+    with logger.stage(f"centrality {index} plot", items=len(gp.gdf), unit="nodes"):
+        gp.plot_centrality(metric, index, path=path)
+
+
+def save_html(gp: "GeoPlot", metrics: Optional[dict], path: Path, logger: "Logger") -> None:
+    """Save the interactive map."""
+    logger.log("Saving interactive map.")
+    with logger.stage("interactive map", items=len(gp.gdf), unit="nodes"):
+        gp.save_html(path, metrics)
+
 
+def save_nodelist(ne: "NetworkEnsemble", metrics: Optional[dict], path: Path, logger: "Logger") -> None:
+    """Save the node list."""
     logger.log("Saving node list.")
-    ne.to_nodelist(metrics, path=make_filepath(path, extension="csv"))
+    ne.to_nodelist(metrics, path=path)
@@ -0,0 +1,67 @@
+"""Background rendering and writing of outputs."""
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Self
+
+from netclop.exceptions import OutputError
+from netclop.log import Logger
+
+
+class OutputExecutor:
+    """
+    Renders and writes outputs on a background thread while the pipeline continues.
+
+    Outputs run one at a time, in submission order, so figures and files of one run never compete with each other.
+    Failures are logged with their traceback as soon as they happen and raised together once all outputs have
+    finished, which happens on leaving the context. Without background, outputs run on submission.
+    """
+    def __init__(self, logger: Logger, background: bool = True):
+        self.logger = logger
+        self.background = background
+
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="output") if background else None
+        self._futures: list[tuple[str, Future]] = []
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        # Outputs are always awaited, but an error in the pipeline takes precedence over output errors
+        try:
+            self.wait()
+        except OutputError:
+            if exc_type is None:
+                raise
+
+    def submit(self, name: str, func: Callable, *args, **kwargs) -> None:
+        """Submit an output to render and write."""
+        if self._pool is None:
+            func(*args, **kwargs)
+            return
+
+        future = self._pool.submit(func, *args, **kwargs)
+        future.add_done_callback(lambda done: self._report(name, done))
+        self._futures.append((name, future))
+
+    def wait(self) -> None:
+        """Wait for all outputs, raising if any failed."""
+        if self._pool is None:
+            return
+
+        if self._futures:
+            self.logger.log(f"Waiting for {sum(not future.done() for _, future in self._futures)} outputs.")
+        self._pool.shutdown(wait=True)
+
+        failures = [(name, future.exception()) for name, future in self._futures if future.exception() is not None]
+        self._futures = []
+        if failures:
+            raise OutputError([name for name, _ in failures]) from failures[0][1]
+
+    def _report(self, name: str, future: Future) -> None:
+        """Log the failure of an output."""
+        exc = future.exception()
+        if exc is not None:
+            self.logger.log(
+                f"<r>Output '{name}' failed:</r> "
+                + "".join(traceback.format_exception(exc)).replace("<", r"\<"),
+            )
@@ -0,0 +1,237 @@
+"""Parameter sweeps sharing upstream pipeline stages."""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import product
+from os import PathLike
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+import networkx as nx
+import pandas as pd
+
+from netclop.cli.files import make_filepath
+from netclop.config import SweepConfig
+from netclop.ensemble.bootstrap import Bootstrap
+from netclop.ensemble.ensemble import NetworkEnsemble
+from netclop.geo import GeoNet, GeoPlot
+from netclop.log import Logger
+from netclop.typing import Partition
+
+type StageKey = tuple[str, tuple[tuple[str, Any], ...]]
+
+# Abbreviations of swept parameters in output file names
+PARAM_FIELDS = {"res": "res", "markov_time": "mt", "sig": "sig", "min_core_size": "mcs"}
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Node of the sweep stage dependency graph."""
+    name: str
+    params: tuple[tuple[str, Any], ...]
+    func: Callable = field(compare=False)
+    deps: tuple[StageKey, ...] = field(default=(), compare=False)
+    kwargs: dict = field(default_factory=dict, compare=False, hash=False)
+
+    @property
+    def key(self) -> StageKey:
+        return self.name, self.params
+
+    def __str__(self) -> str:
+        return f"{self.name} " + ", ".join(f"{name} {value}" for name, value in self.params)
+
+
+class Sweep:
+    """
+    Parameter sweep over the recursive significance clustering pipeline.
+
+    The sweep is decomposed into a stage dependency graph (net -> bootstrap -> partition -> sigclu) keyed by the
+    parameters each stage depends on, so every unique upstream stage runs once and downstream stages fan out. When
+    several resolutions are swept, positions are binned once at the finest and coarser networks derived from it.
+    """
+    Config = SweepConfig
+
+    def __init__(
+        self,
+        paths: Sequence[PathLike],
+        path: Path,
+        grid: dict[str, Sequence],
+        logger: Logger = None,
+        silent: bool = False,
+        ne_options: dict = None,
+        sc_options: dict = None,
+        upset_options: dict = None,
+        **config_options,
+    ):
+        self.logger = Logger(silent=silent) if logger is None else logger
+        self.cfg = self.Config(**config_options)
+
+        self.paths = paths
+        self.path = path
+        self.grid = grid
+        self.ne_options = {} if ne_options is None else ne_options
+        self.sc_options = {} if sc_options is None else sc_options
+        self.upset_options = upset_options
+
+        self.results: dict[StageKey, Any] = {}
+
+    def make_stages(self) -> list[Stage]:
+        """Build the stage dependency graph in topological order."""
+        do_bootstrap = len(self.paths) == 1
+        ne_options = {"seed": self.cfg.seed} | self.ne_options
+        sc_options = {"seed": self.cfg.seed} | self.sc_options
+
+        stages = []
+        binned = None
+        if len(self.grid["res"]) > 1:
+            # Bin once at the finest resolution and derive coarser networks from H3 parents
+            fine_res = max(self.grid["res"])
+            binned = Stage("bin", (("res", fine_res),), _bin, kwargs={"paths": self.paths, "res": fine_res})
+            stages.append(binned)
+
+        for res in self.grid["res"]:
+            if binned is None:
+                net = Stage("net", (("res", res),), _make_net, kwargs={"paths": self.paths, "res": res})
+            else:
+                net = Stage("net", (("res", res),), _coarsen, (binned.key,), {"res": res})
+            stages.append(net)
+
+            upstream = net
+            if do_bootstrap:
+                upstream = Stage("bootstrap", net.params, _bootstrap, (net.key,), {"ne_options": ne_options})
+                stages.append(upstream)
+
+            for markov_time in self.grid["markov_time"]:
+                partition = Stage(
+                    "partition",
+                    net.params + (("markov_time", markov_time),),
+                    _partition,
+                    (upstream.key,),
+                    {"ne_options": ne_options | {"im_markov_time": markov_time}},
+                )
+                stages.append(partition)
+
+                for sig, min_core_size in product(self.grid["sig"], self.grid["min_core_size"]):
+                    params = partition.params + (("sig", sig), ("min_core_size", min_core_size))
+                    stages.append(Stage(
+                        "sigclu",
+                        params,
+                        _sigclu,
+                        (partition.key,),
+                        {
+                            "path": self._make_leaf_path(params),
+                            "sc_options": sc_options | {"sig": sig, "min_core_size": min_core_size},
+                            "upset_options": self.upset_options,
+                        },
+                    ))
+        return stages
+
+    def run(self) -> None:
+        """Run every stage once, fanning out stages whose dependencies are met."""
+        stages = self.make_stages()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        num_leaves = sum(stage.name == "sigclu" for stage in stages)
+        self.logger.log(
+            f"Sweeping {num_leaves} configurations with {len(stages) - num_leaves} shared upstream stages: "
+            f"{self.cfg.num_workers} worker{"s" if self.cfg.num_workers > 1 else ""}"
+        )
+
+        # Count dependents so upstream results can be released once consumed
+        num_dependents = {stage.key: 0 for stage in stages}
+        for stage in stages:
+            for dep in stage.deps:
+                num_dependents[dep] += 1
+
+        pbar = self.logger.make_pbar(total=len(stages), desc="Sweep", unit="stage")
+        if self.cfg.num_workers > 1:
+            self._run_parallel(stages, num_dependents, pbar)
+        else:
+            for stage in stages:
+                self._finish(stage, stage.func(*self._dep_results(stage), **stage.kwargs), num_dependents, pbar)
+        self.logger.close_pbar(pbar)
+
+    def _run_parallel(self, stages: list[Stage], num_dependents: dict[StageKey, int], pbar) -> None:
+        """Run stages on a process pool as soon as their dependencies finish."""
+        remaining = list(stages)
+        pending = {}
+        with ProcessPoolExecutor(max_workers=self.cfg.num_workers) as pool:
+            while remaining or pending:
+                ready = [stage for stage in remaining if all(dep in self.results for dep in stage.deps)]
+                for stage in ready:
+                    remaining.remove(stage)
+                    future = pool.submit(stage.func, *self._dep_results(stage), **stage.kwargs)
+                    pending[future] = stage
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._finish(pending.pop(future), future.result(), num_dependents, pbar)
+
+    def _finish(self, stage: Stage, result: Any, num_dependents: dict[StageKey, int], pbar) -> None:
+        """Record a stage result and release upstream results that are no longer needed."""
+        self.logger.log(f"Finished {stage}", level="DEBUG")
+        self.logger.update_pbar(pbar)
+
+        if num_dependents[stage.key] > 0 or stage.name == "sigclu":
+            self.results[stage.key] = result
+        for dep in stage.deps:
+            num_dependents[dep] -= 1
+            if num_dependents[dep] == 0:
+                del self.results[dep]
+
+    def _dep_results(self, stage: Stage) -> list:
+        """Get the results of stage dependencies."""
+        return [self.results[dep] for dep in stage.deps]
+
+    def _make_leaf_path(self, params: tuple[tuple[str, Any], ...]) -> Path:
+        """Make output path for a sweep configuration."""
+        fields = "_".join(f"{PARAM_FIELDS[name]}{value}" for name, value in params)
+        return self.path.with_name(self.path.name + "_" + fields)
+
+
+def _make_net(paths: Sequence[PathLike], res: int) -> nx.DiGraph | list[nx.DiGraph]:
+    """Construct networks from LPT."""
+    return GeoNet(res=res, silent=True).from_lpt(paths)
+
+
+def _bin(paths: Sequence[PathLike], res: int) -> list[pd.DataFrame]:
+    """Count cell transitions from LPT."""
+    geonet = GeoNet(res=res, silent=True)
+    return [geonet.make_lpt_edge_counts(path) for path in paths]
+
+
+def _coarsen(counts: list[pd.DataFrame], res: int) -> nx.DiGraph | list[nx.DiGraph]:
+    """Construct networks from cell transitions coarsened to a resolution."""
+    nets = [GeoNet.net_from_edge_counts(GeoNet.coarsen_edge_counts(count, res)) for count in counts]
+    return nets[0] if len(nets) == 1 else nets
+
+
+def _bootstrap(net: nx.DiGraph, ne_options: dict) -> Bootstrap:
+    """Resample a network."""
+    ne = NetworkEnsemble(net, silent=True, **ne_options)
+    ne.bootstrap(net)
+    return ne.bootstraps
+
+
+def _partition(nets: nx.DiGraph | list[nx.DiGraph], ne_options: dict) -> list[Partition]:
+    """Partition an ensemble of networks."""
+    ne = NetworkEnsemble(nets, silent=True, **ne_options)
+    ne.partition()
+    return ne.partitions
+
+
+def _sigclu(
+    partitions: list[Partition],
+    path: Path,
+    sc_options: dict,
+    upset_options: Optional[dict] = None,
+) -> Partition:
+    """Significance cluster a partition ensemble and write its outputs."""
+    ne = NetworkEnsemble([], silent=True)
+    ne.partitions = partitions
+    ne.sigclu(
+        upset_config=None if upset_options is None else {"path": make_filepath(path, "upset")} | upset_options,
+        **sc_options,
+    )
+
+    GeoPlot.from_cores(ne.cores, ne.unstable_nodes).plot_structure(path=make_filepath(path, "geo"))
+    ne.to_nodelist(path=make_filepath(path, extension="csv"))
+    return ne.cores
@@ -0,0 +1,98 @@
+"""
+Defines stage configurations.
+
+Configurations are kept free of heavy dependencies so their defaults can be read, e.g. by the CLI, without importing
+the scientific and plotting stack.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from netclop.constants import SEED
+
+
+@dataclass(frozen=True)
+class GeoNetConfig:
+    res: int = 5
+    bbox: Optional[tuple[float, float, float, float]] = None
+    mask: Optional[str] = None
+    cells: Optional[str] = None
+    prefetch: int = 2
+
+
+@dataclass(frozen=True)
+class SlidingWindowConfig:
+    res: int = 5
+    size: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class SparsifyConfig:
+    min_edge_weight: float = 0
+    min_node_strength: float = 0
+    self_loops: bool = True
+    largest_scc: bool = False
+
+
+@dataclass(frozen=True)
+class NetworkEnsembleConfig:
+    seed: int = SEED
+    num_bootstraps: int = 1000
+    im_markov_time: float = 1.0
+    im_variable_markov_time: bool = True
+    im_num_trials: int = 5
+    adaptive: bool = False
+    adaptive_batch_size: int = 100
+    adaptive_tol: float = 0.01
+    bootstrap_block_size: int = 32
+    bootstrap_spill_dir: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SigCluConfig:
+    seed: int = SEED
+    sig: float = 0.05
+    temp_init: float = 1.0
+    cooling_rate: float = 0.99
+    decay_rate: float = 1.0
+    pen_scalar: float = 2.0
+    rep_scalar: int = 1
+    min_core_size: int = 6
+    num_trials: int = 1
+    num_exhaustion_loops: int = 50
+    max_sweeps: int = 1000
+    initialize_all: bool = True
+    initialize_peel: bool = False
+    peel_temp_init: float = 0.25
+    prune: bool = False
+    num_workers: int = 1
+
+
+@dataclass(frozen=True)
+class CoAssignmentConfig:
+    max_buffer_pairs: int = 2 ** 24
+
+
+@dataclass(frozen=True)
+class WorkQueueConfig:
+    unit_size: int = 10
+    lease_timeout: float = 600.0
+    poll_interval: float = 2.0
+
+
+@dataclass
+class UpSetPlotConfig:
+    plot_stability: bool = True
+    norm_counts: bool = True
+    sig: float = 0.05
+    opacity: float = 0.7
+
+
+@dataclass(frozen=True)
+class HierarchicalSigCluConfig:
+    boundary_band: int = 1
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    seed: int = SEED
+    num_workers: int = 1
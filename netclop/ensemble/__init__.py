@@ -1,4 +1,24 @@
 """Package initialization for ensemble."""
-from .ensemble import NetworkEnsemble
-from .sigclu import SigClu
-from .upsetplot import UpSetPlot
+from importlib import import_module
+
+_exports = {
+    "Bootstrap": "netclop.ensemble.bootstrap",
+    "CoAssignment": "netclop.ensemble.coassignment",
+    "NetworkEnsemble": "netclop.ensemble.ensemble",
+    "SigClu": "netclop.ensemble.sigclu",
+    "Sparsifier": "netclop.ensemble.sparsify",
+    "UpSetPlot": "netclop.ensemble.upsetplot",
+    "WorkQueue": "netclop.ensemble.queue",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str):
+    if name in _exports:
+        return getattr(import_module(_exports[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
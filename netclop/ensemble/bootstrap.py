@@ -0,0 +1,126 @@
+"""Bootstrap class."""
+import shutil
+import tempfile
+import weakref
+from bisect import bisect_right
+from collections.abc import Sequence
+from os import PathLike
+from pathlib import Path
+from typing import Optional, Self, overload
+
+import networkx as nx
+import numpy as np
+
+from netclop.constants import WEIGHT_ATTR
+
+
+def draw_poisson(rng: np.random.Generator, lam: np.ndarray, num: int) -> np.ndarray:
+    """
+    Draw num rows of Poisson counts with the smallest unsigned integer dtype that holds them.
+
+    Rows are drawn one at a time and upcast only when a count exceeds the current dtype, so no full-width matrix is
+    made. Draws are those of rng.poisson(lam, size=(num, len(lam))), so rows continue one random stream.
+    """
+    counts = np.zeros((num, len(lam)), dtype=np.uint8)
+    for i in range(num):
+        row = rng.poisson(lam)
+        peak = row.max(initial=0)
+        if peak > np.iinfo(counts.dtype).max:
+            counts = counts.astype(np.min_scalar_type(peak))
+        counts[i] = row
+    return counts
+
+
+class Bootstrap(Sequence):
+    """
+    Lazily constructed bootstrap replicates of a network with Poisson-resampled edge weights.
+
+    Weights are drawn in blocks of replicates from one random stream, so the replicates for a seed do not depend on
+    the block size or on how many are drawn per call. Each block is stored with the smallest integer dtype holding
+    its counts, in memory or, given a spill directory, as a memory-mapped file. Replicate networks are built from
+    their row of weights when accessed.
+
+    Spilled files are kept in a temporary directory within the spill directory, which is removed on close, on
+    leaving a with block, or once the instance is garbage collected.
+    """
+    def __init__(
+        self,
+        net: nx.DiGraph,
+        rng: np.random.Generator,
+        block_size: int = 32,
+        spill_dir: Optional[PathLike] = None,
+    ):
+        self.net = net
+        self.rng = rng
+        self.block_size = block_size
+        self.spill_path = None
+        self._finalizer = None
+        if spill_dir is not None:
+            self.spill_path = Path(tempfile.mkdtemp(prefix="bootstrap_", dir=spill_dir))
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self.spill_path, ignore_errors=True)
+
+        self.edges, self.lam = self.edge_weights(net)
+        self.blocks: list[np.ndarray] = []
+        self._offsets: list[int] = []
+        self._num = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._num
+
+    @overload
+    def __getitem__(self, index: int) -> nx.DiGraph: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[nx.DiGraph]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        bootstrap = self.net.copy()
+        nx.set_edge_attributes(bootstrap, dict(zip(self.edges, self.weights(index).tolist())), WEIGHT_ATTR)
+        return bootstrap
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the stored weights."""
+        return sum(block.nbytes for block in self.blocks)
+
+    def weights(self, index: int) -> np.ndarray:
+        """Resampled edge weights of a replicate."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Bootstrap index out of range.")
+        block = bisect_right(self._offsets, index) - 1
+        return self.blocks[block][index - self._offsets[block]]
+
+    def draw(self, num: int) -> None:
+        """Draw weights of num more replicates."""
+        for start in range(0, num, self.block_size):
+            block = draw_poisson(self.rng, self.lam, min(self.block_size, num - start))
+            if self.spill_path is not None:
+                block_path = self.spill_path / f"{len(self.blocks):06d}.npy"
+                np.save(block_path, block)
+                block = np.load(block_path, mmap_mode="r")
+            self.blocks.append(block)
+            self._offsets.append(self._num)
+            self._num += len(block)
+
+    def close(self) -> None:
+        """Drop the drawn weights and remove any spilled files."""
+        self.blocks, self._offsets, self._num = [], [], 0
+        if self._finalizer is not None:
+            self._finalizer()
+
+    @staticmethod
+    def edge_weights(net: nx.DiGraph) -> tuple[tuple, np.ndarray]:
+        """Get edges and their weights."""
+        edges, weights = zip(*nx.get_edge_attributes(net, WEIGHT_ATTR).items())
+        return edges, np.array(weights)
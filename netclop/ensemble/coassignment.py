@@ -0,0 +1,165 @@
+"""CoAssignment class."""
+from functools import cached_property
+from os import PathLike
+from pathlib import Path
+from typing import Iterable, Self, Sequence
+
+import numpy as np
+import pandas as pd
+
+from netclop.config import CoAssignmentConfig
+from netclop.ensemble.netutils import flatten_partition, partitions_to_labels, sort_nodes
+from netclop.typing import Node, Partition
+
+
+class CoAssignment:
+    """
+    Sparse counts of how often each pair of nodes shares a module across a partition ensemble.
+
+    Only pairs that co-occur in some module are stored, keyed by i * N + j over the node index with i < j. Pairs are
+    accumulated one partition at a time into a buffer that is merged into the counts whenever it exceeds
+    max_buffer_pairs, so memory stays bounded by the buffer and the number of distinct co-assigned pairs.
+    """
+    Config = CoAssignmentConfig
+
+    def __init__(self, nodes: Sequence[Node], **config_options):
+        self.cfg = self.Config(**config_options)
+
+        self.nodes = list(nodes)
+        self.num_partitions = 0
+        self.keys = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int32)
+
+        self._buffer: list[np.ndarray] = []
+        self._buffer_size = 0
+
+    @classmethod
+    def from_partitions(
+        cls,
+        partitions: Sequence[Partition],
+        nodes: Sequence[Node] = None,
+        chunk_size: int = 64,
+        **config_options,
+    ) -> Self:
+        """Count co-assignments of a partition ensemble, encoding partitions a chunk at a time."""
+        if nodes is None:
+            nodes = sort_nodes(flatten_partition(list(partitions)))
+        coassignment = cls(nodes, **config_options)
+        for start in range(0, len(partitions), chunk_size):
+            labels, _ = partitions_to_labels(partitions[start:start + chunk_size], coassignment.nodes)
+            coassignment.add(labels)
+        return coassignment
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Node index of the first node of each pair."""
+        return self.keys // self.num_nodes
+
+    @property
+    def cols(self) -> np.ndarray:
+        """Node index of the second node of each pair."""
+        return self.keys % self.num_nodes
+
+    @property
+    def frequency(self) -> np.ndarray:
+        """Fraction of partitions in which each pair is co-assigned."""
+        return self.counts / self.num_partitions if self.num_partitions else self.counts.astype(float)
+
+    def add(self, labels: np.ndarray) -> None:
+        """Accumulate co-assigned pairs of partitions encoded as a label matrix over the node index."""
+        for row in labels:
+            self._buffer.append(self.pair_keys(np.asarray(row), self.num_nodes))
+            self._buffer_size += self._buffer[-1].size
+            self.num_partitions += 1
+            if self._buffer_size >= self.cfg.max_buffer_pairs:
+                self._flush()
+        self._flush()
+
+    def pairs(self, min_count: int = 1) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Node indices and counts of pairs co-assigned in at least min_count partitions."""
+        mask = self.counts >= min_count
+        keys = self.keys[mask]
+        return keys // self.num_nodes, keys % self.num_nodes, self.counts[mask]
+
+    def index(self, nodes: Iterable[Node]) -> np.ndarray:
+        """Positions of nodes in the node index."""
+        node_index = self._node_index
+        return np.fromiter((node_index[node] for node in nodes), dtype=np.int64)
+
+    def count(self, a: Node, b: Node) -> int:
+        """Number of partitions in which two nodes are co-assigned."""
+        node_index = self._node_index
+        i, j = sorted((node_index[a], node_index[b]))
+        key = i * self.num_nodes + j
+        pos = np.searchsorted(self.keys, key)
+        return int(self.counts[pos]) if pos < self.keys.size and self.keys[pos] == key else 0
+
+    def to_frame(self, min_count: int = 1) -> pd.DataFrame:
+        """Make an edge list of co-assigned node pairs."""
+        rows, cols, counts = self.pairs(min_count)
+        nodes = np.asarray(self.nodes, dtype=object)
+        return pd.DataFrame({
+            "node_a": nodes[rows],
+            "node_b": nodes[cols],
+            "count": counts,
+            "frequency": counts / max(self.num_partitions, 1),
+        })
+
+    def save(self, path: PathLike) -> None:
+        """Save pair keys and counts (.npz) and node index (.txt)."""
+        path = Path(path)
+        np.savez_compressed(
+            path.with_suffix(".npz"),
+            keys=self.keys,
+            counts=self.counts,
+            num_partitions=self.num_partitions,
+        )
+        path.with_suffix(".txt").write_text("\n".join(self.nodes) + "\n")
+
+    @classmethod
+    def load(cls, path: PathLike, **config_options) -> Self:
+        """Load co-assignment counts saved with save."""
+        path = Path(path)
+        coassignment = cls(path.with_suffix(".txt").read_text().split(), **config_options)
+        with np.load(path.with_suffix(".npz")) as data:
+            coassignment.keys = data["keys"]
+            coassignment.counts = data["counts"]
+            coassignment.num_partitions = int(data["num_partitions"])
+        return coassignment
+
+    @cached_property
+    def _node_index(self) -> dict[Node, int]:
+        return dict((node, index) for index, node in enumerate(self.nodes))
+
+    def _flush(self) -> None:
+        """Merge buffered pair keys into the counts."""
+        if not self._buffer:
+            return
+
+        keys, counts = np.unique(np.concatenate(self._buffer), return_counts=True)
+        self._buffer, self._buffer_size = [], 0
+
+        keys, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+        self.counts = np.bincount(
+            inverse, weights=np.concatenate([self.counts, counts]), minlength=keys.size,
+        ).astype(np.int32)
+        self.keys = keys
+
+    @staticmethod
+    def pair_keys(labels: np.ndarray, num_nodes: int) -> np.ndarray:
+        """Keys of node pairs sharing a module in one partition, given its labels over the node index."""
+        present = np.flatnonzero(labels)
+        order = present[np.argsort(labels[present], kind="stable")]
+        splits = np.flatnonzero(np.diff(labels[order])) + 1
+
+        keys = []
+        for module in np.split(order, splits):
+            if module.size < 2:
+                continue
+            i, j = np.triu_indices(module.size, k=1)
+            keys.append(module[i].astype(np.int64) * num_nodes + module[j])
+        return np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
@@ -1,8 +1,8 @@
 """NetworkEnsemble class."""
 from collections import defaultdict
-from dataclasses import dataclass
 from functools import cached_property
 from os import PathLike
+from pathlib import Path
 from typing import Optional, Sequence
 
 import networkx as nx
@@ -11,23 +11,28 @@ import pandas as pd
 from infomap import Infomap
 
 from netclop.centrality import centrality_registry
-from netclop.constants import SEED, WEIGHT_ATTR
-from netclop.ensemble.netutils import flatten_partition, label_partition
+from netclop.config import NetworkEnsembleConfig
+from netclop.ensemble.bootstrap import Bootstrap
+from netclop.ensemble.coassignment import CoAssignment
+from netclop.ensemble.netutils import (
+    flatten_partition,
+    label_partition,
+    labels_to_partitions,
+    partitions_to_labels,
+    sort_nodes,
+)
 from netclop.ensemble.sigclu import SigClu
+from netclop.ensemble.sparsify import Sparsifier
+from netclop.ensemble.similarity import batched_pair_similarity, sample_pairs
+from netclop.ensemble.upsetplot import UpSetPlot
 from netclop.exceptions import MissingResultError
 from netclop.log import Logger
-from netclop.typing import NodeMetric, NodeSet, Partition
+from netclop.typing import Node, NodeMetric, NodeSet, Partition
 
 
 class NetworkEnsemble:
     """Network operations involving an ensemble of networks."""
-    @dataclass(frozen=True)
-    class Config:
-        seed: int = SEED
-        num_bootstraps: int = 1000
-        im_markov_time: float = 1.0
-        im_variable_markov_time: bool = True
-        im_num_trials: int = 5
+    Config = NetworkEnsembleConfig
 
     def __init__(
         self,
@@ -41,13 +46,17 @@ class NetworkEnsemble:
 
         self.nets = net if isinstance(net, Sequence) else [net]
 
-        self.bootstraps: Optional[list[nx.DiGraph]] = None
+        self.bootstraps: Optional[Bootstrap] = None
         self.partitions: Optional[list[Partition]] = None
         self.cores: Optional[Partition] = None
+        self.coassignment: Optional[CoAssignment] = None
+        self.pruned_nodes: Optional[dict[Node, str]] = None
 
     @cached_property
     def nodes(self) -> NodeSet:
-        return frozenset().union(*[net.nodes for net in self.nets])
+        # An ensemble restored from partitions may have been extended by networks since
+        nodes = frozenset().union(*[net.nodes for net in self.nets])
+        return nodes if self.partitions is None else nodes | flatten_partition(self.partitions)
 
     @property
     def unstable_nodes(self) -> NodeSet:
@@ -56,8 +65,10 @@ class NetworkEnsemble:
         return self.nodes.difference(flatten_partition(self.cores))
 
     def to_nodelist(self, metrics: Optional[dict[str, NodeMetric]] = None, path: PathLike = None) -> pd.DataFrame:
-        """Create a node list."""
-        df = pd.DataFrame({"node": list(self.nodes)})
+        """Create a node list, including nodes removed by sparsification with the reason they were pruned."""
+        df = pd.DataFrame({"node": list(self.nodes) + list(self.pruned_nodes or {})})
+        if self.pruned_nodes is not None:
+            df["pruned"] = df["node"].map(self.pruned_nodes)
 
         if self.cores is not None:
             df["core"] = df["node"].map(label_partition(self.cores)).fillna(0).astype(int)
@@ -71,6 +82,88 @@ class NetworkEnsemble:
 
         return df
 
+    def save_partitions(self, path: PathLike) -> None:
+        """
+        Save partitions as an int32 label matrix (.npy) and node index (.txt).
+
+        The label matrix can be memory-mapped on load; row i holds the module labels of partition i over the node
+        index, with zero marking nodes absent from the partition.
+        """
+        if self.partitions is None:
+            raise MissingResultError()
+
+        path = Path(path)
+        labels, nodes = partitions_to_labels(self.partitions)
+        np.save(path.with_suffix(".npy"), labels)
+        path.with_suffix(".txt").write_text("\n".join(nodes) + "\n")
+
+    def load_partitions(self, path: PathLike) -> None:
+        """Load partitions saved with save_partitions."""
+        self.partitions = self.read_partitions(path)
+        self.__dict__.pop("nodes", None)
+        self.logger.log(
+            f"Loaded {len(self.partitions)} partitions: "
+            f"{self.logger.stat([len(part) for part in self.partitions])} modules"
+        )
+
+    @staticmethod
+    def read_partitions(path: PathLike) -> list[Partition]:
+        """Read partitions saved with save_partitions."""
+        path = Path(path)
+        labels = np.load(path.with_suffix(".npy"), mmap_mode="r")
+        nodes = path.with_suffix(".txt").read_text().split()
+        return labels_to_partitions(labels, nodes)
+
+    def coassign(self, **kwargs) -> CoAssignment:
+        """Count how often each pair of nodes shares a module across partitions."""
+        if self.partitions is None:
+            self.partition()
+
+        if self.coassignment is None or self.coassignment.num_partitions != len(self.partitions):
+            self.logger.log(f"Counting node co-assignment over {len(self.partitions)} partitions.")
+            with self.logger.stage("co-assignment", items=len(self.partitions), unit="partitions"):
+                self.coassignment = CoAssignment.from_partitions(self.partitions, **kwargs)
+            self.logger.log(f"{self.coassignment.keys.size} co-assigned node pairs")
+        return self.coassignment
+
+    def similarity(self, max_pairs: Optional[int] = 10_000, num_workers: int = 1) -> pd.DataFrame:
+        """
+        Compare pairs of partitions by normalized mutual information (NMI) and adjusted Rand index (ARI).
+
+        All pairs are compared, or a seeded sample of max_pairs distinct pairs if there are more. Scores are computed
+        from contingency tables over the nodes present in both partitions.
+        """
+        if self.partitions is None:
+            raise MissingResultError()
+
+        labels, _ = partitions_to_labels(self.partitions)
+        pairs = sample_pairs(len(labels), max_pairs, np.random.default_rng(self.cfg.seed))
+        with self.logger.stage("partition similarity", items=len(pairs), unit="pairs"):
+            scores = batched_pair_similarity(labels, pairs, num_workers)
+
+        df = pd.DataFrame({"a": pairs[:, 0], "b": pairs[:, 1], "nmi": scores[:, 0], "ari": scores[:, 1]})
+        self.logger.log(
+            f"Partition similarity over {len(df)} pairs: "
+            f"NMI {df["nmi"].mean():.3f}±{df["nmi"].std(ddof=0):.3f} (min {df["nmi"].min():.3f}), "
+            f"ARI {df["ari"].mean():.3f}±{df["ari"].std(ddof=0):.3f} (min {df["ari"].min():.3f})"
+        )
+        return df
+
+    def sparsify(self, **config_options) -> None:
+        """Prune weak edges and nodes from member networks before partitioning, recording the nodes removed."""
+        if self.partitions is not None or self.is_bootstrapped():
+            raise ValueError("Networks must be sparsified before they are resampled or partitioned.")
+
+        sparsifier = Sparsifier(logger=self.logger, **config_options)
+        with self.logger.stage("sparsify", items=sum(net.number_of_edges() for net in self.nets), unit="edges"):
+            self.nets = [sparsifier.run(net) for net in self.nets]
+        self.__dict__.pop("nodes", None)
+
+        # A node is pruned only if no member network keeps it
+        self.pruned_nodes = dict(
+            (node, reason) for node, reason in sparsifier.removed.items() if node not in self.nodes
+        )
+
     def is_ensemble(self) -> bool:
         """Check if an ensemble of nets is stored."""
         return len(self.nets) > 1
@@ -79,11 +172,84 @@ class NetworkEnsemble:
         """Check if replicate networks have been bootstrapped."""
         return self.bootstraps is not None
 
+    def append(self, net: nx.DiGraph, **sigclu_options) -> Optional[pd.DataFrame]:
+        """Add a member network to the ensemble. See extend."""
+        return self.extend([net], **sigclu_options)
+
+    def extend(self, nets: Sequence[nx.DiGraph], **sigclu_options) -> Optional[pd.DataFrame]:
+        """
+        Add member networks to the ensemble, updating results without recomputing them from scratch.
+
+        If the ensemble is already partitioned, only the new members are partitioned and their partitions are added
+        to the cached co-assignment counts. If cores were found, significance clustering is re-run with the given
+        options, warm-started from the previous cores, and how the cores changed is logged and returned.
+        """
+        if self.is_bootstrapped():
+            raise ValueError("Cannot extend an ensemble of bootstrapped replicates with member networks.")
+
+        nets = list(nets)
+        self.nets = [*self.nets, *nets]
+        self.__dict__.pop("nodes", None)
+        self.logger.log(f"Extending ensemble by {len(nets)} to {len(self.nets)} networks.")
+
+        if self.partitions is None:
+            return None
+
+        with self.logger.stage("partition", items=len(nets), unit="nets"):
+            partitions = [
+                self.im_partition(net) for net in self.logger.pbar(nets, desc="Community detection", unit="net")
+            ]
+        self.partitions = [*self.partitions, *partitions]
+        self.__dict__.pop("nodes", None)
+        self.logger.log(f"{self.logger.stat([len(part) for part in partitions])} modules in new partitions")
+
+        if self.coassignment is not None:
+            if flatten_partition(partitions) <= set(self.coassignment.nodes):
+                self.coassignment.add(partitions_to_labels(partitions, self.coassignment.nodes)[0])
+            else:
+                # New nodes change the node index, so counts are rebuilt when next needed
+                self.coassignment = None
+
+        if self.cores is None:
+            return None
+
+        prev_cores = self.cores
+        self.sigclu(initial_cores=prev_cores, **sigclu_options)
+        changes = self.compare_cores(prev_cores, self.cores)
+        matched = changes[changes["prev_core"] > 0]
+        self.logger.log(
+            f"Cores changed from {len(prev_cores)} to {len(self.cores)}: {len(matched)} matched, "
+            f"mean Jaccard {matched["jaccard"].mean() if len(matched) else 0:.3f}, "
+            f"{changes["gained"].sum()} nodes gained, {changes["lost"].sum()} nodes lost"
+        )
+        return changes
+
+    @staticmethod
+    def compare_cores(prev_cores: Partition, cores: Partition) -> pd.DataFrame:
+        """
+        Match each core to the previous core it overlaps most by Jaccard index.
+
+        Core numbers count from 1 in order, with 0 marking cores without an overlapping previous core. Gained and
+        lost count nodes of the core not in its match and nodes of the match not in the core.
+        """
+        rows = []
+        for i, core in enumerate(cores, 1):
+            jaccard, j = max(
+                ((len(core & prev) / len(core | prev), j) for j, prev in enumerate(prev_cores, 1)),
+                default=(0.0, 0),
+            )
+            prev = prev_cores[j - 1] if jaccard > 0 else set()
+            rows.append((i, len(core), j if jaccard > 0 else 0, jaccard, len(core - prev), len(prev - core)))
+        return pd.DataFrame(rows, columns=["core", "size", "prev_core", "jaccard", "gained", "lost"])
+
     def partition(self) -> None:
         """Partition networks."""
         if self.is_ensemble():
             nets = self.nets
         else:
+            if self.cfg.adaptive and not self.is_bootstrapped():
+                self.partition_adaptive(self.nets[0])
+                return
             if not self.is_bootstrapped():
                 self.bootstrap(self.nets[0])
             nets = self.bootstraps
@@ -92,9 +258,10 @@ class NetworkEnsemble:
             f"Partitioning {len(nets)} networks with Infomap: "
             f"mt {self.cfg.im_markov_time} {"(variable)" if self.cfg.im_variable_markov_time else "(static)"}"
         )
-        self.partitions = [
-            self.im_partition(net) for net in self.logger.pbar(nets, desc="Community detection", unit="net")
-        ]
+        with self.logger.stage("partition", items=len(nets), unit="nets"):
+            self.partitions = [
+                self.im_partition(net) for net in self.logger.pbar(nets, desc="Community detection", unit="net")
+            ]
         self.logger.log(f"{self.logger.stat([len(part) for part in self.partitions])} modules")
 
     def im_partition(self, net: nx.DiGraph) -> Partition:
@@ -114,40 +281,113 @@ class NetworkEnsemble:
         partition = im.get_dataframe(["name", "module_id"]).groupby("module_id")["name"].apply(set).tolist()
         return partition
 
+    def partition_adaptive(self, net: nx.DiGraph) -> None:
+        """
+        Resample and partition networks in batches until node co-assignment frequencies converge.
+
+        After each batch, the largest change in co-assignment frequency of any node pair is compared to the
+        tolerance, stopping once it falls below or num_bootstraps replicates are reached. Replicates are drawn from
+        one random stream, so the first n replicates are those of a fixed run of n bootstraps.
+        """
+        self.logger.log(
+            f"Resampling and partitioning networks in batches of {self.cfg.adaptive_batch_size} until co-assignment "
+            f"changes by less than {self.cfg.adaptive_tol}: at most {self.cfg.num_bootstraps} networks"
+        )
+        with self.logger.stage("adaptive partition", unit="nets") as stage:
+            self.bootstraps = self._make_bootstrap(net)
+            coassignment = CoAssignment(sort_nodes(net.nodes))
+
+            self.partitions = []
+            frequency, change = None, np.inf
+            while len(self.bootstraps) < self.cfg.num_bootstraps:
+                num = min(self.cfg.adaptive_batch_size, self.cfg.num_bootstraps - len(self.bootstraps))
+                start = len(self.bootstraps)
+                self.bootstraps.draw(num)
+                partitions = [
+                    self.im_partition(self.bootstraps[i])
+                    for i in self.logger.pbar(
+                        range(start, len(self.bootstraps)), desc="Community detection", unit="net"
+                    )
+                ]
+                self.partitions.extend(partitions)
+
+                old_keys = coassignment.keys
+                coassignment.add(partitions_to_labels(partitions, coassignment.nodes)[0])
+                if frequency is not None:
+                    delta = coassignment.frequency.copy()
+                    delta[np.searchsorted(coassignment.keys, old_keys)] -= frequency
+                    change = np.abs(delta).max(initial=0)
+                    self.logger.log(f"{len(self.partitions)} networks: co-assignment change {change:.4f}")
+                frequency = coassignment.frequency
+                if change < self.cfg.adaptive_tol:
+                    break
+            stage.items = len(self.partitions)
+
+        self.coassignment = coassignment
+        self.logger.log(
+            f"{"Converged" if change < self.cfg.adaptive_tol else "Stopped without converging"} "
+            f"after {len(self.partitions)} networks: {self.logger.stat([len(part) for part in self.partitions])} modules"
+        )
+
     def bootstrap(self, net: nx.DiGraph) -> None:
-        """Resample edge weights."""
+        """
+        Resample edge weights.
+
+        Weights are drawn in blocks of bootstrap_block_size replicates with compact integer dtypes, optionally
+        spilled to memory-mapped files in bootstrap_spill_dir, and replicate networks are built when accessed.
+        """
         self.logger.log(f"Resampling {self.cfg.num_bootstraps} networks.")
-        edges, weights = zip(*nx.get_edge_attributes(net, WEIGHT_ATTR).items())
-        weights = np.array(weights)
-        num_edges = len(edges)
-
-        rng = np.random.default_rng(self.cfg.seed)
-        new_weights = rng.poisson(lam=weights.reshape(1, -1), size=(self.cfg.num_bootstraps, num_edges))
-
-        bootstraps = []
-        for i in self.logger.pbar(range(self.cfg.num_bootstraps), desc="Net construction", unit="net"):
-            bootstrap = net.copy()
-            edge_attrs = {edges[j]: {WEIGHT_ATTR: new_weights[i, j]} for j in range(num_edges)}
-            nx.set_edge_attributes(bootstrap, edge_attrs)
-            bootstraps.append(bootstrap)
-        self.bootstraps = bootstraps
-
-    def sigclu(self, upset_config: dict = None, **kwargs) -> None:
-        """Computes recursive significance clustering on partition ensemble."""
+        with self.logger.stage("bootstrap", items=self.cfg.num_bootstraps, unit="nets"):
+            self.bootstraps = self._make_bootstrap(net)
+            self.bootstraps.draw(self.cfg.num_bootstraps)
+        self.logger.log(f"{self.bootstraps.nbytes / 2 ** 20:.1f}MB of resampled weights", level="DEBUG")
+
+    def _make_bootstrap(self, net: nx.DiGraph) -> Bootstrap:
+        """Make an empty sequence of replicates of a network, seeded by the ensemble."""
+        return Bootstrap(
+            net,
+            np.random.default_rng(self.cfg.seed),
+            block_size=self.cfg.bootstrap_block_size,
+            spill_dir=self.cfg.bootstrap_spill_dir,
+        )
+
+    def sigclu(
+        self,
+        upset_config: dict = None,
+        regions: Optional[Sequence[NodeSet]] = None,
+        initial_cores: Optional[Partition] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Computes recursive significance clustering on partition ensemble, optionally within regions.
+
+        Searches can be warm-started from initial cores, such as those found before the ensemble was extended.
+        """
         if self.partitions is None:
             self.partition()
 
         sc = SigClu(
             self.partitions,
             logger=self.logger,
+            coassignment=self.coassignment,
+            initial_cores=initial_cores,
             **kwargs
         )
-        sc.run()
+        sc.run(regions)
         self.cores = sc.cores
+        self.coassignment = sc.coassignment
 
         if upset_config is not None:
-            self.logger.log("Calculating coalescence frequency and generating UpSet plot.")
-            sc.upset(**upset_config)
+            self.upset(sig=sc.cfg.sig, **upset_config)
+
+    def upset(self, path: PathLike, **kwargs) -> None:
+        """Make an UpSet plot of cores."""
+        if self.cores is None:
+            raise MissingResultError()
+
+        self.logger.log("Calculating coalescence frequency and generating UpSet plot.")
+        with self.logger.stage("upset plot", items=len(self.partitions), unit="partitions"):
+            UpSetPlot(self.cores, self.partitions, **kwargs).plot(path)
 
     def node_centrality(self, name: str, use_bootstraps: bool = False, **kwargs) -> NodeMetric:
         """Compute node centrality indices."""
@@ -0,0 +1,114 @@
+"""Lease class."""
+import os
+import select
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+class Lease:
+    """
+    Claim on a work unit held by a lock file, kept alive by refreshing the file's modification time.
+
+    The lock file holds a token unique to the claim, so a holder only refreshes its own claim and a claim is only
+    released if it is still the one found expired. Refreshing runs in a separate process while the unit is worked
+    on, as a partitioning run holds the interpreter lock for its whole duration and would starve a thread.
+    """
+    def __init__(self, path: Path, owner: str):
+        self.path = Path(path)
+        self.token = f"{owner} {uuid.uuid4().hex}"
+
+    def acquire(self) -> bool:
+        """Claim by exclusively creating the lock file."""
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(self.token + "\n")
+        return True
+
+    def is_held(self) -> bool:
+        """Check if the lock file is still this claim."""
+        return self.read_token(self.path) == self.token
+
+    def refresh(self) -> bool:
+        """Refresh the claim if it is still held, returning whether it is."""
+        if not self.is_held():
+            return False
+        try:
+            os.utime(self.path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    @contextmanager
+    def keep_alive(self, interval: float) -> Iterator[None]:
+        """
+        Refresh the claim every interval seconds from a separate process while in the with block.
+
+        The process stops when its standard input is closed, on leaving the block or when this process exits.
+        """
+        process = subprocess.Popen(
+            [sys.executable, "-m", __name__, str(self.path), self.token, str(interval)], stdin=subprocess.PIPE,
+        )
+        try:
+            yield
+        finally:
+            process.stdin.close()
+            process.wait()
+
+    @classmethod
+    def release_if_expired(cls, path: Path, timeout: float) -> bool:
+        """
+        Release a claim not refreshed within the timeout, returning whether it was released.
+
+        The lock file is renamed away atomically, so only one process releases a given claim, then checked to
+        still be the claim found expired. If it was refreshed or claimed anew in the meantime, it is put back.
+        """
+        try:
+            token, mtime = cls.read_token(path), path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        if time.time() - mtime < timeout:
+            return False
+
+        stale_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.stale")
+        try:
+            os.rename(path, stale_path)
+        except FileNotFoundError:
+            return False
+
+        is_released = cls.read_token(stale_path) == token and stale_path.stat().st_mtime == mtime
+        if not is_released:
+            try:
+                os.link(stale_path, path)
+            except FileExistsError:
+                pass  # Claimed again since; the newer claim stands
+        stale_path.unlink()
+        return is_released
+
+    @staticmethod
+    def read_token(path: Path) -> Optional[str]:
+        """Token of the claim held by a lock file, if any."""
+        try:
+            return Path(path).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+
+def _keep_alive(path: Path, token: str, interval: float) -> None:
+    """Refresh a claim until standard input is closed or the claim is lost."""
+    lease = Lease(path, "")
+    lease.token = token
+    while not select.select([sys.stdin], [], [], interval)[0]:
+        if not lease.refresh():
+            return
+
+
+if __name__ == "__main__":
+    _keep_alive(Path(sys.argv[1]), sys.argv[2], float(sys.argv[3]))
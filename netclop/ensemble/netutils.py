@@ -1,13 +1,15 @@
 """Network utility functions."""
 from typing import Sequence
 
+import numpy as np
+
 from netclop.exceptions import OverlappingPartitionError
-from netclop.typing import NodeSet, Partition, NodeMetric
+from netclop.typing import Node, NodeSet, Partition, NodeMetric
 
 
 def flatten_partition(partition: Partition | Sequence[Partition]) -> NodeSet:
     """Flattens a partition to the set of elements partitioned."""
-    if isinstance(partition, Sequence) and not isinstance(partition[0], set | frozenset):
+    if isinstance(partition, Sequence) and partition and not isinstance(partition[0], set | frozenset):
         return flatten_partition([flatten_partition(part) for part in partition])
     return frozenset().union(*partition)
 
@@ -25,3 +27,63 @@ def label_partition(partition: Partition) -> NodeMetric:
             labels[node] = label
             labelled.append(node)
     return labels
+
+
+def sort_nodes(nodes: NodeSet) -> list[Node]:
+    """Order nodes by their underlying integer names."""
+    return sorted(nodes, key=int)
+
+
+def partitions_to_labels(partitions: Sequence[Partition], nodes: Sequence[Node] = None) -> tuple[np.ndarray, list[Node]]:
+    """
+    Encode partitions as an integer label matrix.
+
+    Row i holds the module labels (from one) of partition i over the node index, where zero marks a node that is
+    absent from the partition.
+    """
+    if nodes is None:
+        nodes = sort_nodes(flatten_partition(list(partitions)))
+    nodes = list(nodes)
+    node_index = dict((node, index) for index, node in enumerate(nodes))
+
+    labels = np.zeros((len(partitions), len(nodes)), dtype=np.int32)
+    for i, partition in enumerate(partitions):
+        for label, module in enumerate(partition, 1):
+            labels[i, [node_index[node] for node in module]] = label
+    return labels, nodes
+
+
+def labels_to_partitions(labels: np.ndarray, nodes: Sequence[Node]) -> list[Partition]:
+    """Decode an integer label matrix into partitions."""
+    nodes = np.asarray(nodes, dtype=object)
+
+    partitions = []
+    for row in labels:
+        row = np.asarray(row)
+        present = np.flatnonzero(row)
+        if present.size == 0:
+            partitions.append([])
+            continue
+        order = present[np.argsort(row[present], kind="stable")]
+        splits = np.flatnonzero(np.diff(row[order])) + 1
+        partitions.append([set(module) for module in np.split(nodes[order], splits)])
+    return partitions
+
+
+def connected_components(num_nodes: int, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Label the connected components of an undirected graph given as edge arrays over a node index.
+
+    Each node is labelled with the smallest node index in its component, found by min-label propagation with
+    pointer jumping.
+    """
+    labels = np.arange(num_nodes)
+    while True:
+        edge_labels = np.minimum(labels[rows], labels[cols])
+        new_labels = labels.copy()
+        np.minimum.at(new_labels, rows, edge_labels)
+        np.minimum.at(new_labels, cols, edge_labels)
+        new_labels = new_labels[new_labels]
+        if np.array_equal(new_labels, labels):
+            return labels
+        labels = new_labels
@@ -0,0 +1,240 @@
+"""WorkQueue class."""
+import json
+import os
+import socket
+import time
+from contextlib import nullcontext
+from dataclasses import asdict
+from os import PathLike
+from pathlib import Path
+from typing import Optional
+
+import networkx as nx
+import numpy as np
+
+from netclop.config import WorkQueueConfig
+from netclop.constants import WEIGHT_ATTR
+from netclop.ensemble.bootstrap import Bootstrap, draw_poisson
+from netclop.ensemble.ensemble import NetworkEnsemble
+from netclop.ensemble.lease import Lease
+from netclop.ensemble.netutils import labels_to_partitions, partitions_to_labels
+from netclop.log import Logger
+from netclop.typing import Partition
+
+
+class WorkQueue:
+    """
+    Work queue on a shared filesystem for partitioning bootstrapped networks across processes and machines.
+
+    The coordinator writes the network once and a work unit of compactly typed, resampled edge weights per block of
+    replicates. Workers claim units by exclusively creating a lock file, refresh the lock as a lease from a separate
+    process while working, and atomically write a label matrix of partitions per unit. Leases that are not refreshed
+    within the timeout are released so lost units are claimed again. Replicates are drawn as in
+    NetworkEnsemble.bootstrap, so results match a single-process run.
+
+    Layout: meta.json, net.npz, nodes.txt, units/<unit>.npy, claims/<unit>.lock, results/<unit>.npy.
+    """
+    Config = WorkQueueConfig
+
+    def __init__(self, path: PathLike, logger: Logger = None, silent: bool = False, **config_options):
+        self.logger = Logger(silent=silent) if logger is None else logger
+        self.cfg = self.Config(**config_options)
+
+        self.path = Path(path)
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._leases: dict[int, Lease] = {}
+        self._meta: Optional[dict] = None
+        self._net: Optional[nx.DiGraph] = None
+        self._ne: Optional[NetworkEnsemble] = None
+
+    @property
+    def meta(self) -> dict:
+        if self._meta is None:
+            self._meta = json.loads((self.path / "meta.json").read_text())
+        return self._meta
+
+    @property
+    def num_units(self) -> int:
+        return self.meta["num_units"]
+
+    def is_ready(self) -> bool:
+        """Check if the coordinator has submitted work."""
+        return (self.path / "meta.json").exists()
+
+    def is_done(self) -> bool:
+        """Check if every unit has a result."""
+        return all(self._result_path(unit).exists() for unit in range(self.num_units))
+
+    def partition(self, ne: NetworkEnsemble, work: bool = True) -> None:
+        """Partition the bootstraps of an ensemble's network through the queue, optionally working as well."""
+        self.submit(ne.nets[0], ne.cfg.num_bootstraps, asdict(ne.cfg))
+        with self.logger.stage("partition", items=ne.cfg.num_bootstraps, unit="nets"):
+            ne.partitions = self.gather(work)
+        self.logger.log(f"{self.logger.stat([len(part) for part in ne.partitions])} modules")
+
+    def submit(self, net: nx.DiGraph, num_bootstraps: int, ne_options: dict) -> None:
+        """
+        Write the network and a unit of resampled edge weights per block of replicates.
+
+        If the queue already holds the same work, e.g. from an interrupted coordinator, it is resumed instead.
+        """
+        if self.is_ready():
+            if self.meta["num_bootstraps"] != num_bootstraps or self.meta["ne_options"] != ne_options:
+                raise FileExistsError(f"Queue '{self.path}' holds different work.")
+            self.logger.log(f"Resuming queue in '{self.path}'")
+            return
+
+        for directory in ("units", "claims", "results"):
+            (self.path / directory).mkdir(parents=True, exist_ok=True)
+
+        nodes = list(net.nodes)
+        node_index = dict((node, index) for index, node in enumerate(nodes))
+        edges, weights = Bootstrap.edge_weights(net)
+        self._write(self.path / "nodes.txt", ("\n".join(nodes) + "\n").encode())
+        self._write_npz(
+            self.path / "net.npz",
+            src=np.array([node_index[src] for src, _ in edges], dtype=np.int64),
+            tgt=np.array([node_index[tgt] for _, tgt in edges], dtype=np.int64),
+        )
+
+        num_units = -(-num_bootstraps // self.cfg.unit_size)
+        rng = np.random.default_rng(ne_options["seed"])
+        for unit in self.logger.pbar(range(num_units), desc="Work units", unit="unit"):
+            num = min(self.cfg.unit_size, num_bootstraps - unit * self.cfg.unit_size)
+            self._write_npy(self._unit_path(unit), draw_poisson(rng, weights, num))
+
+        # Metadata is written last, marking the queue as ready
+        self._meta = {
+            "num_units": num_units,
+            "num_bootstraps": num_bootstraps,
+            "lease_timeout": self.cfg.lease_timeout,
+            "ne_options": ne_options,
+        }
+        self._write(self.path / "meta.json", json.dumps(self._meta, indent=2).encode())
+        self.logger.log(f"Queued {num_bootstraps} networks as {num_units} units in '{self.path}'")
+
+    def gather(self, work: bool = True) -> list[Partition]:
+        """Wait for every unit to have a result, working on units too if asked, and read the partitions."""
+        pbar = self.logger.make_pbar(total=self.num_units, desc="Gathering units", unit="unit")
+        num_done = 0
+        while True:
+            if work:
+                self.work()
+            done = sum(self._result_path(unit).exists() for unit in range(self.num_units))
+            self.logger.update_pbar(pbar, done - num_done)
+            num_done = done
+            if num_done == self.num_units:
+                break
+            self.release_expired()
+            time.sleep(self.cfg.poll_interval)
+        self.logger.close_pbar(pbar)
+
+        nodes = (self.path / "nodes.txt").read_text().split()
+        partitions = []
+        for unit in range(self.num_units):
+            partitions.extend(labels_to_partitions(np.load(self._result_path(unit)), nodes))
+        return partitions
+
+    def work(self, wait: bool = False) -> int:
+        """Process claimable units, returning the number processed, and optionally wait until all are done."""
+        num_processed = 0
+        while True:
+            unit = self.claim()
+            if unit is not None:
+                self.process(unit)
+                num_processed += 1
+            elif not wait or self.is_done():
+                return num_processed
+            else:
+                self.release_expired()
+                time.sleep(self.cfg.poll_interval)
+
+    def claim(self) -> Optional[int]:
+        """Claim a unit without a result by exclusively creating its lock file."""
+        for unit in range(self.num_units):
+            if self._result_path(unit).exists():
+                continue
+            lease = Lease(self._lock_path(unit), self.worker_id)
+            if not lease.acquire():
+                continue
+
+            if self._result_path(unit).exists():
+                # Finished by a worker whose lease had expired
+                continue
+            self._leases[unit] = lease
+            return unit
+        return None
+
+    def process(self, unit: int) -> None:
+        """
+        Partition the replicates of a unit and write their labels, refreshing its lease meanwhile if claimed.
+
+        If the lease is lost, e.g. to a stall longer than the timeout, the unit is still finished, as its result is
+        the same whichever worker writes it.
+        """
+        net, ne = self._load_net()
+        edges = list(net.edges)
+        weights = np.load(self._unit_path(unit))
+        lease = self._leases.pop(unit, None)
+
+        partitions = []
+        with lease.keep_alive(self.meta["lease_timeout"] / 4) if lease is not None else nullcontext():
+            for i in self.logger.pbar(range(len(weights)), desc=f"Unit {unit}", unit="net", leave=False):
+                nx.set_edge_attributes(net, dict(zip(edges, weights[i].tolist())), WEIGHT_ATTR)
+                partitions.append(ne.im_partition(net))
+
+        labels, _ = partitions_to_labels(partitions, list(net.nodes))
+        self._write_npy(self._result_path(unit), labels)
+        self.logger.log(f"Finished unit {unit}", level="DEBUG")
+
+    def release_expired(self) -> None:
+        """Release claims of unfinished units whose leases have not been refreshed within the timeout."""
+        for lock_path in (self.path / "claims").glob("*.lock"):
+            unit = int(lock_path.stem)
+            if self._result_path(unit).exists():
+                continue
+            if Lease.release_if_expired(lock_path, self.meta["lease_timeout"]):
+                self.logger.log(f"Released expired claim on unit {unit}")
+
+    def _load_net(self) -> tuple[nx.DiGraph, NetworkEnsemble]:
+        """Rebuild the network, with nodes and edges in their original order, and an ensemble to partition it."""
+        if self._net is None:
+            nodes = (self.path / "nodes.txt").read_text().split()
+            with np.load(self.path / "net.npz") as data:
+                src, tgt = data["src"], data["tgt"]
+            net = nx.DiGraph()
+            net.add_nodes_from(nodes)
+            net.add_edges_from(zip([nodes[i] for i in src], [nodes[i] for i in tgt]))
+            self._net = net
+            self._ne = NetworkEnsemble([], silent=True, **self.meta["ne_options"])
+        return self._net, self._ne
+
+    def _unit_path(self, unit: int) -> Path:
+        return self.path / "units" / f"{unit:06d}.npy"
+
+    def _lock_path(self, unit: int) -> Path:
+        return self.path / "claims" / f"{unit:06d}.lock"
+
+    def _result_path(self, unit: int) -> Path:
+        return self.path / "results" / f"{unit:06d}.npy"
+
+    def _write(self, path: Path, content: bytes) -> None:
+        """Write a file atomically through a temporary file in the same directory."""
+        tmp_path = path.with_name(f".{path.name}.{self.worker_id}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+
+    def _write_npy(self, path: Path, array: np.ndarray) -> None:
+        """Write an array atomically."""
+        tmp_path = path.with_name(f".{path.name}.{self.worker_id}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+
+    def _write_npz(self, path: Path, **arrays: np.ndarray) -> None:
+        """Write arrays atomically."""
+        tmp_path = path.with_name(f".{path.name}.{self.worker_id}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
@@ -1,14 +1,16 @@
 """SigClu class."""
 from collections import namedtuple
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
 from functools import cached_property
 from os import PathLike
-from typing import Optional
+from typing import Iterator, Optional, Self, Sequence
 
 import numpy as np
 
-from netclop.constants import SEED
-from netclop.ensemble.netutils import flatten_partition
+from netclop.config import SigCluConfig
+from netclop.ensemble.coassignment import CoAssignment
+from netclop.ensemble.netutils import connected_components, flatten_partition, partitions_to_labels, sort_nodes
 from netclop.ensemble.upsetplot import UpSetPlot
 from netclop.exceptions import MissingResultError
 from netclop.typing import Node, NodeSet, Partition
@@ -20,30 +22,30 @@ Score = namedtuple("Score", ["size", "pen"], defaults=[0, 0])
 
 class SigClu:
     """Finds robust cores of network partitions through significance clustering."""
-    @dataclass(frozen=True)
-    class Config:
-        seed: int = SEED
-        sig: float = 0.05
-        temp_init: float = 1.0
-        cooling_rate: float = 0.99
-        decay_rate: float = 1.0
-        pen_scalar: float = 2.0
-        rep_scalar: int = 1
-        min_core_size: Size = 6
-        num_trials: int = 1
-        num_exhaustion_loops: int = 50
-        max_sweeps: int = 1000
-        initialize_all: bool = True,
-
-    def __init__(self, partitions: list[Partition], logger: Logger = None, silent: bool = False, **config_options):
+    Config = SigCluConfig
+
+    def __init__(
+        self,
+        partitions: list[Partition],
+        logger: Logger = None,
+        silent: bool = False,
+        coassignment: Optional[CoAssignment] = None,
+        initial_cores: Optional[Partition] = None,
+        **config_options,
+    ):
         self.logger = Logger(silent=silent) if logger is None else logger
         self.cfg = self.Config(**config_options)
 
         self.partitions = partitions
+        self.coassignment = coassignment
+        self.initial_cores = initial_cores
 
         self.rng = np.random.default_rng(self.cfg.seed)
 
         self.cores: Optional[Partition] = None
+        self.num_proposals = 0
+        self.num_sweeps = 0
+        self.num_searches = 0
 
     @cached_property
     def nodes(self) -> NodeSet:
@@ -55,26 +57,159 @@ class SigClu:
         """Number of partitions to consider when penalizing."""
         return np.ceil(len(self.partitions) * (1 - self.cfg.sig)).astype(int)
 
+    @cached_property
+    def _labels(self) -> np.ndarray:
+        """Module labels of partitions over the reference node index, with zero marking absent nodes."""
+        labels, _ = partitions_to_labels(self.partitions, sort_nodes(self.nodes))
+        return labels
+
     @cached_property
     def __node_ref_index(self) -> dict[Node, int]:
         """Mapping of node name to reference index based on underlying node names."""
         nodes_sorted = sorted(self.nodes, key=int)
         return dict((node, index) for index, node in enumerate(nodes_sorted))
 
-    def run(self) -> None:
-        """Find robust cores."""
+    def run(self, regions: Optional[Sequence[NodeSet]] = None) -> None:
+        """
+        Find robust cores.
+
+        If regions are given, cores are searched for only within each region in turn, on partitions restricted to
+        the region, which keeps each search small. Nodes assigned to a core are unavailable to later regions.
+
+        Every core found is kept, including a final core of all remaining nodes when they form one, whether or
+        not the search is pruned or split into regions.
+
+        With pruning, the available nodes of each region are further split into the connected components of the
+        graph of node pairs co-assigned in at least n_pen partitions. Every pair in a penalty-free core is
+        co-assigned in the same n_pen partitions, so cores never span components, and components smaller than the
+        minimum core size are skipped.
+
+        With initial cores, e.g. those of a previous run on fewer partitions, each search is warm-started from the
+        initial core overlapping the available nodes most at the lower peel temperature.
+        """
         self.logger.log(
             f"Running recursive significance clustering on {len(self.partitions)} partitions: "
             f"level {self.cfg.sig}, init temp {self.cfg.temp_init}, cool rate {self.cfg.cooling_rate}, " 
             f"min size {self.cfg.min_core_size}"
+            + (f", {len(regions)} regions" if regions is not None else "")
+            + (f", warm-started from {len(self.initial_cores)} cores" if self.initial_cores is not None else "")
         )
+        with self.logger.stage("sigclu", unit="proposals") as stage:
+            pbar = self.logger.make_pbar(desc="Significance clustering", unit="core")
+            if regions is None and not self.cfg.prune:
+                cores = self._find_cores(set(self.nodes), pbar)
+            else:
+                cores = []
+                avail_nodes = set(self.nodes)
+                for region in [self.nodes] if regions is None else regions:
+                    region = avail_nodes.intersection(region)
+                    subregions = self.components(region) if self.cfg.prune else [region]
+                    for region_cores in self._search_regions(subregions, pbar):
+                        for core in region_cores:
+                            avail_nodes.difference_update(core)
+                        cores.extend(region_cores)
+                self._sort_by_size(cores)
+
+            self.logger.close_pbar(pbar)
+            self.cores = cores
+            self.logger.log(f"{len(cores)} cores, size: {', '.join(map(str, [len(core) for core in cores]))}")
+            self._log_sweeps()
+            stage.items = self.num_proposals
+
+    def components(self, nodes: NodeSet) -> list[NodeSet]:
+        """
+        Split nodes into connected components of the graph of pairs co-assigned in at least n_pen partitions.
+
+        Components smaller than the minimum core size are dropped. Components are ordered from largest to smallest.
+        """
+        if self.coassignment is None:
+            self.coassignment = CoAssignment.from_partitions(self.partitions, sort_nodes(self.nodes))
+        rows, cols, _ = self.coassignment.pairs(min_count=self.n_pen)
+
+        index = self.coassignment.index(nodes)
+        is_avail = np.zeros(self.coassignment.num_nodes, dtype=bool)
+        is_avail[index] = True
+        is_edge = is_avail[rows] & is_avail[cols]
+        labels = connected_components(self.coassignment.num_nodes, rows[is_edge], cols[is_edge])[index]
+
+        components = []
+        node_names = np.asarray(self.coassignment.nodes, dtype=object)
+        component_labels, sizes = np.unique(labels, return_counts=True)
+        for label in component_labels[sizes >= self.cfg.min_core_size]:
+            components.append(set(node_names[index[labels == label]]))
+        self._sort_by_size(components)
+
+        if len(components) > 1 or sum(map(len, components)) < len(nodes):
+            self.logger.log(
+                f"Pruned {len(nodes)} nodes to {len(components)} components of "
+                f"{', '.join(str(len(component)) for component in components) or 'no'} nodes",
+                level="DEBUG",
+            )
+        return components
+
+    def restrict(self, nodes: NodeSet) -> Self:
+        """Make an instance over partitions restricted to a node set, sharing configuration and logger."""
+        nodes = frozenset(nodes)
+        partitions = [
+            [module & nodes for module in partition if not module.isdisjoint(nodes)] or [set()]
+            for partition in self.partitions
+        ]
+        seed = int(self.rng.integers(np.iinfo(np.int32).max))
+        initial_cores = None
+        if self.initial_cores is not None:
+            initial_cores = [core & nodes for core in self.initial_cores if not core.isdisjoint(nodes)]
+        return type(self)(
+            partitions,
+            logger=self.logger,
+            coassignment=self.coassignment,
+            initial_cores=initial_cores,
+            **(asdict(self.cfg) | {"seed": seed}),
+        )
+
+    def _search_regions(self, regions: list[NodeSet], pbar=None) -> Iterator[Partition]:
+        """Find cores within each of a set of disjoint regions, on a process pool if there are several workers."""
+        subs = [self.restrict(region) for region in regions]
+        if self.cfg.num_workers > 1 and len(subs) > 1:
+            with ProcessPoolExecutor(max_workers=self.cfg.num_workers) as pool:
+                for region_cores, num_proposals, num_sweeps, num_searches in pool.map(_find_region_cores, subs):
+                    self.num_proposals += num_proposals
+                    self.num_sweeps += num_sweeps
+                    self.num_searches += num_searches
+                    self.logger.update_pbar(pbar, len(region_cores))
+                    yield region_cores
+        else:
+            for sub in subs:
+                region_cores = sub._find_region_cores(pbar)
+                self.num_proposals += sub.num_proposals
+                self.num_sweeps += sub.num_sweeps
+                self.num_searches += sub.num_searches
+                yield region_cores
+
+    def _find_region_cores(self, pbar=None) -> Partition:
+        """Find every core among all nodes, re-splitting the nodes left after each core when pruning."""
+        if not self.cfg.prune:
+            return self._find_cores(set(self.nodes), pbar)
+
         cores = []
+        regions = [set(self.nodes)]
+        while regions:
+            avail_nodes = regions.pop()
+            if len(avail_nodes) < self.cfg.min_core_size:
+                continue
+            self.logger.pbar_info(pbar, lambda: f"{len(avail_nodes)}avail", force=True)
+            core = self._find_core_sanitized(avail_nodes)
+            if core:
+                cores.append(core)
+                self.logger.update_pbar(pbar)
+                regions.extend(self.components(avail_nodes.difference(core)))
+        self._sort_by_size(cores)
+        return cores
 
-        # Loop to find each core above min size threshold
-        avail_nodes = set(self.nodes)
-        pbar = self.logger.make_pbar(desc="Significance clustering", unit="core")
+    def _find_cores(self, avail_nodes: set[Node], pbar=None) -> Partition:
+        """Find each core above min size threshold among available nodes, from largest to smallest."""
+        cores = []
         while len(avail_nodes) >= self.cfg.min_core_size:
-            self.logger.pbar_info(pbar, f"{len(avail_nodes)}avail")
+            self.logger.pbar_info(pbar, lambda: f"{len(avail_nodes)}avail", force=True)
             core = self._find_core_sanitized(avail_nodes)
             if core:
                 avail_nodes.difference_update(core)  # Nodes in core are not available in future iters
@@ -84,16 +219,13 @@ class SigClu:
                 self.logger.update_pbar(pbar)
             else:
                 break
-
-        self.logger.close_pbar(pbar)
-        self.cores = cores
-        cores.pop()
-        self.logger.log(f"{len(cores)} cores, size: {', '.join(map(str, [len(core) for core in cores]))}")
+        return cores
 
     def _find_core_sanitized(self, nodes: NodeSet, exhaustion_search: bool=True) -> Optional[NodeSet]:
         """Perform simulated annealing with wrapper for restarts."""
         if self._is_trivial(nodes) or self._all_form_core(nodes):
-            return nodes
+            # Copied so the core is not emptied with the available nodes it was found among
+            return set(nodes)
 
         best_state, best_score = {}, 0
         for i in range(self.cfg.num_trials):
@@ -122,11 +254,12 @@ class SigClu:
         """Find the largest core of node set through simulated annealing."""
         pen_weighting = self._make_penalty_weight(nodes)
         nodes = self._nodeset_to_list_ordered(nodes)
+        self.num_searches += 1
 
         # Initialize state
-        state = self._initialize_state(nodes)
+        state = self._initialize_state(nodes, pen_weighting)
         score = self._score(state, pen_weighting)
-        temp = self.cfg.temp_init
+        temp = self._temp_init
 
         # Core loop
         for t in (pbar := self.logger.pbar(
@@ -134,7 +267,8 @@ class SigClu:
             length=False,
             leave=False,
         )):
-            self.logger.pbar_info(pbar, f"{temp:.2f}temp, {score.size}size, {score.pen:.2f}pen")
+            self.logger.pbar_info(pbar, lambda: f"{temp:.2f}temp, {score.size}size, {score.pen:.2f}pen")
+            self.num_sweeps += 1
             did_accept = False
 
             num_repetitions = self._num_repetitions(t, len(nodes))
@@ -143,6 +277,7 @@ class SigClu:
                 node = self.rng.choice(nodes)
                 trial_state = self._flip(state, node)
                 trial_score = self._score(trial_state, pen_weighting)
+                self.num_proposals += 1
 
                 # Query accepting trial state
                 if self._do_accept_state(score, trial_score, temp):
@@ -162,11 +297,18 @@ class SigClu:
             if trial_score.pen == 0:
                 state, score = trial_state, trial_score
 
-        self.logger.pbar_info(pbar, f"{temp:.2f}temp, {score.size}size, {score.pen:.2f}pen")
+        self.logger.pbar_info(pbar, lambda: f"{temp:.2f}temp, {score.size}size, {score.pen:.2f}pen", force=True)
         self.logger.close_pbar(pbar)
 
         return state, score
 
+    def _log_sweeps(self) -> None:
+        """Log the annealing work done, for comparison between runs with different initializations."""
+        self.logger.log(
+            f"{self.num_sweeps} annealing sweeps over {self.num_searches} searches from temp {self._temp_init}, "
+            f"{self.num_proposals} proposals"
+        )
+
     def _measure_size(self, nodes: NodeSet) -> Size:
         """Calculate a measure of size on a node set."""
         return len(nodes)
@@ -205,20 +347,35 @@ class SigClu:
             # Metropolis–Hastings algorithm
             return np.exp(delta_score / temp) >= self.rng.uniform(0, 1)
 
+    @property
+    def _temp_init(self) -> float:
+        """Initial annealing temperature, lower when starting from an already peeled or warm state."""
+        if self.cfg.initialize_peel or self.initial_cores is not None:
+            return self.cfg.peel_temp_init
+        return self.cfg.temp_init
+
     def _cool(self, t: int) -> float:
         """Apply exponential cooling schedule."""
-        return self.cfg.temp_init * (self.cfg.cooling_rate ** (t + 1))
+        return self._temp_init * (self.cfg.cooling_rate ** (t + 1))
 
     def _num_repetitions(self, t: int, n: int) -> int:
         """Apply exponential repetition schedule."""
         return self.cfg.rep_scalar * n
 
-    def _initialize_state(self, nodes: list[Node]) -> NodeSet:
+    def _initialize_state(self, nodes: list[Node], pen_weighting: float) -> NodeSet:
         """
         Initialize candidate core.
 
         Generates the number of nodes to include in initial state and sample them.
         """
+        if self.initial_cores is not None:
+            state = self._warm_state(nodes)
+            # Without an initial core to start from, peeling gives a start suited to the low temperature
+            return state if state is not None else self._peel(nodes, pen_weighting)
+
+        if self.cfg.initialize_peel:
+            return self._peel(nodes, pen_weighting)
+
         if self.cfg.initialize_all:
             return set(nodes)
 
@@ -226,6 +383,50 @@ class SigClu:
         self.rng.shuffle(nodes)
         return set(nodes[:(num_init - 1)])
 
+    def _warm_state(self, nodes: list[Node]) -> Optional[NodeSet]:
+        """Initial core overlapping the nodes most, if the overlap reaches the minimum core size."""
+        avail_nodes = set(nodes)
+        overlaps = [avail_nodes.intersection(core) for core in self.initial_cores]
+        state = max(overlaps, key=len, default=set())
+        return state if len(state) >= self.cfg.min_core_size else None
+
+    def _peel(self, nodes: list[Node], pen_weighting: float) -> NodeSet:
+        """
+        Greedily peel unstable nodes from the full node set.
+
+        Repeatedly drops the node mismatching its partition's best module in the most of the n_pen best partitions,
+        while doing so is expected to improve the score. Annealing from the peeled state at a lower temperature
+        explores less, so it need not find the same cores as a search from all nodes.
+        """
+        node_ref_index = self.__node_ref_index
+        labels = self._labels[:, [node_ref_index[node] for node in nodes]]
+        num_partitions, num_nodes = labels.shape
+        rows = np.arange(num_partitions)
+
+        # Count the nodes in each module of each partition
+        counts = np.zeros((num_partitions, labels.max(initial=0) + 1), dtype=np.int32)
+        np.add.at(counts, (np.repeat(rows, num_nodes), labels.ravel()), 1)
+        counts[:, 0] = 0  # Absent nodes mismatch every module
+
+        keep = np.ones(num_nodes, dtype=bool)
+        for size in range(num_nodes, 1, -1):
+            best_modules = counts.argmax(axis=1)
+            mismatch = size - counts[rows, best_modules]
+            penalized = np.argsort(mismatch, kind="stable")[:self.n_pen]
+            if mismatch[penalized].sum() == 0:
+                break
+
+            contribution = (labels[penalized] != best_modules[penalized, None]).sum(axis=0)
+            contribution[~keep] = -1
+            node = contribution.argmax()
+            if contribution[node] * pen_weighting <= 1:
+                break
+
+            keep[node] = False
+            counts[rows, labels[:, node]] -= 1
+            counts[:, 0] = 0
+        return set(np.asarray(nodes, dtype=object)[keep])
+
     def _all_form_core(self, nodes: NodeSet) -> bool:
         """Check if every node forms a core."""
         _, pen = self._score(nodes, 1)
@@ -257,3 +458,9 @@ class SigClu:
         else:
             candidate.add(node)
         return candidate
+
+
+def _find_region_cores(sc: SigClu) -> tuple[Partition, int, int, int]:
+    """Find every core of an instance in a worker process."""
+    sc.logger = Logger(silent=True)
+    return sc._find_region_cores(), sc.num_proposals, sc.num_sweeps, sc.num_searches
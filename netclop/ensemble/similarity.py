@@ -0,0 +1,103 @@
+"""Partition similarity measures over integer label arrays."""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+# Label matrix shared with worker processes
+_labels: Optional[np.ndarray] = None
+
+
+def contingency(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Contingency table of two label arrays over the nodes present (nonzero) in both."""
+    present = (a > 0) & (b > 0)
+    a, b = a[present].astype(np.int64), b[present].astype(np.int64)
+    if a.size == 0:
+        return np.zeros((0, 0), dtype=np.int64)
+    num_b = b.max() + 1
+    table = np.bincount(a * num_b + b, minlength=(a.max() + 1) * num_b).reshape(-1, num_b)
+    return table[table.any(axis=1)][:, table.any(axis=0)]
+
+
+def nmi(table: np.ndarray) -> float:
+    """Normalized mutual information of a contingency table, normalized by the arithmetic mean of entropies."""
+    n = table.sum()
+    if n == 0:
+        return np.nan
+    rows, cols = table.sum(axis=1), table.sum(axis=0)
+    i, j = np.nonzero(table)
+    joint = table[i, j] / n
+    mutual_info = np.sum(joint * (np.log(joint) - np.log(rows[i] / n) - np.log(cols[j] / n)))
+
+    entropy_rows = -np.sum(rows / n * np.log(rows / n))
+    entropy_cols = -np.sum(cols / n * np.log(cols / n))
+    normalizer = (entropy_rows + entropy_cols) / 2
+    if normalizer == 0:
+        return 1.0
+    return float(max(mutual_info, 0) / normalizer)
+
+
+def ari(table: np.ndarray) -> float:
+    """Adjusted Rand index of a contingency table."""
+    n = table.sum()
+    if n == 0:
+        return np.nan
+    pairs = np.sum(table * (table - 1)) / 2
+    pairs_rows = np.sum(table.sum(axis=1) * (table.sum(axis=1) - 1)) / 2
+    pairs_cols = np.sum(table.sum(axis=0) * (table.sum(axis=0) - 1)) / 2
+
+    expected = pairs_rows * pairs_cols / (n * (n - 1) / 2) if n > 1 else 0.0
+    maximum = (pairs_rows + pairs_cols) / 2
+    if maximum == expected:
+        return 1.0
+    return float((pairs - expected) / (maximum - expected))
+
+
+def sample_pairs(num_partitions: int, max_pairs: Optional[int], rng: np.random.Generator) -> np.ndarray:
+    """All pairs of partitions, or a sample of distinct pairs if there are more than max_pairs."""
+    num_pairs = num_partitions * (num_partitions - 1) // 2
+    if max_pairs is None or num_pairs <= max_pairs:
+        k = np.arange(num_pairs)
+    else:
+        k = np.sort(rng.choice(num_pairs, size=max_pairs, replace=False))
+
+    # Decode row-major indices into the strict upper triangle
+    n = num_partitions
+    i = n - 2 - np.floor(np.sqrt(-8 * k + 4 * n * (n - 1) - 7) / 2 - 0.5).astype(np.int64)
+    j = k + i + 1 - n * (n - 1) // 2 + (n - i) * (n - i - 1) // 2
+    return np.column_stack([i, j])
+
+
+def pair_similarity(labels: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+    """NMI and ARI of each pair of label rows."""
+    scores = np.empty((len(pairs), 2))
+    for k, (i, j) in enumerate(pairs):
+        table = contingency(np.asarray(labels[i]), np.asarray(labels[j]))
+        scores[k] = nmi(table), ari(table)
+    return scores
+
+
+def batched_pair_similarity(
+    labels: np.ndarray,
+    pairs: np.ndarray,
+    num_workers: int = 1,
+    batch_size: int = 1024,
+) -> np.ndarray:
+    """NMI and ARI of each pair of label rows, computed in batches over a process pool."""
+    if num_workers <= 1 or len(pairs) <= batch_size:
+        return pair_similarity(labels, pairs)
+
+    batches = [pairs[start:start + batch_size] for start in range(0, len(pairs), batch_size)]
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_set_labels, initargs=(labels,)) as pool:
+        return np.concatenate(list(pool.map(_pair_similarity, batches)))
+
+
+def _set_labels(labels: np.ndarray) -> None:
+    """Share the label matrix with a worker process once."""
+    global _labels
+    _labels = labels
+
+
+def _pair_similarity(pairs: np.ndarray) -> np.ndarray:
+    """NMI and ARI of pairs of rows of the shared label matrix."""
+    return pair_similarity(_labels, pairs)
@@ -0,0 +1,95 @@
+"""Sparsifier class."""
+import networkx as nx
+import numpy as np
+
+from netclop.config import SparsifyConfig
+from netclop.constants import WEIGHT_ATTR
+from netclop.log import Logger
+from netclop.typing import Node
+
+
+class Sparsifier:
+    """
+    Prunes weak edges and nodes from networks before partitioning.
+
+    Edges are filtered on arrays of edge endpoints and weights: self-loops are dropped if not kept, then edges
+    lighter than the minimum edge weight. Nodes whose total in- and out-strength over the remaining edges falls
+    below the minimum node strength are dropped with their edges, and optionally all but the largest strongly
+    connected component. Removed nodes are recorded with the reason: "edges" if none of their edges remain,
+    "strength", or "scc".
+    """
+    Config = SparsifyConfig
+
+    def __init__(self, logger: Logger = None, silent: bool = False, **config_options):
+        self.logger = Logger(silent=silent) if logger is None else logger
+        self.cfg = self.Config(**config_options)
+
+        self.removed: dict[Node, str] = {}
+
+    def is_active(self) -> bool:
+        """Check if any pruning is configured."""
+        return self.cfg != self.Config()
+
+    def run(self, net: nx.DiGraph) -> nx.DiGraph:
+        """Make a sparsified copy of a network, keeping node and edge order."""
+        nodes = np.array(list(net.nodes), dtype=object)
+        node_index = dict((node, index) for index, node in enumerate(nodes))
+        src = np.fromiter((node_index[u] for u, _ in net.edges), dtype=np.int64, count=net.number_of_edges())
+        tgt = np.fromiter((node_index[v] for _, v in net.edges), dtype=np.int64, count=net.number_of_edges())
+        weight = np.array([w for _, _, w in net.edges(data=WEIGHT_ATTR, default=1)])
+
+        keep = weight >= self.cfg.min_edge_weight
+        if not self.cfg.self_loops:
+            keep &= src != tgt
+        reasons = np.full(len(nodes), "", dtype=object)
+        is_kept = self._has_edges(len(nodes), src[keep], tgt[keep])
+        reasons[~is_kept] = "edges"
+
+        if self.cfg.min_node_strength > 0:
+            strength = (
+                np.bincount(src[keep], weights=weight[keep], minlength=len(nodes))
+                + np.bincount(tgt[keep], weights=weight[keep], minlength=len(nodes))
+            )
+            is_kept &= strength >= self.cfg.min_node_strength
+            keep &= is_kept[src] & is_kept[tgt]
+            # Nodes left without edges by dropping weak neighbours go too
+            is_kept &= self._has_edges(len(nodes), src[keep], tgt[keep])
+            reasons[(reasons == "") & ~is_kept] = "strength"
+
+        if self.cfg.largest_scc:
+            index_net = nx.DiGraph()
+            index_net.add_nodes_from(np.flatnonzero(is_kept).tolist())
+            index_net.add_edges_from(zip(src[keep].tolist(), tgt[keep].tolist()))
+            largest = max(nx.strongly_connected_components(index_net), key=len, default=set())
+            is_largest = np.zeros(len(nodes), dtype=bool)
+            is_largest[list(largest)] = True
+            reasons[is_kept & ~is_largest] = "scc"
+            is_kept &= is_largest
+            keep &= is_kept[src] & is_kept[tgt]
+
+        sparse_net = nx.DiGraph()
+        sparse_net.add_nodes_from(nodes[is_kept].tolist())
+        sparse_net.add_weighted_edges_from(
+            zip(nodes[src[keep]].tolist(), nodes[tgt[keep]].tolist(), weight[keep].tolist()),
+            weight=WEIGHT_ATTR,
+        )
+
+        removed = dict(zip(nodes[~is_kept].tolist(), reasons[~is_kept].tolist()))
+        for node, reason in removed.items():
+            self.removed.setdefault(node, reason)
+
+        counts = dict(zip(*np.unique(reasons[~is_kept].astype(str), return_counts=True)))
+        self.logger.log(
+            f"Sparsified to {sparse_net.number_of_nodes()} of {len(nodes)} nodes and "
+            f"{sparse_net.number_of_edges()} of {len(src)} edges"
+            + (f": removed {", ".join(f"{num} ({reason})" for reason, num in counts.items())} nodes" if counts else "")
+        )
+        return sparse_net
+
+    @staticmethod
+    def _has_edges(num_nodes: int, src: np.ndarray, tgt: np.ndarray) -> np.ndarray:
+        """Check which nodes are an endpoint of some edge."""
+        has_edges = np.zeros(num_nodes, dtype=bool)
+        has_edges[src] = True
+        has_edges[tgt] = True
+        return has_edges
@@ -1,6 +1,5 @@
 """UpSetPlot class."""
 from collections import defaultdict
-from dataclasses import dataclass
 from functools import cached_property
 from itertools import combinations, product
 from os import PathLike
@@ -10,18 +9,14 @@ import numpy as np
 import pandas as pd
 from upsetplot import UpSet
 
+from netclop.config import UpSetPlotConfig
 from netclop.constants import COLORS
 from netclop.typing import Partition
 
 
 class UpSetPlot:
     """Class for constructing an UpSet plot."""
-    @dataclass
-    class Config:
-        plot_stability: bool = True
-        norm_counts: bool = True
-        sig: float = 0.05
-        opacity: float = 0.7
+    Config = UpSetPlotConfig
 
     def __init__(self, cores: Partition, partitions: list[Partition], **kwargs):
         self.cores = cores
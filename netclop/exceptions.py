@@ -16,3 +16,9 @@ class OverlappingPartitionError(Exception):
         **kwargs
     ):
         super().__init__(msg, *args, **kwargs)
+
+
+class OutputError(Exception):
+    """Exception raised when outputs written in the background fail."""
+    def __init__(self, names: list[str], *args):
+        super().__init__(f"Failed to write outputs: {', '.join(names)}.", *args)
@@ -1,3 +1,21 @@
 """Package initialization for geo."""
-from .net import GeoNet
-from .plot import GeoPlot
+from importlib import import_module
+
+_exports = {
+    "GeoNet": "netclop.geo.net",
+    "HierarchicalSigClu": "netclop.geo.hierarchy",
+    "GeoPlot": "netclop.geo.plot",
+    "SlidingWindow": "netclop.geo.window",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str):
+    if name in _exports:
+        return getattr(import_module(_exports[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
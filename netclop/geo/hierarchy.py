@@ -0,0 +1,105 @@
+"""HierarchicalSigClu class."""
+from typing import Optional
+
+import h3.api.numpy_int as h3
+import networkx as nx
+
+from netclop.config import HierarchicalSigCluConfig
+from netclop.ensemble.ensemble import NetworkEnsemble
+from netclop.ensemble.netutils import label_partition
+from netclop.exceptions import MissingResultError
+from netclop.log import Logger
+from netclop.typing import NodeSet, Partition
+
+
+class HierarchicalSigClu:
+    """
+    Coarse-to-fine significance clustering across H3 resolutions.
+
+    The full pipeline is run at the coarsest resolution. At each finer resolution, core searches are restricted to
+    the children of each coarser core plus a boundary band of neighbouring cells. Only significance clustering is
+    restricted: the networks at every resolution are still bootstrapped and partitioned whole. If a resolution finds
+    no cores, the next finer one is searched unrestricted.
+    """
+    Config = HierarchicalSigCluConfig
+
+    def __init__(
+        self,
+        nets: dict[int, nx.DiGraph | list[nx.DiGraph]],
+        logger: Logger = None,
+        silent: bool = False,
+        ne_options: dict = None,
+        sc_options: dict = None,
+        sparsify_options: dict = None,
+        **config_options,
+    ):
+        self.logger = Logger(silent=silent) if logger is None else logger
+        self.cfg = self.Config(**config_options)
+
+        self.nets = nets
+        self.ne_options = {} if ne_options is None else ne_options
+        self.sc_options = {} if sc_options is None else sc_options
+        self.sparsify_options = {} if sparsify_options is None else sparsify_options
+
+        self.ensembles: dict[int, NetworkEnsemble] = {}
+
+    @property
+    def resolutions(self) -> list[int]:
+        """Resolutions from coarse to fine."""
+        return sorted(self.nets)
+
+    @property
+    def ensemble(self) -> NetworkEnsemble:
+        """Network ensemble at the finest resolution."""
+        if self.resolutions[-1] not in self.ensembles:
+            raise MissingResultError()
+        return self.ensembles[self.resolutions[-1]]
+
+    @property
+    def cores(self) -> Partition:
+        """Cores at the finest resolution."""
+        return self.ensemble.cores
+
+    def run(self, upset_config: Optional[dict] = None) -> None:
+        """Significance cluster from coarse to fine resolution, making an UpSet plot at the finest."""
+        cores, coarse_res = None, None
+        for res in self.resolutions:
+            self.logger.log(f"Hierarchical significance clustering: res {res}")
+            ne = NetworkEnsemble(self.nets[res], logger=self.logger, **self.ne_options)
+            if self.sparsify_options:
+                ne.sparsify(**self.sparsify_options)
+
+            regions = None
+            if cores is not None:
+                regions = self.refine(cores, coarse_res, ne.nodes)
+
+            ne.sigclu(
+                upset_config=upset_config if res == self.resolutions[-1] else None,
+                regions=regions,
+                **self.sc_options,
+            )
+            self.ensembles[res] = ne
+            cores, coarse_res = ne.cores, res
+            if not cores and res != self.resolutions[-1]:
+                self.logger.log(f"No cores at res {res}, so the next finer resolution is searched unrestricted")
+                cores = None
+
+    def refine(self, cores: Partition, coarse_res: int, nodes: NodeSet) -> list[NodeSet]:
+        """Map coarse cores to search regions of finer nodes: their children and a boundary band."""
+        labels = label_partition(cores)
+
+        regions = [set() for _ in cores]
+        for node in nodes:
+            label = labels.get(str(h3.cell_to_parent(int(node), coarse_res)))
+            if label is not None:
+                regions[label - 1].add(node)
+
+        if self.cfg.boundary_band > 0:
+            for region in regions:
+                band = set()
+                for node in region:
+                    band.update(str(cell) for cell in h3.grid_disk(int(node), self.cfg.boundary_band))
+                region.update(band.intersection(nodes))
+
+        self.logger.log(f"Search regions of {', '.join(str(len(region)) for region in regions)} nodes", level="DEBUG")
+        return regions
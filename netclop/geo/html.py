@@ -0,0 +1,102 @@
+"""Compact interactive HTML export with TopoJSON geometry."""
+import json
+import warnings
+from typing import Any, Sequence
+
+import numpy as np
+import shapely
+
+TOPOJSON_CLIENT_URL = "https://cdn.jsdelivr.net/npm/topojson-client@3"
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotly_url}"></script>
+<script src="{topojson_url}"></script>
+<style>html, body, #map {{ width: 100%; height: 100%; margin: 0; }}</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+const topology = {topology};
+const figure = {figure};
+// Geometry is decoded once and shared by every trace
+const cells = topojson.feature(topology, topology.objects.cells);
+for (const trace of figure.data) {{
+  trace.geojson = cells;
+}}
+Plotly.newPlot("map", figure.data, figure.layout, {{responsive: true}});
+</script>
+</body>
+</html>
+"""
+
+
+def to_topojson(polygons: Sequence[shapely.Polygon], ids: Sequence, quantization: int = 100_000) -> dict[str, Any]:
+    """
+    Encode polygons as a quantized TopoJSON topology with shared arcs.
+
+    Exterior rings are quantized to a grid of quantization steps across the bounding box and split into edges.
+    Each edge is stored once as an arc and referenced, reversed where needed, by every polygon it bounds, so
+    boundaries between adjacent cells are written once. Polygons smaller than a grid step collapse to no edges and
+    are written as null geometries with a warning; a finer quantization keeps them.
+    """
+    exteriors = shapely.get_exterior_ring(np.asarray(polygons, dtype=object))
+    coords, ring = shapely.get_coordinates(exteriors, return_index=True)
+
+    x0, y0 = coords.min(axis=0)
+    x1, y1 = coords.max(axis=0)
+    scale = np.array([max(x1 - x0, 1e-12), max(y1 - y0, 1e-12)]) / (quantization - 1)
+    quantized = np.rint((coords - [x0, y0]) / scale).astype(np.int64)
+    grid, points = np.unique(quantized, axis=0, return_inverse=True)
+    points = points.reshape(-1)
+
+    # Edges join consecutive vertices of a ring, dropping those collapsed by quantization
+    is_edge = (ring[:-1] == ring[1:]) & (points[:-1] != points[1:])
+    src, tgt, edge_ring = points[:-1][is_edge], points[1:][is_edge], ring[:-1][is_edge]
+
+    # Arcs are stored in ascending point order; edges running the other way reference them reversed
+    is_forward = src < tgt
+    lo, hi = np.where(is_forward, src, tgt), np.where(is_forward, tgt, src)
+    arc_keys, arc_index = np.unique(lo * len(grid) + hi, return_inverse=True)
+    refs = np.where(is_forward, arc_index, ~arc_index)
+
+    arc_start, arc_end = grid[arc_keys // len(grid)], grid[arc_keys % len(grid)]
+    arcs = np.stack([arc_start, arc_end - arc_start], axis=1).tolist()
+
+    # Rings are matched to ids by polygon index, as collapsed rings have no edges
+    rings, starts = np.unique(edge_ring, return_index=True)
+    ring_refs = dict(zip(rings.tolist(), np.split(refs, starts[1:])))
+    geometries = [
+        {"type": "Polygon", "id": id_, "arcs": [ring_refs[index].tolist()]}
+        if index in ring_refs else {"type": None, "id": id_}
+        for index, id_ in enumerate(ids)
+    ]
+    if (num_collapsed := len(geometries) - len(ring_refs)) > 0:
+        warnings.warn(
+            f"{num_collapsed} polygons collapsed at quantization {quantization} and are left without geometry.",
+            stacklevel=2,
+        )
+    return {
+        "type": "Topology",
+        "transform": {"scale": scale.tolist(), "translate": [float(x0), float(y0)]},
+        "objects": {"cells": {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": arcs,
+    }
+
+
+def render_html(figure: dict[str, Any], topology: dict[str, Any], plotly_url: str, title: str = "netclop") -> str:
+    """
+    Render a figure whose traces share the geometry of a topology as a standalone HTML page.
+
+    The page loads plotly.js and topojson-client from their CDNs, so it needs network access to display.
+    """
+    return TEMPLATE.format(
+        title=title,
+        plotly_url=plotly_url,
+        topojson_url=TOPOJSON_CLIENT_URL,
+        topology=json.dumps(topology, separators=(",", ":")),
+        figure=json.dumps(figure, separators=(",", ":")),
+    )
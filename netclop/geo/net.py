@@ -1,11 +1,19 @@
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from functools import cached_property
 from os import PathLike
-from typing import Sequence
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
 
+import geopandas as gpd
 import networkx as nx
+import numpy as np
 import pandas as pd
+import shapely
 from h3.api import numpy_int as h3
 
+from netclop.config import GeoNetConfig
 from netclop.constants import WEIGHT_ATTR
 from netclop.typing import Cell
 from netclop.log import Logger
@@ -13,62 +21,281 @@ from netclop.log import Logger
 
 class GeoNet:
     """Helper class for network construction from geographic data."""
-    @dataclass(frozen=True)
-    class Config:
-        res: int = 5
+    Config = GeoNetConfig
 
     def __init__(self, logger: Logger = None, silent: bool = False, **config_options):
         self.logger = Logger(silent=silent) if logger is None else logger
         self.cfg = self.Config(**config_options)
 
+        self.num_particles = 0
+        self.num_dropped = 0
+
+    @property
+    def is_filtered(self) -> bool:
+        """Check if particles are filtered to a spatial domain."""
+        return self.cfg.bbox is not None or self.cfg.mask is not None or self.cfg.cells is not None
+
+    def in_domain(self, lngs: Sequence[float], lats: Sequence[float]) -> np.ndarray:
+        """
+        Check which (lng, lat) coordinate pairs lie within the bounding box, polygon mask, and the bounds of the
+        cell allowlist.
+
+        The allowlist bounds only rule out positions far from every allowed cell; positions within them are checked
+        against the allowlist once binned.
+        """
+        lngs, lats = np.asarray(lngs, dtype=float), np.asarray(lats, dtype=float)
+        keep = np.ones(len(lngs), dtype=bool)
+        for bbox in (self.cfg.bbox, self._allowed_bounds if self.cfg.cells is not None else None):
+            if bbox is not None:
+                min_lng, min_lat, max_lng, max_lat = bbox
+                keep &= (lngs >= min_lng) & (lngs <= max_lng) & (lats >= min_lat) & (lats <= max_lat)
+        if self.cfg.mask is not None:
+            # Only positions still kept are tested against the mask
+            index = np.flatnonzero(keep)
+            keep[index] = shapely.contains_xy(self._mask, lngs[index], lats[index])
+        return keep
+
+    def is_allowed(self, cells: np.ndarray) -> np.ndarray:
+        """Check which cells lie within the allowlist, directly or through a parent cell."""
+        unique_cells, inverse = np.unique(cells, return_inverse=True)
+        allowed_cells, resolutions = self._allowed_cells
+        is_allowed = np.isin(unique_cells, allowed_cells)
+        for res in resolutions[resolutions < self.cfg.res]:
+            parents = np.array([h3.cell_to_parent(int(cell), int(res)) for cell in unique_cells], dtype=np.int64)
+            is_allowed |= np.isin(parents, allowed_cells)
+        return is_allowed[inverse]
+
     def bin_positions(self, lngs: Sequence[float], lats: Sequence[float]) -> list[Cell]:
         """Bin (lng, lat) coordinate pairs into an H3 cell."""
         return [h3.latlng_to_cell(lat, lng, self.cfg.res) for lat, lng in zip(lats, lngs)]
 
-    def make_lpt_edges(self, path: PathLike) -> tuple[tuple[Cell, Cell], ...]:
-        """Make an edge list (with duplicates) from LPT positions."""
-        data = pd.read_csv(
-            path,
-            names=["initial_lng", "initial_lat", "final_lng", "final_lat"],
-            index_col=False,
-            comment="#",
-        )
+    def make_lpt_edges(self, path: PathLike, data: Optional[pd.DataFrame] = None) -> tuple[tuple[Cell, Cell], ...]:
+        """
+        Make an edge list (with duplicates) from LPT positions, read from path unless already given.
+
+        Particles with an endpoint outside the bounding box or polygon mask are dropped before binning. With a cell
+        allowlist, particles with an endpoint outside the bounds of the allowed cells are also dropped before
+        binning, and the remaining particles with an endpoint outside the allowed cells after.
+        """
+        if data is None:
+            data = self.read_lpt(path)
+        num_particles = len(data)
+        if self.is_filtered:
+            data = data[
+                self.in_domain(data["initial_lng"], data["initial_lat"])
+                & self.in_domain(data["final_lng"], data["final_lat"])
+            ]
 
         srcs = self.bin_positions(data["initial_lng"], data["initial_lat"])
         tgts = self.bin_positions(data["final_lng"], data["final_lat"])
+        if self.cfg.cells is not None:
+            srcs, tgts = np.asarray(srcs, dtype=np.int64), np.asarray(tgts, dtype=np.int64)
+            keep = self.is_allowed(srcs) & self.is_allowed(tgts)
+            srcs, tgts = srcs[keep].tolist(), tgts[keep].tolist()
+
+        self.num_particles += num_particles
+        self.num_dropped += num_particles - len(srcs)
+        if self.is_filtered:
+            self.logger.log(
+                f"Dropped {num_particles - len(srcs)} of {num_particles} particles from '{path}'", level="DEBUG",
+            )
         return tuple(zip(srcs, tgts))
 
-    def make_lpt_net(self, path: PathLike) -> nx.DiGraph:
+    def make_lpt_edge_counts(self, path: PathLike, data: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Count transitions between cells from LPT positions, in order of first occurrence."""
+        edges = pd.DataFrame(self.make_lpt_edges(path, data), columns=["src", "tgt"], dtype="int64")
+        return edges.groupby(["src", "tgt"], sort=False).size().rename(WEIGHT_ATTR).reset_index()
+
+    def make_lpt_net(self, path: PathLike, data: Optional[pd.DataFrame] = None) -> nx.DiGraph:
         """Construct a network from LPT positions."""
-        net = nx.DiGraph()
-        edges = self.make_lpt_edges(path)
+        return self.net_from_edge_counts(self.make_lpt_edge_counts(path, data))
 
-        for src, tgt in edges:
-            if net.has_edge(src, tgt):
-                # Record another transition along a recorded edge
-                net[src][tgt][WEIGHT_ATTR] += 1
-            else:
-                # Record a new edge
-                net.add_edge(src, tgt, weight=1)
+    def read_lpt_ahead(self, paths: Sequence[PathLike]) -> Iterator[tuple[PathLike, pd.DataFrame]]:
+        """
+        Read LPT positions of each path in order, with the next files read on background threads meanwhile.
 
-        nx.relabel_nodes(net, dict((name, str(name)) for name in net.nodes), copy=False)
-        return net
+        Up to prefetch files are read ahead of the one being processed. At most prefetch + 2 parsed files are held at
+        once: those read ahead, the one being processed, and the one being read once processing moves on while the
+        previous file is still referenced. Without prefetch, files are read on demand.
+        """
+        if self.cfg.prefetch < 1 or len(paths) < 2:
+            for path in paths:
+                yield path, self.read_lpt(path)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.cfg.prefetch, thread_name_prefix="lpt-read") as pool:
+            pending = deque()
+            paths = iter(paths)
+            try:
+                for path in paths:
+                    pending.append((path, pool.submit(self.read_lpt, path)))
+                    if len(pending) > self.cfg.prefetch:
+                        path, future = pending.popleft()
+                        yield path, future.result()
+                while pending:
+                    path, future = pending.popleft()
+                    yield path, future.result()
+            finally:
+                # Reads not yet started are dropped if iteration stops early
+                for _, future in pending:
+                    future.cancel()
 
     def from_lpt(self, paths: Sequence[PathLike]) -> nx.DiGraph | list[nx.DiGraph]:
         self.logger.log(
             f"Constructing {len(paths)} network{"s" if len(paths) > 1 else ""} from LPT simulation: "
             f"res {self.cfg.res}"
         )
-        if len(paths) == 1:
-            net = self.make_lpt_net(paths[0])
+        with self.logger.stage("net construction", unit="particles") as stage:
+            if len(paths) == 1:
+                net = self.make_lpt_net(paths[0])
+            else:
+                net = [
+                    self.make_lpt_net(path, data) for path, data in self.logger.pbar(
+                        self.read_lpt_ahead(paths), total=len(paths), desc="Net construction", unit="net",
+                    )
+                ]
+            stage.items = self._log_size(net)
+        self.log_dropped()
+        return net
+
+    def from_lpt_multires(
+        self,
+        paths: Sequence[PathLike],
+        resolutions: Sequence[int],
+    ) -> dict[int, nx.DiGraph | list[nx.DiGraph]]:
+        """
+        Construct networks at several resolutions from a single ingestion of LPT positions.
+
+        Positions are binned once at the finest resolution, and coarser networks are derived by mapping cells to
+        their H3 parents and summing edge weights. As H3 cells do not nest exactly, a position near a cell boundary
+        can fall in a different coarse cell than if binned at the coarse resolution directly.
+        """
+        resolutions = sorted(set(resolutions), reverse=True)
+        fine = GeoNet(logger=self.logger, **(asdict(self.cfg) | {"res": resolutions[0]}))
+        self.logger.log(
+            f"Constructing {len(paths)} network{"s" if len(paths) > 1 else ""} from LPT simulation: "
+            f"res {", ".join(map(str, resolutions))}"
+        )
+
+        with self.logger.stage("net construction", unit="particles") as stage:
+            counts = [
+                fine.make_lpt_edge_counts(path, data) for path, data in self.logger.pbar(
+                    fine.read_lpt_ahead(paths), total=len(paths), desc="Binning", unit="file",
+                )
+            ]
+            stage.items = int(sum(count[WEIGHT_ATTR].sum() for count in counts))
+        fine.log_dropped()
+
+        nets = {}
+        for res in resolutions:
+            counts = [self.coarsen_edge_counts(count, res) for count in counts]
+            res_nets = [self.net_from_edge_counts(count) for count in counts]
+            nets[res] = res_nets[0] if len(paths) == 1 else res_nets
+
+            self.logger.log(f"res {res}:", level="DEBUG")
+            self._log_size(nets[res])
+        return nets
+
+    def log_dropped(self) -> None:
+        """Log how many particles were dropped outside the spatial domain."""
+        if self.is_filtered:
             self.logger.log(
-                f"{len(net.nodes)} nodes, "
-                f"{len(net.edges)} edges"
+                f"Dropped {self.num_dropped} of {self.num_particles} particles "
+                f"({self.num_dropped / max(self.num_particles, 1):.1%}) outside the spatial domain"
             )
-        else:
-            net = [self.make_lpt_net(path) for path in self.logger.pbar(paths, desc="Net construction", unit="net")]
+
+    @cached_property
+    def _mask(self) -> shapely.Geometry:
+        """Union of the mask polygons in longitude and latitude, prepared for repeated containment tests."""
+        gdf = gpd.read_file(self.cfg.mask)
+        if gdf.crs is not None:
+            gdf = gdf.to_crs(4326)
+        mask = shapely.union_all(gdf.geometry.values)
+        shapely.prepare(mask)
+        return mask
+
+    @cached_property
+    def _allowed_cells(self) -> tuple[np.ndarray, np.ndarray]:
+        """Allowlisted cells, with cells finer than the network mapped to their parents, and their resolutions."""
+        cells = [
+            int(cell) if cell.isdigit() else h3.str_to_int(cell)
+            for cell in Path(self.cfg.cells).read_text().split()
+        ]
+        cells = [
+            h3.cell_to_parent(cell, self.cfg.res) if h3.get_resolution(cell) > self.cfg.res else cell
+            for cell in cells
+        ]
+        cells = np.unique(np.array(cells, dtype=np.int64))
+        return cells, np.unique([h3.get_resolution(int(cell)) for cell in cells])
+
+    @cached_property
+    def _allowed_bounds(self) -> tuple[float, float, float, float]:
+        """
+        Bounding box of the allowlisted cells, padded by the extent of the largest cell.
+
+        Covers the globe if a cell crosses the antimeridian or holds a pole, where vertex bounds do not bound it.
+        """
+        allowed_cells, _ = self._allowed_cells
+        boundaries = [np.array(h3.cell_to_boundary(int(cell))) for cell in allowed_cells]
+        mins = np.array([boundary.min(axis=0) for boundary in boundaries]).reshape(-1, 2)
+        maxs = np.array([boundary.max(axis=0) for boundary in boundaries]).reshape(-1, 2)
+        extents = maxs - mins
+        if not len(boundaries) or extents[:, 1].max() > 180:
+            return -180.0, -90.0, 180.0, 90.0
+
+        # Cell edges are geodesics, which may bow slightly past the vertices
+        pad = extents.max()
+        (min_lat, min_lng), (max_lat, max_lng) = mins.min(axis=0) - pad, maxs.max(axis=0) + pad
+        return float(min_lng), float(max(min_lat, -90)), float(max_lng), float(min(max_lat, 90))
+
+    def _log_size(self, net: nx.DiGraph | list[nx.DiGraph]) -> int:
+        """Log size of networks, returning the number of particles they record."""
+        if isinstance(net, nx.DiGraph):
             self.logger.log(
-                f"{self.logger.stat([len(n.nodes) for n in net])} nodes, "
-                f"{self.logger.stat([len(n.edges) for n in net])} edges"
+                f"{len(net.nodes)} nodes, "
+                f"{len(net.edges)} edges"
             )
+            return int(net.size(weight=WEIGHT_ATTR))
+
+        self.logger.log(
+            f"{self.logger.stat([len(n.nodes) for n in net])} nodes, "
+            f"{self.logger.stat([len(n.edges) for n in net])} edges"
+        )
+        return int(sum(n.size(weight=WEIGHT_ATTR) for n in net))
+
+    @staticmethod
+    def read_lpt(path: PathLike) -> pd.DataFrame:
+        """Read LPT positions."""
+        return pd.read_csv(
+            path,
+            names=["initial_lng", "initial_lat", "final_lng", "final_lat"],
+            index_col=False,
+            comment="#",
+        )
+
+    @staticmethod
+    def coarsen_edge_counts(counts: pd.DataFrame, res: int) -> pd.DataFrame:
+        """Map cells of edge counts to their parents at a coarser resolution and sum weights."""
+        cells = pd.unique(np.concatenate([counts["src"].to_numpy(), counts["tgt"].to_numpy()]))
+        if len(cells) == 0 or h3.get_resolution(int(cells[0])) == res:
+            return counts
+
+        parents = pd.Series([h3.cell_to_parent(int(cell), res) for cell in cells], index=cells, dtype="int64")
+        coarse = pd.DataFrame({
+            "src": counts["src"].map(parents),
+            "tgt": counts["tgt"].map(parents),
+            WEIGHT_ATTR: counts[WEIGHT_ATTR],
+        })
+        return coarse.groupby(["src", "tgt"], sort=False)[WEIGHT_ATTR].sum().reset_index()
+
+    @staticmethod
+    def net_from_edge_counts(counts: pd.DataFrame) -> nx.DiGraph:
+        """Construct a network from edge counts, naming nodes by cell."""
+        net = nx.DiGraph()
+        net.add_weighted_edges_from(
+            zip(counts["src"].tolist(), counts["tgt"].tolist(), counts[WEIGHT_ATTR].tolist()),
+            weight=WEIGHT_ATTR,
+        )
+
+        nx.relabel_nodes(net, dict((name, str(name)) for name in net.nodes), copy=False)
         return net
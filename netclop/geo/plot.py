@@ -1,18 +1,21 @@
 """GeoPlot class."""
+from functools import cached_property
 from json import loads
 from os import PathLike
 from typing import Optional, Self, Sequence
 
 import geopandas as gpd
 import h3.api.numpy_int as h3
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import shapely
-from matplotlib.colors import LinearSegmentedColormap
+from plotly.offline import get_plotlyjs_version
 
 from netclop.centrality import CentralityScale, centrality_registry
 from netclop.constants import COLORS
+from netclop.geo.html import render_html, to_topojson
 from netclop.typing import NodeMetric, NodeSet, Partition
 
 
@@ -20,10 +23,29 @@ class GeoPlot:
     """Geospatial plotting."""
     def __init__(self, gdf: gpd.GeoDataFrame):
         self.gdf = gdf
-        self.geojson = loads(self.gdf.to_json())
 
         self.fig: Optional[go.Figure] = None
 
+    @cached_property
+    def geojson(self) -> dict:
+        """GeoJSON of cell exteriors, with features identified by gdf index."""
+        coords, rows = shapely.get_coordinates(
+            shapely.get_exterior_ring(self.gdf.geometry.values), return_index=True,
+        )
+        rings = np.split(coords, np.flatnonzero(np.diff(rows)) + 1)
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "id": str(idx),
+                    "properties": {},
+                    "geometry": {"type": "Polygon", "coordinates": [ring.tolist()]},
+                }
+                for idx, ring in zip(self.gdf.index, rings)
+            ],
+        }
+
     def save(self, path: Optional[PathLike]) -> None:
         """Save figure to static image."""
         if path is not None:
@@ -37,13 +59,86 @@ class GeoPlot:
         """Show plot."""
         self.fig.show()
 
-    def plot_structure(self, path: Optional[PathLike]=None) -> None:
-        """Plot structure."""
+    def save_html(
+        self,
+        path: PathLike,
+        metrics: Optional[dict[str, NodeMetric]]=None,
+        quantization: int=100_000,
+    ) -> None:
+        """
+        Save structure and centrality layers to one interactive HTML page.
+
+        Cell geometry is written once as quantized TopoJSON with shared arcs and referenced by every trace, rather
+        than embedded as GeoJSON in each, and decoded in the browser. Layers are switched with buttons. The page
+        loads plotly.js and topojson-client from their CDNs, so it is not viewable offline.
+        """
+        data, layers = [], []
+
+        self.plot_structure()
+        layout = self.fig.layout.to_plotly_json()
+        layers.append(("Structure", len(self.fig.data)))
+        data.extend(self.fig.data)
+
+        for index, metric in (metrics or {}).items():
+            self.plot_centrality(metric, index)
+            layers.append((index.capitalize(), len(self.fig.data)))
+            data.extend(self.fig.data)
+
+        traces = []
+        for trace in data:
+            trace = trace.to_plotly_json()
+            trace.pop("geojson", None)
+            traces.append(trace)
+
+        visibility, start = [], 0
+        for _, num_traces in layers:
+            visibility.append([start <= i < start + num_traces for i in range(len(traces))])
+            start += num_traces
+        for trace, visible in zip(traces, visibility[0]):
+            trace["visible"] = visible
+
+        if len(layers) > 1:
+            layout["updatemenus"] = [{
+                "type": "buttons",
+                "direction": "right",
+                "x": 0.01,
+                "xanchor": "left",
+                "y": 0.99,
+                "yanchor": "top",
+                "buttons": [
+                    {"label": label, "method": "update", "args": [{"visible": visible}]}
+                    for (label, _), visible in zip(layers, visibility)
+                ],
+            }]
+
+        figure = loads(go.Figure(data=traces, layout=layout).to_json())
+        topology = to_topojson(self.gdf.geometry.values, self.gdf.index.tolist(), quantization)
+        plotly_url = f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+        with open(path, "w") as f:
+            f.write(render_html(figure, topology, plotly_url))
+
+    def plot_structure(
+        self,
+        path: Optional[PathLike]=None,
+        dissolve: bool=False,
+        tolerance: Optional[float]=None,
+    ) -> None:
+        """
+        Plot structure.
+
+        If dissolving, each core is drawn as one (multi)polygon of its merged cells rather than a polygon per cell,
+        optionally simplified at a tolerance in degrees while keeping boundaries shared between cores intact.
+        """
         self.fig = go.Figure()
 
         self._color_node_core()
-        for idx, trace_gdf in self._get_traces(self.gdf, "core"):
-            self._add_trace_from_gdf(trace_gdf, str(idx))
+        gdf, geojson = self.gdf, self.geojson
+        if dissolve:
+            gdf = self._dissolve_cores(tolerance)
+            geojson = loads(gdf.to_json())
+
+        for idx, trace_gdf in self._get_traces(gdf, "core"):
+            self._add_trace_from_gdf(trace_gdf, str(idx), geojson=geojson)
 
         self._set_layout()
         self._set_legend()
@@ -60,7 +155,7 @@ class GeoPlot:
         self.fig = go.Figure()
 
         gdf = self.gdf
-        gdf[index] = gdf["node"].map(metric)
+        z = self._join_metric(metric)
 
         scale = centrality_registry.get(index).scale
         match scale:
@@ -74,7 +169,7 @@ class GeoPlot:
         self.fig.add_trace(go.Choropleth(
             geojson=self.geojson,
             locations=gdf.index,
-            z=gdf[index],
+            z=z,
             zmid=zmid,
             marker={"line": {"width": 0.1, "color": "white"}},
             showscale=True,
@@ -92,18 +187,14 @@ class GeoPlot:
         col: str,
     ) -> list[tuple[str | int, gpd.GeoDataFrame]]:
         """Get all traces and corresponding labels to add to plot."""
-        traces = []
-        trace_idx = self._get_sorted_unique_col(gdf, col)
-        for idx in trace_idx:
-            trace_gdf = self._filter_to_col_entry(gdf, col, idx)
-            traces.append((idx, trace_gdf))
-        return traces
+        return [(idx, trace_gdf) for idx, trace_gdf in gdf.groupby(col, sort=True)]
 
     def _add_trace_from_gdf(
         self,
         trace_gdf: gpd.GeoDataFrame,
         label: str,
         legend: bool=True,
+        geojson: Optional[dict]=None,
     ) -> None:
         """Add trace to plot froma gpd.GeoDataFrame."""
         if not trace_gdf.empty:
@@ -113,7 +204,7 @@ class GeoPlot:
                 label = "Noise"
 
             self.fig.add_trace(go.Choropleth(
-                geojson=self.geojson,
+                geojson=self.geojson if geojson is None else geojson,
                 locations=trace_gdf.index,
                 z=trace_gdf["core"],
                 name=label,
@@ -169,26 +260,55 @@ class GeoPlot:
     def _color_node_core(self) -> None:
         """Assign a color to node corresponding to its core."""
         noise = "#CCCCCC"
-        colors = {str(i): color for i, color in enumerate(COLORS, 1)}
-        colors_fuzzy = {
-            k: LinearSegmentedColormap.from_list("", [noise, color]) for k, color in colors.items()
-        }
-
-        n_colors = len(colors)
-        self.gdf["color"] = self.gdf.apply(
-            lambda node: colors[str((int(node["core"]) - 1) % n_colors + 1)] if node["core"]
-            else noise,
-            axis=1
+        palette = np.array(COLORS, dtype=object)
+        cores = self.gdf["core"].to_numpy(dtype=np.int64)
+        self.gdf["color"] = np.where(cores > 0, palette[(cores - 1) % len(palette)], noise)
+
+    @cached_property
+    def _node_index(self) -> pd.Index:
+        """Index of nodes to rows of the gdf."""
+        return pd.Index(self.gdf["node"])
+
+    def _join_metric(self, metric: NodeMetric) -> np.ndarray:
+        """Align a node metric to the rows of the gdf, with NaN for nodes without a value."""
+        values = np.full(len(self.gdf), np.nan)
+        if metric:
+            rows = self._node_index.get_indexer(list(metric.keys()))
+            found = rows >= 0
+            values[rows[found]] = np.fromiter(metric.values(), dtype=float, count=len(metric))[found]
+        return values
+
+    def _dissolve_cores(self, tolerance: Optional[float] = None) -> gpd.GeoDataFrame:
+        """Dissolve the cells of each core into one geometry, optionally simplifying the core coverage."""
+        groups = self.gdf.groupby("core", sort=True)
+        geometry = np.array([self._dissolve_cells(nodes) for _, nodes in groups["node"]], dtype=object)
+        if tolerance:
+            if hasattr(shapely, "coverage_simplify"):
+                # Simplifies edges shared between cores once, so cores stay edge-matched
+                geometry = shapely.coverage_simplify(geometry, tolerance)
+            else:
+                geometry = shapely.simplify(geometry, tolerance, preserve_topology=True)
+        geometry = np.array([self._orient_cw(geom) for geom in geometry], dtype=object)
+
+        sizes = groups.size()
+        return gpd.GeoDataFrame(
+            {
+                "core": sizes.index,
+                "node": [f"{"Noise" if core == 0 else f"Core {core}"}: {size} nodes" for core, size in sizes.items()],
+                "color": groups["color"].first().values,
+            },
+            geometry=geometry,
         )
 
     @classmethod
     def from_cores(cls, cores: Partition, noise_nodes: Optional[NodeSet] = None) -> Self:
         """Make class instance from a set of cores."""
-        core_nodes = [(node, i) for i, core in enumerate(cores, 1) for node in core]
-        if noise_nodes is not None:
-            core_nodes.extend([(node, 0) for node in noise_nodes])
-
-        df = pd.DataFrame(core_nodes, columns=["node", "core"])
+        groups = [*cores, noise_nodes if noise_nodes is not None else ()]
+        labels = [*range(1, len(cores) + 1), 0]
+        df = pd.DataFrame({
+            "node": np.fromiter((node for group in groups for node in group), dtype=object),
+            "core": np.repeat(labels, [len(group) for group in groups]),
+        })
         return cls.from_dataframe(df)
 
     @classmethod
@@ -206,19 +326,36 @@ class GeoPlot:
     @staticmethod
     def _geo_from_cells(cells: Sequence[str]) -> list[shapely.Polygon]:
         """Get GeoJSON geometries from H3 cells."""
-        return [
+        boundaries = [h3.cell_to_boundary(int(cell), geo_json=True)[::-1] for cell in cells]
+        rings = shapely.linearrings(
+            np.concatenate(boundaries),
+            indices=np.repeat(np.arange(len(boundaries)), [len(boundary) for boundary in boundaries]),
+        )
+        return list(shapely.polygons(rings))
+
+    @staticmethod
+    def _dissolve_cells(cells: Sequence[str]) -> shapely.MultiPolygon:
+        """Merge H3 cells into polygons with exactly shared edges."""
+        polygons = h3.cells_to_polygons(np.array([int(cell) for cell in cells], dtype=np.uint64))
+        return shapely.MultiPolygon([
             shapely.Polygon(
-                h3.cell_to_boundary(int(cell), geo_json=True)[::-1]
-            ) for cell in cells
-        ]
+                np.asarray(polygon.outer)[:, ::-1],
+                [np.asarray(hole)[:, ::-1] for hole in polygon.holes],
+            ) for polygon in polygons
+        ])
+
+    @staticmethod
+    def _orient_cw(geom: shapely.Polygon | shapely.MultiPolygon) -> shapely.MultiPolygon:
+        """Wind exterior rings clockwise, as for individual cells."""
+        polygons = geom.geoms if isinstance(geom, shapely.MultiPolygon) else [geom]
+        return shapely.MultiPolygon([shapely.geometry.polygon.orient(polygon, sign=-1.0) for polygon in polygons])
 
     @staticmethod
     def _reindex_modules(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         """Re-index module IDs ascending from South to North."""
         # Find the southernmost point for each module
-        south_points = gdf.groupby("module")["geometry"].apply(
-            lambda polygons: min(polygons, key=lambda polygon: polygon.bounds[1])
-        ).apply(lambda polygon: polygon.bounds[1])
+        miny = pd.Series(shapely.bounds(gdf.geometry.values)[:, 1], index=gdf.index)
+        south_points = miny.groupby(gdf["module"]).min()
 
         # Sort the modules based on their southernmost points" latitude, in ascending order
         sorted_modules = south_points.sort_values(ascending=True).index
@@ -227,19 +364,10 @@ class GeoPlot:
         module_id_mapping = {
             module: index - 1 for index, module in enumerate(sorted_modules, start=1)
         }
-        gdf["module"] = gdf["module"].map(module_id_mapping)
+        gdf = gdf.assign(module=gdf["module"].map(module_id_mapping))
 
         # Sort DataFrame
         gdf = gdf.sort_values(by=["module"], ascending=[True]).reset_index(drop=True)
         gdf["module"] = gdf["module"].astype(str)
         return gdf
 
-    @staticmethod
-    def _get_sorted_unique_col(gdf: gpd.GeoDataFrame, col: str) -> list:
-        """Get all unique entries of a gdf column sorted."""
-        return sorted(gdf[col].unique(), key=int)
-
-    @staticmethod
-    def _filter_to_col_entry(gdf: gpd.GeoDataFrame, col: str, entry) -> gpd.GeoDataFrame:
-        """Get subset of gdf with column equal to a certain entry."""
-        return gdf[gdf[col] == entry]
@@ -0,0 +1,172 @@
+"""SlidingWindow class."""
+import hashlib
+import json
+import os
+from os import PathLike
+from pathlib import Path
+from typing import Optional, Sequence
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from netclop.config import SlidingWindowConfig
+from netclop.constants import WEIGHT_ATTR
+from netclop.geo.net import GeoNet
+from netclop.log import Logger
+
+
+class SlidingWindow:
+    """
+    Incrementally maintained network over a rolling window of LPT release files.
+
+    Each file is binned once into a table of edge counts kept in the state directory, and the aggregate network is
+    updated by adding the counts of files entering the window and subtracting those of files leaving it, so the
+    window is never re-ingested. Files are identified by their resolved path. Files are binned by a GeoNet with the
+    given options, e.g. to filter particles to a spatial domain, which must stay the same over the window's life.
+
+    Layout: window.json holding the resolution and binning options, window.npz holding the files in the window with
+    their aggregate counts, and tables/<file hash>.npz.
+    """
+    Config = SlidingWindowConfig
+
+    def __init__(
+        self,
+        path: PathLike,
+        logger: Logger = None,
+        silent: bool = False,
+        geonet_options: Optional[dict] = None,
+        **config_options,
+    ):
+        self.logger = Logger(silent=silent) if logger is None else logger
+        self.cfg = self.Config(**config_options)
+        self.geonet_options = {k: v for k, v in (geonet_options or {}).items() if v is not None}
+
+        self.path = Path(path)
+        self.files: list[str] = []
+        self.counts = self._empty_counts()
+        if (self.path / "window.json").exists():
+            self._load()
+
+    def update(self, paths: Sequence[PathLike]) -> nx.DiGraph:
+        """Make the window span exactly the given files, ingesting only those new to it."""
+        files = list(dict.fromkeys(self._key(path) for path in paths))
+        entering = [file for file in files if file not in self.files]
+        leaving = [file for file in self.files if file not in files]
+        self.logger.log(
+            f"Updating window of {len(files)} files: {len(entering)} entering, {len(leaving)} leaving, "
+            f"{len(files) - len(entering)} kept"
+        )
+
+        # Files are read ahead while earlier ones are binned
+        geonet = GeoNet(logger=self.logger, **(self.geonet_options | {"res": self.cfg.res}))
+        tables = [self._ingest(geonet, file, data) for file, data in geonet.read_lpt_ahead(entering)]
+        geonet.log_dropped()
+        with self.logger.stage("window update", unit="edges") as stage:
+            subtracted = [self._read_table(file) for file in leaving]
+            for table in subtracted:
+                table[WEIGHT_ATTR] = -table[WEIGHT_ATTR]
+            self.counts = self._sum_counts([self.counts, *tables, *subtracted])
+            stage.items = len(self.counts)
+
+        self.files = files
+        self._save()
+        for file in leaving:
+            self._table_path(file).unlink(missing_ok=True)
+        return self.net()
+
+    def push(self, *paths: PathLike) -> nx.DiGraph:
+        """Add files to the end of the window, dropping the oldest files beyond the window size."""
+        files = [*self.files, *(self._key(path) for path in paths)]
+        if self.cfg.size is not None:
+            files = files[-self.cfg.size:]
+        return self.update(files)
+
+    def net(self) -> nx.DiGraph:
+        """Construct the network of the window."""
+        net = GeoNet.net_from_edge_counts(self.counts)
+        self.logger.log(f"{len(net.nodes)} nodes, {len(net.edges)} edges")
+        return net
+
+    def _ingest(self, geonet: GeoNet, file: str, data: pd.DataFrame) -> pd.DataFrame:
+        """Bin the positions of a file into edge counts and keep them as its table."""
+        with self.logger.stage("window ingest", unit="particles") as stage:
+            table = geonet.make_lpt_edge_counts(file, data)
+            stage.items = int(table[WEIGHT_ATTR].sum())
+        self._table_path(file).parent.mkdir(parents=True, exist_ok=True)
+        self._write_counts(self._table_path(file), table)
+        return table
+
+    def _read_table(self, file: str) -> pd.DataFrame:
+        return self._read_counts(self._table_path(file))
+
+    def _load(self) -> None:
+        """Load the window and its aggregate counts from the state directory."""
+        state = json.loads((self.path / "window.json").read_text())
+        if state["res"] != self.cfg.res:
+            raise ValueError(f"Window in '{self.path}' is at res {state["res"]}, not {self.cfg.res}.")
+        if state.get("geonet_options", {}) != json.loads(json.dumps(self._binning_options)):
+            raise ValueError(f"Window in '{self.path}' was binned with different options.")
+        if (self.path / "window.npz").exists():
+            with np.load(self.path / "window.npz") as data:
+                self.files = data["files"].tolist()
+            self.counts = self._read_counts(self.path / "window.npz")
+
+    def _save(self) -> None:
+        """
+        Save the window.
+
+        The files in the window and their aggregate counts are replaced together in one file, so an interrupted
+        update leaves the previous window intact.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        if not (self.path / "window.json").exists():
+            tmp_path = self.path / ".window.json.tmp"
+            tmp_path.write_text(json.dumps({"res": self.cfg.res, "geonet_options": self._binning_options}, indent=2))
+            os.replace(tmp_path, self.path / "window.json")
+        self._write_counts(self.path / "window.npz", self.counts, files=self.files)
+
+    @property
+    def _binning_options(self) -> dict:
+        """GeoNet options that change the binned counts, which must match those of the saved window."""
+        return dict((key, value) for key, value in self.geonet_options.items() if key != "prefetch")
+
+    def _table_path(self, file: str) -> Path:
+        return self.path / "tables" / f"{hashlib.sha1(file.encode()).hexdigest()}.npz"
+
+    @staticmethod
+    def _key(path: PathLike) -> str:
+        return str(Path(path).resolve())
+
+    @staticmethod
+    def _empty_counts() -> pd.DataFrame:
+        return pd.DataFrame({
+            "src": np.empty(0, dtype=np.int64),
+            "tgt": np.empty(0, dtype=np.int64),
+            WEIGHT_ATTR: np.empty(0, dtype=np.int64),
+        })
+
+    @staticmethod
+    def _sum_counts(counts: Sequence[pd.DataFrame]) -> pd.DataFrame:
+        """Sum edge counts, keeping edges in order of first occurrence and dropping those summing to zero."""
+        summed = pd.concat(counts, ignore_index=True).groupby(["src", "tgt"], sort=False)[WEIGHT_ATTR].sum()
+        return summed[summed > 0].reset_index()
+
+    @staticmethod
+    def _read_counts(path: Path) -> pd.DataFrame:
+        with np.load(path) as data:
+            return pd.DataFrame({"src": data["src"], "tgt": data["tgt"], WEIGHT_ATTR: data["weight"]})
+
+    @staticmethod
+    def _write_counts(path: Path, counts: pd.DataFrame, **arrays) -> None:
+        """Write edge counts, with any further arrays, atomically."""
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                src=counts["src"].to_numpy(dtype=np.int64),
+                tgt=counts["tgt"].to_numpy(dtype=np.int64),
+                weight=counts[WEIGHT_ATTR].to_numpy(dtype=np.int64),
+                **{key: np.asarray(value, dtype=str) for key, value in arrays.items()},
+            )
+        os.replace(tmp_path, path)
@@ -1,32 +1,142 @@
+import csv
+import resource
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from os import PathLike
-from typing import Iterable, Sequence
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Sequence
 
-import numpy as np
 from tqdm.auto import tqdm
 from loguru import logger
 
+from netclop.profiler import get_profiler, section
+
 fmt = "<c>{time:YYYY-MM-DD HH:mm:ss.SSS}</c> | "\
       "<level>{level: <8}</level> | "\
       "<level>{message}</level>"
 
+# Stages may finish on background output threads
+_metrics_lock = threading.Lock()
+
+# Progress bars only make sense on a terminal; batch jobs get periodic progress lines instead
+_interactive = sys.stderr.isatty()
+
 logger.remove()
 logger.add(
     lambda msg: tqdm.write(msg, end=""),
-    colorize=True,
+    colorize=sys.stdout.isatty(),
     level="INFO",
     format=fmt,
 )
 
 
+@dataclass
+class StageMetrics:
+    """
+    Resource usage of a pipeline stage.
+
+    CPU time is that of the whole process, including background threads such as output rendering, and peak RSS is
+    the process's peak so far, not that of the stage alone.
+    """
+    stage: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    process_peak_rss_mb: float = 0.0
+    items: int = 0
+    unit: str = ""
+    failed: bool = False
+
+    @property
+    def throughput(self) -> float:
+        """Items processed per second of wall time."""
+        return self.items / self.wall_s if self.wall_s > 0 else 0.0
+
+
+class Progress:
+    """
+    Progress of a loop reported as periodic structured lines, in place of a progress bar in non-interactive runs.
+
+    Mirrors the parts of the tqdm interface used by Logger. A line of key=value fields is logged at most once per
+    interval, so tracking an iteration costs a counter increment and a clock read.
+    """
+    def __init__(
+        self,
+        iterable: Optional[Iterable] = None,
+        total: Optional[int] = None,
+        desc: Optional[str] = None,
+        unit: str = "it",
+        interval: float = 30.0,
+        **kwargs,
+    ):
+        self.iterable = iterable
+        if total is None and iterable is not None and hasattr(iterable, "__len__"):
+            total = len(iterable)
+        self.total = total
+        self.desc = desc or "progress"
+        self.unit = unit
+        self.interval = interval
+
+        self.n = 0
+        self.postfix = ""
+        self.start_t = self.last_t = time.monotonic()
+        self.num_lines = 0
+
+    def __iter__(self) -> Iterator:
+        for item in self.iterable:
+            yield item
+            self.update()
+        self.close()
+
+    def update(self, n: int = 1) -> None:
+        self.n += n
+        now = time.monotonic()
+        if now - self.last_t >= self.interval:
+            self.last_t = now
+            self._emit(now)
+
+    def set_postfix_str(self, s: str = "", refresh: bool = True) -> None:
+        self.postfix = s
+
+    def close(self) -> None:
+        # Loops shorter than the interval stay silent
+        if self.num_lines:
+            self._emit(time.monotonic())
+
+    def _emit(self, now: float) -> None:
+        elapsed = now - self.start_t
+        fields = {
+            "desc": f"'{self.desc}'",
+            "n": self.n if self.total is None else f"{self.n}/{self.total}",
+            "rate": f"{self.n / elapsed if elapsed > 0 else 0:.2f}{self.unit}/s",
+            "elapsed": f"{elapsed:.0f}s",
+        }
+        if self.postfix:
+            fields["info"] = f"'{self.postfix}'"
+        logger.info("progress " + " ".join(f"{key}={value}" for key, value in fields.items()))
+        self.num_lines += 1
+
+
 class Logger:
     """Class for algorithm logging."""
     ascii = " =#"
     color = "WHITE"
+    info_interval = 0.1  # Minimum seconds between progress bar information updates
+    progress_interval = 30.0  # Seconds between progress lines in non-interactive runs
 
     def __init__(self, path: PathLike = None, silent: bool = False):
+        self.metrics_path = None
         if path is not None:
             logger.add(path, colorize=False, format=fmt)
+            path = Path(path)
+            self.metrics_path = path.with_name(path.stem + "_metrics.csv")
+            if (profiler := get_profiler()) is not None:
+                profiler.set_path(path)
         self.silent = silent
+        self.metrics: list[StageMetrics] = []
 
     def log(self, msg: str, level="INFO", **kwargs) -> None:
         """Log info."""
@@ -35,43 +145,110 @@ class Logger:
                 case "INFO": logger.opt(ansi=True).info(msg, **kwargs)
                 case "DEBUG": logger.debug(msg, **kwargs)
 
-    def pbar(self, iterable: Iterable, length: bool = True, **kwargs) -> tqdm | Iterable:
-        """Make a tqdm progress bar."""
+    def pbar(self, iterable: Iterable, length: bool = True, **kwargs) -> tqdm | Progress | Iterable:
+        """Make a tqdm progress bar, or periodic progress lines if not on a terminal."""
         if self.silent:
             return iterable
 
         if not length:
             iterable = iter(iterable)
 
+        if not _interactive:
+            return Progress(iterable, interval=self.progress_interval, **kwargs)
         return tqdm(iterable, ascii=self.ascii, colour=self.color, **kwargs)
 
+    @contextmanager
+    def stage(self, name: str, items: int = 0, unit: str = "") -> Iterator[StageMetrics]:
+        """
+        Time a pipeline stage.
+
+        Records wall time, CPU time of the process, peak RSS of the process so far at stage end, and throughput of
+        items, which may be set on the yielded metrics once known. Metrics are appended to a CSV next to the run log,
+        also when the stage fails, which is then flagged. When a profiler is active, the stage is profiled as its own
+        section.
+        """
+        metrics = StageMetrics(name, items=items, unit=unit)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+        try:
+            with section(name):
+                yield metrics
+        except BaseException:
+            metrics.failed = True
+            raise
+        finally:
+            metrics.wall_s = time.perf_counter() - wall_start
+            metrics.cpu_s = time.process_time() - cpu_start
+            metrics.process_peak_rss_mb = self.peak_rss_mb()
+            with _metrics_lock:
+                self.metrics.append(metrics)
+                self._write_metrics(metrics)
+
+            self.log(
+                f"{name}{" (failed)" if metrics.failed else ""}: {metrics.wall_s:.2f}s wall, "
+                f"{metrics.cpu_s:.2f}s process cpu, {metrics.process_peak_rss_mb:.0f}MB process peak RSS"
+                + (f", {metrics.throughput:.1f} {unit}/s" if metrics.items else ""),
+                level="DEBUG",
+            )
+
+    def _write_metrics(self, metrics: StageMetrics) -> None:
+        """Append stage metrics to the metrics file."""
+        if self.metrics_path is None:
+            return
+
+        row = asdict(metrics) | {"throughput": metrics.throughput}
+        is_new = not self.metrics_path.exists()
+        with open(self.metrics_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(row))
+            if is_new:
+                writer.writeheader()
+            writer.writerow(row)
+
+    @staticmethod
+    def peak_rss_mb() -> float:
+        """Peak resident set size of the process in MB."""
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss / 2 ** (20 if sys.platform == "darwin" else 10)
+
     # Manual progress bar
-    def pbar_info(self, pbar: tqdm | Iterable, info: str) -> None:
-        """Update information in progress bar."""
-        if isinstance(pbar, tqdm):
-            pbar.set_postfix_str(info)
+    def pbar_info(self, pbar: tqdm | Progress | Iterable, info: str | Callable[[], str], force: bool = False) -> None:
+        """
+        Update information in progress bar.
+
+        Updates are dropped if within info_interval of the last unless forced, and info may be given as a function
+        so it is only formatted when shown. The bar shows the information on its next refresh.
+        """
+        if not isinstance(pbar, tqdm | Progress):
+            return
+
+        now = time.monotonic()
+        if not force and now - getattr(pbar, "_info_t", -self.info_interval) < self.info_interval:
+            return
+        pbar._info_t = now
+        pbar.set_postfix_str(info() if callable(info) else info, refresh=False)
 
     def make_pbar(self, **kwargs):
-        """Make a tqdm progress bar for manual usage."""
-        if not self.silent:
-            return tqdm(ascii=self.ascii, colour=self.color, **kwargs)
-        else:
+        """Make a tqdm progress bar, or periodic progress lines if not on a terminal, for manual usage."""
+        if self.silent:
             return None
+        if not _interactive:
+            return Progress(interval=self.progress_interval, **kwargs)
+        return tqdm(ascii=self.ascii, colour=self.color, **kwargs)
 
-    def update_pbar(self, pbar: tqdm, inc: int = 1, **kwargs):
+    def update_pbar(self, pbar: tqdm | Progress, inc: int = 1, **kwargs):
         """Update manual instance of progress bar."""
-        if isinstance(pbar, tqdm):
+        if isinstance(pbar, tqdm | Progress):
             pbar.update(inc)
 
-    def close_pbar(self, pbar: tqdm | Iterable):
+    def close_pbar(self, pbar: tqdm | Progress | Iterable):
         """Close manual instance of progress bar."""
-        if isinstance(pbar, tqdm):
+        if isinstance(pbar, tqdm | Progress):
             pbar.close()
 
     # Miscellaneous reporting utilities
     @staticmethod
     def stat(nums: Sequence) -> str:
         if len(nums) > 1:
-            return f"{np.mean(nums):.1f}±{np.std(nums):.1f}"
+            return f"{statistics.fmean(nums):.1f}±{statistics.pstdev(nums):.1f}"
         else:
             return nums[0]
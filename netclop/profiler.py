@@ -0,0 +1,173 @@
+"""Profiling of CLI commands with per-stage sections."""
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from os import PathLike
+from pathlib import Path
+from typing import Iterator, Optional
+
+MAIN_SECTION = "main"
+
+
+class Profiler:
+    """
+    Profiles a command, attributing time to the stage sections it passes through.
+
+    In cprofile mode, each section is recorded by its own deterministic profiler and written as a .prof file. In
+    sampling mode, a background thread samples the main thread's stack at a fixed interval and writes collapsed
+    stacks, which is cheaper on hot Python loops.
+    """
+    modes = ("cprofile", "sampling")
+
+    def __init__(self, mode: str = "cprofile", top: int = 25, interval: float = 0.005):
+        if mode not in self.modes:
+            raise ValueError(f"Profiling mode '{mode}' is not one of {self.modes}.")
+        self.mode = mode
+        self.top = top
+        self.interval = interval
+
+        self.prefix: Optional[Path] = None
+        self.sections: list[str] = [MAIN_SECTION]
+
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._samples: Counter[tuple[str, ...]] = Counter()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+        self._main_thread_id = threading.main_thread().ident
+
+    def set_path(self, path: PathLike) -> None:
+        """Set the output path prefix, to which section names and extensions are appended."""
+        path = Path(path)
+        self.prefix = path.with_name(path.stem)
+
+    def start(self) -> None:
+        """Start profiling the main section."""
+        match self.mode:
+            case "cprofile":
+                self._enable(MAIN_SECTION)
+            case "sampling":
+                self._sampler = threading.Thread(target=self._sample, daemon=True)
+                self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop profiling and write results."""
+        match self.mode:
+            case "cprofile":
+                self._disable(self.sections[-1])
+            case "sampling":
+                self._stop_sampling.set()
+                self._sampler.join()
+        self.write()
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        """Attribute profiling within the context to a named section."""
+        if self.mode == "cprofile":
+            self._disable(self.sections[-1])
+            self.sections.append(name)
+            self._enable(name)
+            try:
+                yield
+            finally:
+                self._disable(name)
+                self.sections.pop()
+                self._enable(self.sections[-1])
+        else:
+            self.sections.append(name)
+            try:
+                yield
+            finally:
+                self.sections.pop()
+
+    def write(self) -> None:
+        """Write profiles and a hotspot summary."""
+        prefix = self.prefix if self.prefix is not None else Path.cwd() / "netclop"
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+
+        summary = io.StringIO()
+        match self.mode:
+            case "cprofile":
+                for name, profile in self._profiles.items():
+                    path = prefix.with_name(f"{prefix.name}_profile_{self._slug(name)}.prof")
+                    profile.dump_stats(path)
+
+                    summary.write(f"=== {name} ({path.name}) ===\n")
+                    stats = pstats.Stats(profile, stream=summary)
+                    stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+            case "sampling":
+                folded = prefix.with_name(f"{prefix.name}_profile.folded")
+                folded.write_text(
+                    "".join(f"{';'.join(stack)} {count}\n" for stack, count in self._samples.most_common())
+                )
+                self._write_sample_summary(summary)
+
+        prefix.with_name(f"{prefix.name}_profile.txt").write_text(summary.getvalue())
+
+    def _enable(self, name: str) -> None:
+        """Enable the profiler of a section."""
+        self._profiles.setdefault(name, cProfile.Profile()).enable()
+
+    def _disable(self, name: str) -> None:
+        """Disable the profiler of a section."""
+        self._profiles[name].disable()
+
+    def _sample(self) -> None:
+        """Sample the main thread's stack until stopped."""
+        while not self._stop_sampling.wait(self.interval):
+            frame = sys._current_frames().get(self._main_thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_qualname}")
+                frame = frame.f_back
+            self._samples[tuple([self.sections[-1]] + stack[::-1])] += 1
+
+    def _write_sample_summary(self, summary: io.StringIO) -> None:
+        """Summarize sampled time per section and its top self-time functions."""
+        total = sum(self._samples.values())
+        by_section: dict[str, Counter[str]] = {}
+        for (section, *stack), count in self._samples.items():
+            by_section.setdefault(section, Counter())[stack[-1] if stack else "<idle>"] += count
+
+        for section, leaves in by_section.items():
+            section_total = sum(leaves.values())
+            summary.write(
+                f"=== {section}: {section_total} samples, ~{section_total * self.interval:.2f}s, "
+                f"{100 * section_total / total:.1f}% ===\n"
+            )
+            for func, count in leaves.most_common(self.top):
+                summary.write(f"{count:>10} {100 * count / section_total:>6.1f}%  {func}\n")
+            summary.write("\n")
+
+    @staticmethod
+    def _slug(name: str) -> str:
+        """Make a section name safe for file names."""
+        return "".join(c if c.isalnum() else "-" for c in name)
+
+
+_active: Optional[Profiler] = None
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Get the active profiler, if any."""
+    return _active
+
+
+def set_profiler(profiler: Optional[Profiler]) -> None:
+    """Set the active profiler."""
+    global _active
+    _active = profiler
+
+
+@contextmanager
+def section(name: str) -> Iterator[None]:
+    """Attribute profiling to a named section if a profiler is active, from the main thread only."""
+    if _active is None or threading.current_thread() is not threading.main_thread():
+        yield
+    else:
+        with _active.section(name):
+            yield
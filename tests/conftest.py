@@ -0,0 +1,61 @@
+"""Shared fixtures for tests."""
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from netclop.constants import WEIGHT_ATTR
+from netclop.typing import Partition
+
+
+def random_partitions(
+    rng: np.random.Generator,
+    num_partitions: int = 12,
+    num_nodes: int = 40,
+    num_modules: int = 5,
+    absent: float = 0.1,
+) -> list[Partition]:
+    """Random partitions of decimal-named nodes, each leaving out a fraction of nodes."""
+    nodes = [str(node) for node in rng.choice(10 ** 6, size=num_nodes, replace=False)]
+    partitions = []
+    for _ in range(num_partitions):
+        labels = rng.integers(0, num_modules, size=num_nodes)
+        present = rng.uniform(size=num_nodes) >= absent
+        modules = [set() for _ in range(num_modules)]
+        for node, label, is_present in zip(nodes, labels, present):
+            if is_present:
+                modules[label].add(node)
+        partitions.append([module for module in modules if module])
+    return partitions
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+
+def write_lpt(path: Path, lngs: np.ndarray, lats: np.ndarray, final_lngs: np.ndarray, final_lats: np.ndarray) -> Path:
+    """Write LPT positions as read by GeoNet.read_lpt."""
+    pd.DataFrame({"initial_lng": lngs, "initial_lat": lats, "final_lng": final_lngs, "final_lat": final_lats}).to_csv(
+        path, header=False, index=False,
+    )
+    return path
+
+
+def net_edges(net: nx.DiGraph) -> list[tuple]:
+    """Weighted edges of a network in a comparable order."""
+    return sorted(net.edges(data=WEIGHT_ATTR))
+
+
+@pytest.fixture
+def lpt_paths(tmp_path) -> list[Path]:
+    """LPT files of particles released over a few degrees and drifting about half a degree."""
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(5):
+        lngs, lats = rng.uniform(0, 5, size=(2, 2000))
+        final_lngs, final_lats = rng.normal([lngs, lats], 0.5)
+        paths.append(write_lpt(tmp_path / f"lpt{i}.csv", lngs, lats, final_lngs, final_lats))
+    return paths
@@ -0,0 +1,38 @@
+"""Blocked bootstrap weight draws."""
+import networkx as nx
+import numpy as np
+import pytest
+
+from netclop.ensemble.bootstrap import Bootstrap, draw_poisson
+
+
+@pytest.fixture
+def net() -> nx.DiGraph:
+    rng = np.random.default_rng(0)
+    net = nx.relabel_nodes(nx.gnm_random_graph(50, 300, seed=0, directed=True), str)
+    for u, v in net.edges:
+        net[u][v]["weight"] = int(rng.integers(1, 500))
+    return net
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64])
+@pytest.mark.parametrize("spill", [False, True])
+def test_draws_independent_of_blocks(net, tmp_path, block_size, spill):
+    edges, weights = Bootstrap.edge_weights(net)
+    expected = np.random.default_rng(1).poisson(lam=weights.reshape(1, -1), size=(20, len(edges)))
+
+    with Bootstrap(net, np.random.default_rng(1), block_size, tmp_path if spill else None) as bootstrap:
+        bootstrap.draw(8)
+        bootstrap.draw(12)
+        assert len(bootstrap) == 20
+        np.testing.assert_array_equal(np.stack([bootstrap.weights(i) for i in range(20)]), expected)
+
+        replicate = bootstrap[-1]
+        assert [replicate[u][v]["weight"] for u, v in edges] == expected[-1].tolist()
+    assert not list(tmp_path.iterdir())
+
+
+def test_draw_poisson_upcasts():
+    counts = draw_poisson(np.random.default_rng(0), np.array([1.0, 1000.0]), 3)
+    assert counts.dtype == np.uint16
+    assert counts[:, 1].min() > 255
@@ -0,0 +1,19 @@
+"""Validation of command line options."""
+import pytest
+from click.testing import CliRunner
+
+from netclop.cli.__main__ import netclop
+
+
+@pytest.mark.parametrize(("args", "message"), [
+    (["--queue-dir", "queue"], "--queue-dir requires a single LPT path or --window-dir"),
+    (
+        ["--queue-dir", "queue", "--window-dir", "window", "--adaptive"],
+        "--queue-dir cannot be combined with --adaptive",
+    ),
+])
+def test_rsc_rejects_queue_combinations(lpt_paths, tmp_path, args, message):
+    result = CliRunner().invoke(netclop, ["rsc", *map(str, lpt_paths[:2]), "--output-dir", str(tmp_path), *args])
+    assert result.exit_code == 2
+    assert message in result.output
+    assert not list(tmp_path.glob("*.log"))
@@ -0,0 +1,60 @@
+"""Sparse co-assignment counts against brute-force pair counting, and their round trip."""
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from netclop.ensemble.coassignment import CoAssignment
+from netclop.ensemble.netutils import sort_nodes
+
+from tests.conftest import random_partitions
+
+
+def brute_force_counts(partitions) -> Counter:
+    counts = Counter()
+    for partition in partitions:
+        for module in partition:
+            counts.update(combinations(sort_nodes(module), 2))
+    return counts
+
+
+@pytest.mark.parametrize("max_buffer_pairs", [1, 50, 2 ** 24])
+def test_counts_match_brute_force(rng, max_buffer_pairs):
+    partitions = random_partitions(rng)
+    coassignment = CoAssignment.from_partitions(partitions, chunk_size=5, max_buffer_pairs=max_buffer_pairs)
+
+    expected = brute_force_counts(partitions)
+    df = coassignment.to_frame()
+    assert dict(zip(zip(df["node_a"], df["node_b"]), df["count"])) == expected
+    assert coassignment.num_partitions == len(partitions)
+
+
+def test_count(rng):
+    partitions = random_partitions(rng)
+    coassignment = CoAssignment.from_partitions(partitions)
+    expected = brute_force_counts(partitions)
+
+    for a, b in combinations(coassignment.nodes, 2):
+        assert coassignment.count(a, b) == coassignment.count(b, a) == expected[(a, b)]
+
+
+def test_min_count(rng):
+    partitions = random_partitions(rng)
+    coassignment = CoAssignment.from_partitions(partitions)
+    rows, cols, counts = coassignment.pairs(min_count=4)
+
+    nodes = coassignment.nodes
+    expected = dict((pair, count) for pair, count in brute_force_counts(partitions).items() if count >= 4)
+    assert dict(((nodes[i], nodes[j]), count) for i, j, count in zip(rows, cols, counts)) == expected
+
+
+def test_save_load_coassignment(rng, tmp_path):
+    coassignment = CoAssignment.from_partitions(random_partitions(rng))
+    coassignment.save(tmp_path / "coassignment")
+
+    restored = CoAssignment.load(tmp_path / "coassignment")
+    assert restored.nodes == coassignment.nodes
+    assert restored.num_partitions == coassignment.num_partitions
+    np.testing.assert_array_equal(restored.keys, coassignment.keys)
+    np.testing.assert_array_equal(restored.counts, coassignment.counts)
@@ -0,0 +1,119 @@
+"""Partitioning and updating network ensembles."""
+import networkx as nx
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import Scale, check_cores, make_partitions
+from netclop.ensemble.coassignment import CoAssignment
+from netclop.ensemble.ensemble import NetworkEnsemble
+from netclop.ensemble.netutils import flatten_partition
+
+SCALE = Scale(nodes=60, cores=3, replicates=30)
+
+
+@pytest.fixture
+def net() -> nx.DiGraph:
+    """Two dense clusters of ten nodes joined by weak edges."""
+    rng = np.random.default_rng(0)
+    net = nx.DiGraph()
+    for u in range(20):
+        for v in range(20):
+            if u != v:
+                weight = 50 if u // 10 == v // 10 else 1
+                net.add_edge(str(u), str(v), weight=int(rng.poisson(weight)) + 1)
+    return net
+
+
+def random_partition(net: nx.DiGraph, rng: np.random.Generator) -> list[set]:
+    labels = rng.integers(0, 4, size=len(net))
+    return [set(np.asarray(list(net.nodes), dtype=object)[labels == label]) for label in np.unique(labels)]
+
+
+def test_adaptive_converges(net):
+    ne = NetworkEnsemble(net, silent=True, adaptive=True, adaptive_batch_size=5, num_bootstraps=100)
+    ne.partition()
+
+    # Infomap splits the clusters in every replicate, so co-assignment is unchanged by the second batch
+    assert len(ne.partitions) == 10
+    assert all(partition == ne.partitions[0] for partition in ne.partitions)
+
+    fixed = NetworkEnsemble(net, silent=True, num_bootstraps=10)
+    fixed.bootstrap(net)
+    for i in range(10):
+        np.testing.assert_array_equal(ne.bootstraps.weights(i), fixed.bootstraps.weights(i))
+
+
+def test_adaptive_stops_at_num_bootstraps(net, monkeypatch):
+    rng = np.random.default_rng(0)
+    monkeypatch.setattr(NetworkEnsemble, "im_partition", lambda self, replicate: random_partition(replicate, rng))
+    ne = NetworkEnsemble(net, silent=True, adaptive=True, adaptive_batch_size=10, adaptive_tol=1e-6, num_bootstraps=25)
+    ne.partition()
+
+    assert len(ne.partitions) == len(ne.bootstraps) == 25
+    expected = CoAssignment.from_partitions(ne.partitions, ne.coassignment.nodes)
+    np.testing.assert_array_equal(ne.coassignment.keys, expected.keys)
+    np.testing.assert_array_equal(ne.coassignment.counts, expected.counts)
+
+
+def test_compare_cores():
+    prev_cores = [{"1", "2", "3", "4"}, {"5", "6"}]
+    cores = [{"1", "2", "3", "7"}, {"8", "9"}, {"6"}]
+    changes = NetworkEnsemble.compare_cores(prev_cores, cores)
+
+    assert changes["prev_core"].tolist() == [1, 0, 2]
+    assert changes["jaccard"].tolist() == pytest.approx([3 / 5, 0, 1 / 2])
+    assert changes["gained"].tolist() == [1, 2, 0]
+    assert changes["lost"].tolist() == [1, 0, 1]
+
+
+@pytest.fixture
+def member_nets() -> list[nx.DiGraph]:
+    """Member networks partitioned into a synthetic ensemble with planted cores, one partition each."""
+    nets = []
+    for partition in make_partitions(SCALE):
+        net = nx.DiGraph(partition=partition)
+        net.add_nodes_from(flatten_partition(partition))
+        nets.append(net)
+    return nets
+
+
+@pytest.fixture
+def preset_partitions(monkeypatch):
+    monkeypatch.setattr(NetworkEnsemble, "im_partition", lambda self, net: net.graph["partition"])
+
+
+def test_extend_updates_results(member_nets, preset_partitions):
+    ne = NetworkEnsemble(member_nets[:20], silent=True)
+    ne.partition()
+    coassignment = ne.coassign()
+    ne.sigclu(cooling_rate=0.9)
+    changes = ne.extend(member_nets[20:], cooling_rate=0.9)
+
+    partitions = [net.graph["partition"] for net in member_nets]
+    assert ne.partitions == partitions
+    check_cores(ne.cores, SCALE)
+    assert len(changes) == len(ne.cores)
+
+    # Cached counts are updated with the new partitions only
+    assert ne.coassignment is coassignment
+    expected = CoAssignment.from_partitions(partitions, coassignment.nodes)
+    np.testing.assert_array_equal(coassignment.keys, expected.keys)
+    np.testing.assert_array_equal(coassignment.counts, expected.counts)
+
+
+def test_extend_restored_partitions(member_nets, preset_partitions, tmp_path):
+    ne = NetworkEnsemble(member_nets[:20], silent=True)
+    ne.partition()
+    ne.coassign()
+    ne.save_partitions(tmp_path / "partitions")
+
+    restored = NetworkEnsemble([], silent=True)
+    restored.load_partitions(tmp_path / "partitions")
+    restored.coassign()
+    new_net = member_nets[20].copy()
+    new_net.graph["partition"] = [*new_net.graph["partition"], {"1"}]
+    restored.extend([new_net])
+
+    assert restored.nodes == ne.nodes | {"1"}
+    # A new node changes the node index, so co-assignment counts are dropped
+    assert restored.coassignment is None
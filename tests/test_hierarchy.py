@@ -0,0 +1,70 @@
+"""Coarse-to-fine significance clustering."""
+import pytest
+from h3.api import numpy_int as h3
+
+from netclop.geo import hierarchy
+from netclop.geo.hierarchy import HierarchicalSigClu
+
+COARSE_RES = 3
+
+
+def cell_names(cells) -> set[str]:
+    return {str(cell) for cell in cells}
+
+
+@pytest.fixture
+def coarse_cells() -> list[int]:
+    return [int(cell) for cell in h3.grid_disk(h3.latlng_to_cell(2, 2, COARSE_RES), 2)]
+
+
+@pytest.fixture
+def fine_nodes(coarse_cells) -> set[str]:
+    return set.union(*(cell_names(h3.cell_to_children(cell, COARSE_RES + 1)) for cell in coarse_cells))
+
+
+def test_refine_to_children(coarse_cells, fine_nodes):
+    cores = [cell_names(coarse_cells[:1]), cell_names(coarse_cells[1:3])]
+    regions = HierarchicalSigClu({}, silent=True, boundary_band=0).refine(cores, COARSE_RES, fine_nodes)
+
+    assert regions == [
+        cell_names(h3.cell_to_children(coarse_cells[0], COARSE_RES + 1)),
+        cell_names(h3.cell_to_children(coarse_cells[1], COARSE_RES + 1))
+        | cell_names(h3.cell_to_children(coarse_cells[2], COARSE_RES + 1)),
+    ]
+
+
+def test_refine_with_boundary_band(coarse_cells, fine_nodes):
+    cores = [cell_names(coarse_cells[:1])]
+    children = HierarchicalSigClu({}, silent=True, boundary_band=0).refine(cores, COARSE_RES, fine_nodes)[0]
+    region = HierarchicalSigClu({}, silent=True, boundary_band=1).refine(cores, COARSE_RES, fine_nodes)[0]
+
+    band = set.union(*(cell_names(h3.grid_disk(int(node), 1)) for node in children))
+    assert region == (children | band) & fine_nodes
+    assert children < region <= fine_nodes
+
+
+class FakeEnsemble:
+    """Stand-in for NetworkEnsemble that finds preset cores and records the regions searched."""
+    cores_by_res = {}
+    regions_by_res = {}
+
+    def __init__(self, net, **kwargs):
+        self.res = net
+        self.nodes = {"node"}
+
+    def sigclu(self, regions=None, **kwargs):
+        self.regions_by_res[self.res] = regions
+        self.cores = self.cores_by_res[self.res]
+
+
+def test_no_coarse_cores_searches_unrestricted(monkeypatch):
+    monkeypatch.setattr(hierarchy, "NetworkEnsemble", FakeEnsemble)
+    monkeypatch.setattr(FakeEnsemble, "cores_by_res", {3: [], 4: [{"node"}], 5: []})
+    monkeypatch.setattr(FakeEnsemble, "regions_by_res", {})
+    monkeypatch.setattr(HierarchicalSigClu, "refine", lambda self, cores, coarse_res, nodes: [{"node"}])
+
+    hsc = HierarchicalSigClu({res: res for res in (3, 4, 5)}, silent=True)
+    hsc.run()
+
+    assert FakeEnsemble.regions_by_res == {3: None, 4: None, 5: [{"node"}]}
+    assert hsc.cores == []
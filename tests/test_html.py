@@ -0,0 +1,46 @@
+"""TopoJSON encoding of cell polygons."""
+import numpy as np
+import pytest
+import shapely
+
+from netclop.geo.html import to_topojson
+
+
+def decode(topology: dict, geometry: dict) -> np.ndarray:
+    """Decode the ring of a polygon of a topology into coordinates."""
+    scale, translate = np.array(topology["transform"]["scale"]), np.array(topology["transform"]["translate"])
+    points = []
+    for ref in geometry["arcs"][0]:
+        arc = np.cumsum(topology["arcs"][ref if ref >= 0 else ~ref], axis=0)
+        points.extend((arc if ref >= 0 else arc[::-1])[:-1])
+    return np.array(points) * scale + translate
+
+
+def test_shared_arcs_round_trip():
+    polygons = [shapely.box(x, y, x + 1, y + 1) for x in range(3) for y in range(2)]
+    ids = [f"cell{i}" for i in range(len(polygons))]
+    topology = to_topojson(polygons, ids)
+
+    geometries = topology["objects"]["cells"]["geometries"]
+    assert [geometry["id"] for geometry in geometries] == ids
+    # A 3 x 2 grid has 17 unit edges, each stored once
+    assert len(topology["arcs"]) == 17
+    for polygon, geometry in zip(polygons, geometries):
+        assert shapely.hausdorff_distance(shapely.Polygon(decode(topology, geometry)), polygon) < 1e-4
+
+
+def test_collapsed_polygons_keep_id_alignment():
+    polygons = [
+        shapely.box(0, 0, 10, 10),
+        shapely.box(5, 5, 5.000001, 5.000001),
+        shapely.box(10, 0, 20, 10),
+        shapely.box(0, 10, 10, 20),
+    ]
+    with pytest.warns(UserWarning, match="1 polygons collapsed"):
+        topology = to_topojson(polygons, ["a", "b", "c", "d"], quantization=1000)
+
+    geometries = topology["objects"]["cells"]["geometries"]
+    assert [geometry["id"] for geometry in geometries] == ["a", "b", "c", "d"]
+    assert geometries[1]["type"] is None
+    for index in (0, 2, 3):
+        assert shapely.hausdorff_distance(shapely.Polygon(decode(topology, geometries[index])), polygons[index]) < 0.1
@@ -0,0 +1,56 @@
+"""Work queue leases and their release."""
+import os
+import time
+
+from netclop.ensemble.lease import Lease
+
+
+def expire(path, age: float = 100) -> None:
+    os.utime(path, (time.time() - age, time.time() - age))
+
+
+def test_acquire_is_exclusive(tmp_path):
+    lease = Lease(tmp_path / "unit.lock", "a")
+    assert lease.acquire()
+    assert not Lease(tmp_path / "unit.lock", "b").acquire()
+    assert lease.is_held()
+
+
+def test_release_if_expired(tmp_path):
+    lease = Lease(tmp_path / "unit.lock", "a")
+    lease.acquire()
+    assert not Lease.release_if_expired(lease.path, timeout=10)
+
+    expire(lease.path)
+    assert Lease.release_if_expired(lease.path, timeout=10)
+    assert not lease.path.exists()
+    assert not lease.refresh()
+
+
+def test_release_keeps_claim_refreshed_meanwhile(tmp_path, monkeypatch):
+    lease = Lease(tmp_path / "unit.lock", "a")
+    lease.acquire()
+    expire(lease.path)
+
+    rename = os.rename
+
+    def refresh_then_rename(src, dst):
+        # The holder refreshes between the expiry check and the rename
+        lease.refresh()
+        rename(src, dst)
+
+    monkeypatch.setattr(os, "rename", refresh_then_rename)
+    assert not Lease.release_if_expired(lease.path, timeout=10)
+    assert lease.is_held()
+    assert not list(tmp_path.glob("*.stale"))
+
+
+def test_keep_alive_refreshes_while_busy(tmp_path):
+    lease = Lease(tmp_path / "unit.lock", "a")
+    lease.acquire()
+    expire(lease.path)
+    with lease.keep_alive(0.1):
+        start = time.time()
+        while time.time() - start < 1:
+            sum(range(1000))  # Holds the interpreter lock, like a partitioning run
+        assert time.time() - lease.path.stat().st_mtime < 1
@@ -0,0 +1,130 @@
+"""Network construction from LPT positions."""
+import time
+import weakref
+from collections import Counter
+
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+from h3.api import numpy_int as h3
+
+from netclop.geo.net import GeoNet
+
+from tests.conftest import net_edges, write_lpt
+
+
+@pytest.fixture
+def centered_path(tmp_path):
+    """Particles moving between centres of res 3 cells, which are centres of their descendants too."""
+    rng = np.random.default_rng(0)
+    cells = h3.grid_disk(h3.latlng_to_cell(2, 2, 3), 3)
+    lats, lngs = np.array([h3.cell_to_latlng(int(cell)) for cell in cells]).T
+    src, tgt = rng.integers(0, len(cells), size=(2, 1000))
+    return write_lpt(tmp_path / "centered.csv", lngs[src], lats[src], lngs[tgt], lats[tgt])
+
+
+def test_multires_matches_direct_build(centered_path):
+    nets = GeoNet(silent=True).from_lpt_multires([centered_path], [3, 4, 5])
+    assert list(nets) == [5, 4, 3]
+    for res, net in nets.items():
+        assert net_edges(net) == net_edges(GeoNet(silent=True, res=res).from_lpt([centered_path]))
+
+
+def test_multires_coarsens_fine_cells(lpt_paths):
+    nets = GeoNet(silent=True).from_lpt_multires(lpt_paths[:2], [3, 5])
+    fine_nets = GeoNet(silent=True, res=5).from_lpt(lpt_paths[:2])
+    for fine_net, net in zip(fine_nets, nets[5]):
+        assert net_edges(net) == net_edges(fine_net)
+
+    for fine_net, net in zip(fine_nets, nets[3]):
+        expected = Counter()
+        for src, tgt, weight in fine_net.edges(data="weight"):
+            expected[(str(h3.cell_to_parent(int(src), 3)), str(h3.cell_to_parent(int(tgt), 3)))] += weight
+        assert net_edges(net) == sorted((src, tgt, weight) for (src, tgt), weight in expected.items())
+        assert net.size(weight="weight") == fine_net.size(weight="weight")
+
+
+def test_coarsen_at_own_resolution(lpt_paths):
+    counts = GeoNet(silent=True, res=4).make_lpt_edge_counts(lpt_paths[0])
+    assert GeoNet.coarsen_edge_counts(counts, 4) is counts
+
+
+@pytest.fixture
+def allowlist(tmp_path):
+    """Allowlist of a res 3 cell, a res 5 cell as a hex string, and a res 6 cell finer than the network."""
+    cells = [
+        h3.latlng_to_cell(1, 1, 3),
+        h3.latlng_to_cell(4, 4, 5),
+        h3.latlng_to_cell(2.5, 4, 6),
+    ]
+    path = tmp_path / "cells.txt"
+    path.write_text(f"{cells[0]}\n{h3.int_to_str(cells[1])} {cells[2]}\n")
+    return path, cells
+
+
+def test_in_domain_bbox_and_mask(tmp_path):
+    gpd.GeoDataFrame(geometry=[shapely.box(0, 0, 2, 2)], crs=4326).to_file(tmp_path / "mask.geojson")
+    lngs, lats = [1, 3, 1, -1, 0.5], [1, 1, 3, 1, 1.5]
+
+    np.testing.assert_array_equal(GeoNet(silent=True, bbox=(0, 0, 4, 2)).in_domain(lngs, lats), [1, 1, 0, 0, 1])
+    mask = str(tmp_path / "mask.geojson")
+    np.testing.assert_array_equal(GeoNet(silent=True, mask=mask).in_domain(lngs, lats), [1, 0, 0, 0, 1])
+    np.testing.assert_array_equal(
+        GeoNet(silent=True, bbox=(0.8, 0, 4, 4), mask=mask).in_domain(lngs, lats),
+        [1, 0, 0, 0, 0],
+    )
+
+
+def test_is_allowed(allowlist):
+    path, (coarse, cell, fine) = allowlist
+    geonet = GeoNet(silent=True, res=5, cells=str(path))
+
+    allowed = [*h3.cell_to_children(coarse, 5), cell, h3.cell_to_parent(fine, 5)]
+    others = [*h3.grid_ring(cell, 1), h3.latlng_to_cell(10, 10, 5)]
+    np.testing.assert_array_equal(
+        geonet.is_allowed(np.array([*allowed, *others], dtype=np.int64)), [True] * len(allowed) + [False] * len(others),
+    )
+
+
+def test_allowlist_matches_filtering_after_binning(lpt_paths, allowlist):
+    path, _ = allowlist
+    geonet = GeoNet(silent=True, res=5, cells=str(path))
+    net = geonet.from_lpt(lpt_paths[:1])
+
+    unfiltered = GeoNet(silent=True, res=5).from_lpt(lpt_paths[:1])
+    allowed = dict(zip(unfiltered.nodes, geonet.is_allowed(np.array(list(unfiltered.nodes), dtype=np.int64))))
+    expected = [(src, tgt, weight) for src, tgt, weight in net_edges(unfiltered) if allowed[src] and allowed[tgt]]
+    assert expected and net_edges(net) == expected
+    assert geonet.num_dropped == geonet.num_particles - net.size(weight="weight")
+
+    # Positions far from every allowed cell are dropped before binning
+    assert not geonet.in_domain([20, -170], [20, 0]).any()
+
+
+class Parsed:
+    """Stand-in for parsed LPT positions whose lifetime can be tracked."""
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_read_ahead_order_and_memory(monkeypatch, prefetch):
+    alive = weakref.WeakSet()
+    peak = 0
+
+    def read_lpt(path):
+        nonlocal peak
+        time.sleep(0.002)
+        data = Parsed()
+        alive.add(data)
+        peak = max(peak, len(alive))
+        return data
+
+    monkeypatch.setattr(GeoNet, "read_lpt", staticmethod(read_lpt))
+    paths = [f"lpt{i}.csv" for i in range(12)]
+    read = []
+    for path, data in GeoNet(silent=True, prefetch=prefetch).read_lpt_ahead(paths):
+        time.sleep(0.01)  # Binning is slower than reading, so reads run ahead
+        read.append(path)
+
+    assert read == paths
+    assert peak <= prefetch + 2, peak
@@ -0,0 +1,59 @@
+"""Background rendering and writing of outputs."""
+import threading
+import time
+
+import pytest
+
+from netclop.cli.output import OutputExecutor
+from netclop.exceptions import OutputError
+from netclop.log import Logger
+
+
+@pytest.fixture
+def logger() -> Logger:
+    return Logger(silent=True)
+
+
+def fail(msg: str) -> None:
+    raise RuntimeError(msg)
+
+
+def test_outputs_run_in_order_in_background(logger):
+    done = []
+
+    def write(name: str) -> None:
+        time.sleep(0.01)
+        done.append((name, threading.current_thread().name.startswith("output")))
+
+    with OutputExecutor(logger) as outputs:
+        for name in "abc":
+            outputs.submit(name, write, name)
+    assert done == [("a", True), ("b", True), ("c", True)]
+
+
+def test_failures_raise_after_all_outputs(logger):
+    done = []
+    with pytest.raises(OutputError, match="a, c") as exc_info:
+        with OutputExecutor(logger) as outputs:
+            outputs.submit("a", fail, "first")
+            outputs.submit("b", done.append, "b")
+            outputs.submit("c", fail, "second")
+    assert done == ["b"]
+    assert str(exc_info.value.__cause__) == "first"
+
+
+def test_pipeline_error_takes_precedence(logger):
+    done = []
+    with pytest.raises(ValueError):
+        with OutputExecutor(logger) as outputs:
+            outputs.submit("a", fail, "output")
+            outputs.submit("b", done.append, "b")
+            raise ValueError("pipeline")
+    assert done == ["b"]
+
+
+def test_foreground_outputs_raise_on_submission(logger):
+    outputs = OutputExecutor(logger, background=False)
+    with pytest.raises(RuntimeError, match="now"):
+        outputs.submit("a", fail, "now")
+    outputs.wait()
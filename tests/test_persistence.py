@@ -0,0 +1,23 @@
+"""Round trips of saved partitions."""
+from netclop.ensemble.ensemble import NetworkEnsemble
+from netclop.ensemble.netutils import labels_to_partitions, partitions_to_labels
+
+from tests.conftest import random_partitions
+
+
+def test_labels_round_trip(rng):
+    partitions = random_partitions(rng)
+    labels, nodes = partitions_to_labels(partitions)
+    assert labels_to_partitions(labels, nodes) == partitions
+
+
+def test_save_load_partitions(rng, tmp_path):
+    partitions = random_partitions(rng)
+    ne = NetworkEnsemble([], silent=True)
+    ne.partitions = partitions
+    ne.save_partitions(tmp_path / "partitions")
+
+    restored = NetworkEnsemble([], silent=True)
+    restored.load_partitions(tmp_path / "partitions")
+    assert restored.partitions == partitions
+    assert restored.nodes == ne.nodes
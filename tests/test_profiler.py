@@ -0,0 +1,73 @@
+"""Per-section profiling."""
+import pstats
+import time
+
+import pytest
+
+from netclop import profiler as profiler_module
+from netclop.profiler import Profiler, section
+
+
+def busy_main() -> None:
+    sum(range(10_000))
+
+
+def busy_partition(seconds: float = 0) -> None:
+    start = time.perf_counter()
+    while True:
+        sum(range(1000))
+        if time.perf_counter() - start >= seconds:
+            return
+
+
+@pytest.fixture
+def active(monkeypatch):
+    def activate(profiler: Profiler) -> Profiler:
+        monkeypatch.setattr(profiler_module, "_active", profiler)
+        return profiler
+    return activate
+
+
+def functions(path) -> set[str]:
+    return {func for _, _, func in pstats.Stats(str(path)).stats}
+
+
+def test_cprofile_sections(tmp_path, active):
+    profiler = active(Profiler("cprofile"))
+    profiler.set_path(tmp_path / "run.log")
+    profiler.start()
+    busy_main()
+    with section("partition ensemble"):
+        busy_partition()
+    profiler.stop()
+
+    assert profiler.sections == ["main"]
+    assert "busy_main" in functions(tmp_path / "run_profile_main.prof")
+    assert "busy_main" not in functions(tmp_path / "run_profile_partition-ensemble.prof")
+    assert "busy_partition" in functions(tmp_path / "run_profile_partition-ensemble.prof")
+    assert "busy_partition" not in functions(tmp_path / "run_profile_main.prof")
+    assert "=== partition ensemble" in (tmp_path / "run_profile.txt").read_text()
+
+
+def test_sampling_sections(tmp_path, active):
+    profiler = active(Profiler("sampling", interval=0.001))
+    profiler.set_path(tmp_path / "run.log")
+    profiler.start()
+    with section("partition"):
+        busy_partition(0.3)
+    profiler.stop()
+
+    stacks = [line.rsplit(" ", 1)[0].split(";") for line in (tmp_path / "run_profile.folded").read_text().splitlines()]
+    assert any(stack[0] == "partition" and "test_profiler.py:busy_partition" in stack for stack in stacks)
+    assert not any(stack[0] != "partition" and "test_profiler.py:busy_partition" in stack for stack in stacks)
+    assert "=== partition:" in (tmp_path / "run_profile.txt").read_text()
+
+
+def test_section_without_profiler():
+    with section("partition"):
+        busy_main()
+
+
+def test_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        Profiler("pyinstrument")
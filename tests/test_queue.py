@@ -0,0 +1,73 @@
+"""Partitioning through the shared-filesystem work queue."""
+import os
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from netclop.ensemble.ensemble import NetworkEnsemble
+from netclop.ensemble.queue import WorkQueue
+
+NUM_BOOTSTRAPS = 7
+
+
+@pytest.fixture
+def net() -> nx.DiGraph:
+    rng = np.random.default_rng(0)
+    net = nx.relabel_nodes(nx.gnm_random_graph(30, 150, seed=0, directed=True), str)
+    for u, v in net.edges:
+        net[u][v]["weight"] = int(rng.integers(1, 100))
+    return net
+
+
+@pytest.fixture
+def local_partitions(net) -> list[set[frozenset]]:
+    ne = NetworkEnsemble(net, silent=True, num_bootstraps=NUM_BOOTSTRAPS)
+    ne.partition()
+    return as_sets(ne.partitions)
+
+
+def as_sets(partitions) -> list[set[frozenset]]:
+    return [set(map(frozenset, partition)) for partition in partitions]
+
+
+def test_worker_process_matches_local_run(net, local_partitions, tmp_path):
+    worker = subprocess.Popen([
+        sys.executable, "-c", "from netclop.cli.__main__ import netclop; netclop()",
+        "worker", str(tmp_path / "queue"), "--poll-interval", "0.05",
+    ])
+    try:
+        ne = NetworkEnsemble(net, silent=True, num_bootstraps=NUM_BOOTSTRAPS)
+        WorkQueue(tmp_path / "queue", silent=True, unit_size=3, poll_interval=0.05).partition(ne, work=False)
+        assert worker.wait(timeout=60) == 0
+    finally:
+        worker.kill()
+
+    assert as_sets(ne.partitions) == local_partitions
+    assert len(list((tmp_path / "queue" / "results").glob("*.npy"))) == 3
+
+
+def test_lost_claim_is_redone(net, local_partitions, tmp_path):
+    queue = WorkQueue(tmp_path / "queue", silent=True, unit_size=3, poll_interval=0.05, lease_timeout=5)
+    ne = NetworkEnsemble(net, silent=True, num_bootstraps=NUM_BOOTSTRAPS)
+    queue.submit(net, NUM_BOOTSTRAPS, asdict(ne.cfg))
+
+    # A worker claimed the first unit and was lost
+    lock_path = tmp_path / "queue" / "claims" / "000000.lock"
+    lock_path.write_text("lost-worker token\n")
+    os.utime(lock_path, (time.time() - 10, time.time() - 10))
+
+    queue.partition(ne)
+    assert as_sets(ne.partitions) == local_partitions
+
+
+def test_resubmitting_different_work(net, tmp_path):
+    queue = WorkQueue(tmp_path / "queue", silent=True)
+    ne = NetworkEnsemble(net, silent=True, num_bootstraps=NUM_BOOTSTRAPS)
+    queue.submit(net, NUM_BOOTSTRAPS, asdict(ne.cfg))
+    with pytest.raises(FileExistsError):
+        WorkQueue(tmp_path / "queue", silent=True).submit(net, NUM_BOOTSTRAPS + 1, asdict(ne.cfg))
@@ -0,0 +1,87 @@
+"""Significance clustering of partition ensembles with planted cores."""
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import Scale, check_cores, make_partitions, planted_cores
+from netclop.ensemble.sigclu import SigClu
+
+SCALE = Scale(nodes=60, cores=3, replicates=30)
+
+
+@pytest.fixture
+def partitions():
+    return make_partitions(SCALE)
+
+
+@pytest.fixture
+def cores():
+    return sorted(planted_cores(SCALE), key=len, reverse=True)
+
+
+def make_sigclu(partitions, **config_options) -> SigClu:
+    return SigClu(partitions, silent=True, cooling_rate=0.9, **config_options)
+
+
+def test_components_are_planted_cores(partitions, cores):
+    sc = make_sigclu(partitions)
+    assert sc.components(sc.nodes) == cores
+
+
+def test_components_of_available_nodes(partitions, cores):
+    sc = make_sigclu(partitions, min_core_size=6)
+    part = set(sorted(cores[1])[:8])
+    small = set(sorted(cores[2])[:5])
+    assert sc.components(cores[0] | part | small) == [cores[0], part]
+
+
+@pytest.mark.parametrize("prune", [False, True])
+def test_run_finds_planted_cores(partitions, prune):
+    sc = make_sigclu(partitions, prune=prune)
+    sc.run()
+    check_cores(sc.cores, SCALE)
+
+
+@pytest.mark.parametrize("prune", [False, True])
+def test_run_in_regions(partitions, cores, prune):
+    sc = make_sigclu(partitions, prune=prune)
+    sc.run(regions=[cores[0] | cores[1], sc.nodes])
+    check_cores(sc.cores, SCALE)
+
+
+def test_coassignment_index(partitions):
+    sc = make_sigclu(partitions)
+    sc.components(sc.nodes)
+
+    nodes = sc.coassignment.nodes[::-3]
+    np.testing.assert_array_equal(np.asarray(sc.coassignment.nodes)[sc.coassignment.index(nodes)], nodes)
+
+
+def test_peel_drops_unstable_nodes(partitions, cores):
+    sc = make_sigclu(partitions)
+    unstable = sc.nodes - set.union(*cores)
+    assert unstable
+
+    nodes = cores[0] | unstable
+    pen_weighting = sc._make_penalty_weight(nodes)
+    assert sc._peel(sc._nodeset_to_list_ordered(nodes), pen_weighting) == cores[0]
+    assert sc._peel(sc._nodeset_to_list_ordered(cores[0]), pen_weighting) == cores[0]
+
+
+@pytest.mark.parametrize("warm", [False, True])
+def test_peeled_and_warm_runs_find_planted_cores(partitions, cores, warm):
+    cold = make_sigclu(partitions)
+    cold.run()
+    sc = make_sigclu(partitions, initial_cores=cores) if warm else make_sigclu(partitions, initialize_peel=True)
+    sc.run()
+
+    check_cores(sc.cores, SCALE)
+    assert sc._temp_init == sc.cfg.peel_temp_init < cold._temp_init
+    assert sc.num_sweeps < cold.num_sweeps
+
+
+def test_warm_state(partitions, cores):
+    sc = make_sigclu(partitions, initial_cores=cores, min_core_size=6)
+    part = set(sorted(cores[1])[:10])
+    assert sc._warm_state(sc._nodeset_to_list_ordered(cores[0] | part)) == cores[0]
+    assert sc._warm_state(sc._nodeset_to_list_ordered(part)) == part
+    assert sc._warm_state(sc._nodeset_to_list_ordered(set(sorted(cores[1])[:5]))) is None
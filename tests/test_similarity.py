@@ -0,0 +1,69 @@
+"""Partition similarity against reference implementations."""
+from collections import Counter
+from itertools import combinations
+from math import comb, log
+
+import numpy as np
+import pytest
+
+from netclop.ensemble.similarity import ari, batched_pair_similarity, contingency, nmi, pair_similarity, sample_pairs
+
+
+def reference_nmi(a, b) -> float:
+    n = len(a)
+    count_a, count_b, joint = Counter(a), Counter(b), Counter(zip(a, b))
+    mutual_info = sum(c / n * log(c * n / (count_a[x] * count_b[y])) for (x, y), c in joint.items())
+    entropy_a = -sum(c / n * log(c / n) for c in count_a.values())
+    entropy_b = -sum(c / n * log(c / n) for c in count_b.values())
+    return mutual_info / ((entropy_a + entropy_b) / 2)
+
+
+def reference_ari(a, b) -> float:
+    """Adjusted Rand index from agreement over every pair of nodes."""
+    pairs = list(combinations(range(len(a)), 2))
+    same_a = [a[i] == a[j] for i, j in pairs]
+    same_b = [b[i] == b[j] for i, j in pairs]
+    index = sum(x and y for x, y in zip(same_a, same_b))
+    expected = sum(same_a) * sum(same_b) / comb(len(a), 2)
+    maximum = (sum(same_a) + sum(same_b)) / 2
+    return (index - expected) / (maximum - expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scores_match_reference(seed):
+    rng = np.random.default_rng(seed)
+    a, b = rng.integers(0, 6, size=(2, 60))
+    # Zero marks absent nodes, which are left out of the comparison
+    present = (a > 0) & (b > 0)
+
+    table = contingency(a, b)
+    assert table.sum() == present.sum()
+    assert nmi(table) == pytest.approx(reference_nmi(a[present].tolist(), b[present].tolist()))
+    assert ari(table) == pytest.approx(reference_ari(a[present].tolist(), b[present].tolist()))
+
+
+def test_identical_partitions():
+    a = np.array([1, 1, 2, 2, 3, 3, 0])
+    relabelled = np.array([5, 5, 1, 1, 2, 2, 4])
+    scores = pair_similarity(np.stack([a, relabelled]), np.array([[0, 1]]))
+    np.testing.assert_allclose(scores, [[1.0, 1.0]])
+
+
+@pytest.mark.parametrize("num_partitions", [2, 3, 10, 41])
+def test_sample_pairs_decodes_all_pairs(num_partitions):
+    pairs = sample_pairs(num_partitions, None, np.random.default_rng(0))
+    assert [tuple(pair) for pair in pairs.tolist()] == list(combinations(range(num_partitions), 2))
+
+
+def test_sample_pairs_are_distinct():
+    pairs = sample_pairs(50, 100, np.random.default_rng(0))
+    assert len(set(map(tuple, pairs.tolist()))) == 100
+    assert np.all(pairs[:, 0] < pairs[:, 1])
+
+
+def test_batches_match_serial():
+    labels = np.random.default_rng(0).integers(0, 5, size=(12, 50))
+    pairs = sample_pairs(len(labels), None, np.random.default_rng(0))
+    np.testing.assert_array_equal(
+        batched_pair_similarity(labels, pairs, num_workers=2, batch_size=10), pair_similarity(labels, pairs),
+    )
@@ -0,0 +1,67 @@
+"""Network sparsification before partitioning."""
+import networkx as nx
+import pytest
+
+from netclop.ensemble.ensemble import NetworkEnsemble
+from netclop.ensemble.sparsify import Sparsifier
+
+
+@pytest.fixture
+def net() -> nx.DiGraph:
+    """A strongly connected triangle, a node reached only by a light edge, a weak pair, and a one-way tail."""
+    net = nx.DiGraph()
+    net.add_weighted_edges_from([
+        ("a", "b", 10), ("b", "c", 10), ("c", "a", 10), ("a", "a", 5),
+        ("a", "light", 1),
+        ("c", "weak", 2), ("weak", "pair", 2),
+        ("b", "tail", 10),
+    ])
+    net.add_node("isolated")
+    return net
+
+
+def test_prunes_edges_then_nodes(net):
+    sparsifier = Sparsifier(silent=True, min_edge_weight=2, min_node_strength=5, self_loops=False)
+    sparse_net = sparsifier.run(net)
+
+    assert list(sparse_net.nodes) == ["a", "b", "c", "tail"]
+    assert list(sparse_net.edges(data="weight")) == [("a", "b", 10), ("b", "c", 10), ("b", "tail", 10), ("c", "a", 10)]
+    assert sparsifier.removed == {"light": "edges", "weak": "strength", "pair": "strength", "isolated": "edges"}
+
+
+def test_largest_scc(net):
+    sparsifier = Sparsifier(silent=True, largest_scc=True)
+    sparse_net = sparsifier.run(net)
+
+    assert set(sparse_net.nodes) == {"a", "b", "c"}
+    assert sparse_net["a"]["a"]["weight"] == 5
+    assert sparsifier.removed == {
+        "light": "scc", "weak": "scc", "pair": "scc", "tail": "scc", "isolated": "edges",
+    }
+
+
+def test_is_active():
+    assert not Sparsifier(silent=True).is_active()
+    assert Sparsifier(silent=True, min_edge_weight=2).is_active()
+    assert Sparsifier(silent=True, self_loops=False).is_active()
+
+
+def test_nodelist_records_pruned_nodes(net):
+    other = net.copy()
+    other.add_edge("light", "a", weight=10)
+    ne = NetworkEnsemble([net, other], silent=True)
+    ne.sparsify(min_edge_weight=2)
+
+    # A node is pruned only if no member network keeps it
+    assert ne.pruned_nodes == {"isolated": "edges"}
+    df = ne.to_nodelist().set_index("node")
+    assert df.loc["isolated", "pruned"] == "edges"
+    assert df["pruned"].drop("isolated").isna().all()
+    assert set(df.index) == set(net.nodes)
+
+
+def test_sparsify_after_partitioning(net):
+    ne = NetworkEnsemble([net, net], silent=True)
+    ne.partitions = [[set(net.nodes)]]
+    with pytest.raises(ValueError):
+        ne.sparsify(min_edge_weight=2)
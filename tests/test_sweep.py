@@ -0,0 +1,55 @@
+"""Stage sharing in parameter sweeps."""
+from collections import Counter
+
+import pytest
+
+from netclop.cli import sweep as sweep_module
+from netclop.cli.sweep import Sweep
+
+GRID = {"res": [3, 4], "markov_time": [1, 2], "sig": [0.05, 0.1], "min_core_size": [5]}
+
+
+def test_stages_are_shared(tmp_path):
+    stages = Sweep(["lpt.csv"], tmp_path / "sweep", GRID, silent=True).make_stages()
+
+    assert Counter(stage.name for stage in stages) == {
+        "bin": 1, "net": 2, "bootstrap": 2, "partition": 4, "sigclu": 8,
+    }
+    keys = [stage.key for stage in stages]
+    assert len(set(keys)) == len(keys)
+    # Topological order, so every dependency runs first
+    for i, stage in enumerate(stages):
+        assert all(dep in keys[:i] for dep in stage.deps)
+
+    leaf_paths = [stage.kwargs["path"] for stage in stages if stage.name == "sigclu"]
+    assert len(set(leaf_paths)) == len(leaf_paths)
+
+
+@pytest.mark.parametrize(("paths", "res", "names"), [
+    (["lpt.csv"], [4], {"net", "bootstrap", "partition", "sigclu"}),
+    (["lpt0.csv", "lpt1.csv"], [4], {"net", "partition", "sigclu"}),
+    (["lpt0.csv", "lpt1.csv"], [3, 4], {"bin", "net", "partition", "sigclu"}),
+])
+def test_stage_kinds(tmp_path, paths, res, names):
+    stages = Sweep(paths, tmp_path / "sweep", GRID | {"res": res}, silent=True).make_stages()
+    assert {stage.name for stage in stages} == names
+
+
+def test_run_calls_each_stage_once(tmp_path, monkeypatch):
+    calls = Counter()
+
+    def fake(name):
+        def func(*deps, **kwargs):
+            calls[name] += 1
+            return name, deps
+        return func
+
+    for name in ["_bin", "_coarsen", "_bootstrap", "_partition", "_sigclu"]:
+        monkeypatch.setattr(sweep_module, name, fake(name))
+
+    sweep = Sweep(["lpt.csv"], tmp_path / "sweep", GRID, silent=True)
+    sweep.run()
+
+    assert calls == {"_bin": 1, "_coarsen": 2, "_bootstrap": 2, "_partition": 4, "_sigclu": 8}
+    # Upstream results are released once consumed
+    assert {name for name, _ in sweep.results} == {"sigclu"}
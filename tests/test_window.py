@@ -0,0 +1,60 @@
+"""Sliding window aggregation against networks built from scratch."""
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from netclop.geo.net import GeoNet
+from netclop.geo.window import SlidingWindow
+
+from tests.conftest import net_edges
+
+
+def direct_build(paths, tmp_path, **geonet_options) -> list[tuple]:
+    """Edges of one network built from the positions of all files at once."""
+    path = tmp_path / "combined.csv"
+    pd.concat([GeoNet.read_lpt(path) for path in paths]).to_csv(path, header=False, index=False)
+    return net_edges(GeoNet(silent=True, **geonet_options).from_lpt([path]))
+
+
+def test_push_matches_direct_build(lpt_paths, tmp_path):
+    window = SlidingWindow(tmp_path / "window", silent=True, res=4, size=3)
+    for path in lpt_paths:
+        net = window.push(path)
+
+    expected = direct_build(lpt_paths[-3:], tmp_path, res=4)
+    assert net_edges(net) == expected
+
+    reloaded = SlidingWindow(tmp_path / "window", silent=True, res=4, size=3)
+    assert reloaded.files == window.files
+    assert net_edges(reloaded.net()) == expected
+
+
+def test_update_with_domain_matches_direct_build(lpt_paths, tmp_path):
+    geonet_options = {"bbox": (1, 1, 4, 4)}
+    window = SlidingWindow(tmp_path / "window", silent=True, geonet_options=geonet_options, res=4)
+    window.update(lpt_paths[:3])
+    net = window.update(lpt_paths[1:4])
+    assert net_edges(net) == direct_build(lpt_paths[1:4], tmp_path, res=4, **geonet_options)
+
+
+def test_interrupted_save_keeps_previous_window(lpt_paths, tmp_path):
+    window = SlidingWindow(tmp_path / "window", silent=True, res=4)
+    net = window.update(lpt_paths[:2])
+
+    # The new file's table is written, then saving the window fails
+    with mock.patch.object(SlidingWindow, "_write_counts", side_effect=[None, RuntimeError]):
+        with pytest.raises(RuntimeError):
+            window.update(lpt_paths[1:3])
+
+    reloaded = SlidingWindow(tmp_path / "window", silent=True, res=4)
+    assert reloaded.files == [str(path.resolve()) for path in lpt_paths[:2]]
+    assert net_edges(reloaded.net()) == net_edges(net)
+
+
+def test_rejects_other_binning(lpt_paths, tmp_path):
+    SlidingWindow(tmp_path / "window", silent=True, res=4).update(lpt_paths[:1])
+    with pytest.raises(ValueError):
+        SlidingWindow(tmp_path / "window", silent=True, res=5)
+    with pytest.raises(ValueError):
+        SlidingWindow(tmp_path / "window", silent=True, geonet_options={"bbox": (1, 1, 4, 4)}, res=4)